@@ -0,0 +1,182 @@
+"""
+Streaming, mergeable aggregate state for flight analysis.
+"""
+
+from records import core_getter
+from sketch import QuantileSketch, distribution_stats, empty_stats
+
+_bucket_key = QuantileSketch().key
+
+
+class FlightAggregator:
+    """
+    One-pass accumulator producing the same result as ``analysis.analyze()``.
+
+    State is O(routes + dates): a fixed-size quantile sketch per route and
+    per departure date (see ``sketch.QuantileSketch``; each also counts and
+    sums its prices) and overall count/sum/min/max. Flights can be fed from
+    any iterable or generator, and partial aggregators built on different
+    shards or workers can be combined with ``merge()``.
+
+    Merging aggregators built from consecutive chunks gives the same result
+    as aggregating the concatenated data (float averages may differ in the
+    last bit because partial sums are added in a different order).
+    """
+
+    __slots__ = (
+        "route_sketches",
+        "date_sketches",
+        "count",
+        "total",
+        "min_price",
+        "max_price",
+    )
+
+    def __init__(self, flights=None):
+        """
+        Args:
+            flights (iterable): Optional flights to consume immediately
+        """
+        # (origin, destination) -> QuantileSketch, in first-seen order
+        self.route_sketches = {}
+        self.date_sketches = {}  # depart_date -> QuantileSketch
+        self.count = 0
+        self.total = 0
+        self.min_price = None
+        self.max_price = None
+        if flights is not None:
+            self.update(flights)
+
+    def __len__(self):
+        return self.count
+
+    def add(self, flight):
+        """
+        Add one flight to the aggregate.
+
+        Args:
+            flight (dict or Flight): Flight with origin, destination,
+                depart_date and price
+        """
+        origin, destination, depart_date, price = core_getter(flight)(flight)
+        route = (origin, destination)
+
+        # One bucket lookup serves both the route and the date sketch
+        key = _bucket_key(price)
+        sketch = self.route_sketches.get(route)
+        if sketch is None:
+            sketch = self.route_sketches[route] = QuantileSketch()
+        sketch.add_key(key, price)
+        sketch = self.date_sketches.get(depart_date)
+        if sketch is None:
+            sketch = self.date_sketches[depart_date] = QuantileSketch()
+        sketch.add_key(key, price)
+
+        self.count += 1
+        self.total += price
+        # Strict comparisons keep the first extreme seen, like min()/max()
+        if self.min_price is None or price < self.min_price:
+            self.min_price = price
+        if self.max_price is None or price > self.max_price:
+            self.max_price = price
+
+    def update(self, flights):
+        """
+        Consume flights from any iterable in a single pass.
+
+        Args:
+            flights (iterable): Flight dictionaries
+
+        Returns:
+            FlightAggregator: self, for chaining
+        """
+        add = self.add
+        for flight in flights:
+            add(flight)
+        return self
+
+    def merge(self, other):
+        """
+        Fold another aggregator's state into this one.
+
+        Args:
+            other (FlightAggregator): Partial state from another shard/worker
+
+        Returns:
+            FlightAggregator: self, for chaining
+        """
+        for mine, theirs in (
+            (self.route_sketches, other.route_sketches),
+            (self.date_sketches, other.date_sketches),
+        ):
+            for key, sketch in theirs.items():
+                if key in mine:
+                    mine[key].merge(sketch)
+                else:
+                    mine[key] = QuantileSketch().merge(sketch)
+
+        self.count += other.count
+        self.total += other.total
+        if other.min_price is not None and (
+            self.min_price is None or other.min_price < self.min_price
+        ):
+            self.min_price = other.min_price
+        if other.max_price is not None and (
+            self.max_price is None or other.max_price > self.max_price
+        ):
+            self.max_price = other.max_price
+        return self
+
+    def result(self):
+        """
+        Emit the current analysis.
+
+        Returns:
+            dict: Same structure and values as ``analysis.analyze()``
+        """
+        if not self.count:
+            quantiles, distribution = empty_stats()
+            return {
+                "top_routes": [],
+                "price_trends": [],
+                "summary": {
+                    "total_routes": 0,
+                    "avg_price": 0,
+                    "min_price": 0,
+                    "max_price": 0,
+                    **quantiles,
+                },
+                "distribution": distribution,
+            }
+
+        # sorted() is stable, so ties keep first-seen order like Counter
+        ranked = sorted(
+            self.route_sketches.items(), key=lambda item: item[1].count, reverse=True
+        )
+        top_routes = [
+            {"origin": origin, "destination": destination, "count": sketch.count}
+            for (origin, destination), sketch in ranked[:10]
+        ]
+
+        price_trends = [
+            {"depart_date": date, "price": round(sketch.total / sketch.count, 2)}
+            for date, sketch in sorted(self.date_sketches.items())
+        ]
+
+        summary = {
+            "total_routes": self.count,
+            "avg_price": round(self.total / self.count, 2),
+            "min_price": self.min_price,
+            "max_price": self.max_price,
+        }
+        quantiles, distribution = distribution_stats(
+            self.route_sketches, self.date_sketches, top_routes
+        )
+        summary.update(quantiles)
+
+        return {
+            "top_routes": top_routes,
+            "price_trends": price_trends,
+            "summary": summary,
+            "distribution": distribution,
+        }
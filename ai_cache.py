@@ -0,0 +1,273 @@
+"""
+Persistent cache of formatted AI answers keyed by normalized question.
+
+Near-identical questions ("Best time to book flights to Europe?" and
+"best time to book flights to europe") map to the same key, so only the
+first one pays for an OpenRouter round-trip. Answers live in an in-memory
+LRU tier backed by a local SQLite file shared by all workers.
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+
+from cache import TTLCache
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def normalize_question(question, token_set=False):
+    """
+    Fold a question to the form used for cache lookups.
+
+    Case, punctuation and whitespace are ignored. With ``token_set`` the
+    words are also de-duplicated and sorted, so word order stops mattering
+    ("flights to europe best time" == "best time flights to europe").
+
+    Args:
+        question (str): The user's question
+        token_set (bool): Compare questions as sets of words
+
+    Returns:
+        str: Normalized question text
+    """
+    words = _WORD_RE.findall(question.casefold())
+    if token_set:
+        words = sorted(set(words))
+    return " ".join(words)
+
+
+class AnswerCache:
+    """
+    Two-tier (memory LRU + SQLite) cache of formatted AI answers.
+
+    Entries expire ``ttl`` seconds after they were stored. The SQLite file
+    holds at most ``max_entries`` answers; the least recently used ones are
+    pruned as new answers are stored. SQLite errors (an unwritable path, a
+    locked or corrupt file) never reach the caller: lookups fall back to
+    the memory tier and writes skip the file.
+    """
+
+    def __init__(
+        self,
+        path=None,
+        ttl=86400,
+        max_entries=5000,
+        memory_entries=256,
+        token_set=False,
+        namespace="",
+        on_error=None,
+    ):
+        """
+        Args:
+            path (str): SQLite file path, or None for a memory-only cache
+            ttl (float): Seconds an answer stays valid
+            max_entries (int): Maximum answers kept in the SQLite file
+            memory_entries (int): Maximum answers kept in memory
+            token_set (bool): Ignore word order and repeats when matching
+            namespace (str): Mixed into keys, e.g. the model name, so
+                answers from a different model are not reused
+            on_error (callable): Called with the exception when the SQLite
+                file can't be used, e.g. to count it
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.token_set = token_set
+        self.namespace = namespace
+        self.on_error = on_error
+        self._memory = TTLCache(ttl=ttl, max_entries=memory_entries)
+        self._db = None
+        self._db_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def key(self, question):
+        """
+        Cache key for a question.
+
+        Args:
+            question (str): The user's question
+
+        Returns:
+            str: Hex digest of the namespace and normalized question
+        """
+        text = f"{self.namespace}\n{normalize_question(question, self.token_set)}"
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _connection(self):
+        """Open the SQLite file on first use (call with ``_db_lock`` held)."""
+        if self._db is None:
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            try:
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS answers ("
+                    " key TEXT PRIMARY KEY,"
+                    " question TEXT NOT NULL,"
+                    " answer TEXT NOT NULL,"
+                    " created_at REAL NOT NULL,"
+                    " last_hit REAL NOT NULL,"
+                    " hits INTEGER NOT NULL DEFAULT 0)"
+                )
+                db.execute(
+                    "CREATE INDEX IF NOT EXISTS answers_last_hit ON answers (last_hit)"
+                )
+                db.commit()
+            except sqlite3.Error:
+                # Retry on the next call rather than keep a half-set-up file
+                db.close()
+                raise
+            self._db = db
+        return self._db
+
+    def _count(self, name):
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _failed(self, error):
+        """Report a SQLite error; the caller carries on without the file."""
+        print(f"AI cache error ({self.path}): {error}")
+        if self.on_error is not None:
+            self.on_error(error)
+
+    def get(self, question):
+        """
+        Look up the cached answer for a question.
+
+        Args:
+            question (str): The user's question
+
+        Returns:
+            str: Formatted HTML answer, or None on a miss
+        """
+        key = self.key(question)
+        now = time.time()
+
+        entry = self._memory.get(key)
+        if entry is not None and entry[0] > now:
+            self._count("memory_hits")
+            return entry[1]
+
+        if self.path:
+            row = None
+            try:
+                with self._db_lock:
+                    db = self._connection()
+                    row = db.execute(
+                        "SELECT answer, created_at FROM answers WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is not None and row[1] + self.ttl > now:
+                        with db:
+                            db.execute(
+                                "UPDATE answers SET last_hit = ?, hits = hits + 1"
+                                " WHERE key = ?",
+                                (now, key),
+                            )
+            except sqlite3.Error as e:
+                # Serve what we read, or treat the lookup as a miss
+                self._failed(e)
+            if row is not None and row[1] + self.ttl > now:
+                self._memory.set(key, (row[1] + self.ttl, row[0]))
+                self._count("disk_hits")
+                return row[0]
+
+        self._count("misses")
+        return None
+
+    def set(self, question, answer):
+        """
+        Store the formatted answer for a question.
+
+        Args:
+            question (str): The user's question
+            answer (str): Formatted HTML answer
+        """
+        key = self.key(question)
+        now = time.time()
+        self._memory.set(key, (now + self.ttl, answer))
+
+        if not self.path:
+            return
+        try:
+            with self._db_lock:
+                db = self._connection()
+                # Commits, or rolls back if a statement fails
+                with db:
+                    db.execute(
+                        "INSERT OR REPLACE INTO answers"
+                        " (key, question, answer, created_at, last_hit, hits)"
+                        " VALUES (?, ?, ?, ?, ?, 0)",
+                        (key, question, answer, now, now),
+                    )
+                    # Drop expired answers, then the least recently used overflow
+                    db.execute(
+                        "DELETE FROM answers WHERE created_at <= ?", (now - self.ttl,)
+                    )
+                    db.execute(
+                        "DELETE FROM answers WHERE key IN ("
+                        " SELECT key FROM answers ORDER BY last_hit DESC"
+                        " LIMIT -1 OFFSET ?)",
+                        (self.max_entries,),
+                    )
+        except sqlite3.Error as e:
+            # The answer stays in the memory tier
+            self._failed(e)
+
+    def clear(self):
+        """Remove every cached answer and reset the counters."""
+        self._memory.clear()
+        with self._stats_lock:
+            self.memory_hits = self.disk_hits = self.misses = 0
+        if self.path:
+            with self._db_lock:
+                db = self._connection()
+                db.execute("DELETE FROM answers")
+                db.commit()
+
+    def counts(self):
+        """
+        Get lookup counters without touching the SQLite file.
+
+        Returns:
+            dict: memory_hits, disk_hits and misses since start
+        """
+        with self._stats_lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+            }
+
+    def stats(self):
+        """
+        Get cache counters.
+
+        Returns:
+            dict: Hits per tier, misses, hit rate and stored entry counts
+        """
+        disk_entries = 0
+        if self.path:
+            with self._db_lock:
+                disk_entries = (
+                    self._connection()
+                    .execute("SELECT COUNT(*) FROM answers")
+                    .fetchone()[0]
+                )
+
+        with self._stats_lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            }
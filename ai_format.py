@@ -0,0 +1,200 @@
+"""
+Formatter turning AI model markdown into the HTML shown in the assistant.
+
+All patterns are compiled once at import. Headings of every level are
+converted in one regex pass (instead of one per level), bold in one, and
+paragraphs are split once and classified as list or text; emojis are then
+swapped for Bootstrap icons in a single pass instead of one ``str.replace``
+per emoji. The output is identical to the original chain of
+``re.sub``/``str.replace`` passes in ``ask_ai``.
+"""
+
+import re
+
+# Emojis replaced with Bootstrap Icons
+EMOJI_TO_ICON = {
+    # Weather icons
+    "🌤️": "sun",
+    "☀️": "sun-fill",
+    "🌧️": "cloud-rain",
+    "❄️": "snow",
+    # Travel icons
+    "✈️": "airplane",
+    "🛫": "airplane-fill",
+    "🚗": "car-front",
+    "🏨": "building",
+    # UI icons
+    "📅": "calendar",
+    "👉": "arrow-right-circle-fill",
+    "✅": "check-circle-fill",
+    "💰": "cash-coin",
+    "⭐": "star-fill",
+}
+
+ICON_CLASSES = {
+    "check-circle-fill": "text-success",
+    "star-fill": "text-warning",
+}
+
+
+def _icon_html(icon_name):
+    css_class = ICON_CLASSES.get(icon_name, "")
+    return f' <i class="bi bi-{icon_name} {css_class}"></i> '
+
+
+_EMOJI_HTML = {emoji: _icon_html(icon) for emoji, icon in EMOJI_TO_ICON.items()}
+# Every emoji is one character plus an optional variation selector
+_EMOJI_RE = re.compile(
+    "[" + "".join(sorted({emoji[0] for emoji in EMOJI_TO_ICON})) + "]\ufe0f?"
+)
+
+# "#", "##" or "###" at a line start, whitespace, then the heading text
+_HEADING_RE = re.compile(r"^(#{1,3})[^\S\n]+(.+)$", re.MULTILINE)
+# Heading marker whose text only starts on a later line ("##\nTitle"); the
+# legacy per-level regexes join such lines, so those answers take that path
+_HEADING_SPANS_LINES_RE = re.compile(r"^#{1,3}[^\S\n]*\n", re.MULTILINE)
+_LEGACY_HEADING_RES = [
+    (level, re.compile(f"^{'#' * level}\\s+(.+)$", re.MULTILINE)) for level in (3, 2, 1)
+]
+
+_BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+_PARAGRAPH_SPLIT_RE = re.compile(r"\n\s*\n")
+_BULLET_RE = re.compile(r"^[-•]\s", re.MULTILINE)
+_BULLET_LINE_RE = re.compile(r"[-•]\s")
+_NUMBER_RE = re.compile(r"^\d+\.\s", re.MULTILINE)
+_NUMBER_LINE_RE = re.compile(r"\d+\.\s")
+
+
+def _heading_html(match):
+    tag = f"h{len(match.group(1)) + 2}"
+    return f"<{tag}>{match.group(2)}</{tag}>"
+
+
+def _emoji_html(match):
+    text = match.group(0)
+    html = _EMOJI_HTML.get(text)
+    if html is not None:
+        return html
+    # Single-character emoji followed by a variation selector, or a bare
+    # character whose emoji form needs the selector (e.g. "☀" alone)
+    html = _EMOJI_HTML.get(text[0])
+    return text if html is None else html + text[1:]
+
+
+def replace_emojis(html):
+    """Swap supported emojis for Bootstrap icon tags in a single pass."""
+    return _EMOJI_RE.sub(_emoji_html, html)
+
+
+def _render_paragraph(paragraph):
+    """Render one paragraph (headings and bold already converted) to HTML."""
+    # Skip paragraphs that are already HTML elements
+    if paragraph.strip().startswith("<") and ">" in paragraph:
+        return paragraph
+
+    if _BULLET_RE.search(paragraph):
+        items = "".join(
+            f"<li>{line[2:]}</li>"
+            for line in paragraph.split("\n")
+            if _BULLET_LINE_RE.match(line)
+        )
+        return f"<ul class='ai-list'>{items}</ul>"
+
+    if _NUMBER_RE.search(paragraph):
+        items = []
+        for line in paragraph.split("\n"):
+            match = _NUMBER_LINE_RE.match(line)
+            if match:
+                items.append(f"<li>{line[match.end():]}</li>")
+        return f"<ol class='ai-list'>{''.join(items)}</ol>"
+
+    return f"<p>{paragraph}</p>"
+
+
+def format_answer(answer):
+    """
+    Format an AI answer (markdown-ish text) as HTML.
+
+    Headings become <h3>-<h5>, **bold** becomes <strong>, "-"/"•" and
+    "1." paragraphs become lists, other paragraphs are wrapped in <p>, and
+    known emojis are replaced with Bootstrap icons.
+
+    Args:
+        answer (str): Raw model output
+
+    Returns:
+        str: HTML fragment
+    """
+    answer = answer.strip()
+
+    if "#" in answer:
+        if _HEADING_SPANS_LINES_RE.search(answer):
+            # Rare: heading text on the line after the marker
+            for level, pattern in _LEGACY_HEADING_RES:
+                answer = pattern.sub(f"<h{level + 2}>\\1</h{level + 2}>", answer)
+        else:
+            answer = _HEADING_RE.sub(_heading_html, answer)
+
+    if "**" in answer:
+        answer = _BOLD_RE.sub(r"<strong>\1</strong>", answer)
+
+    html = "\n".join(
+        _render_paragraph(paragraph)
+        for paragraph in _PARAGRAPH_SPLIT_RE.split(answer)
+        if paragraph.strip()
+    )
+    return replace_emojis(html)
+
+
+class StreamingFormatter:
+    """
+    Incremental formatter for answers that arrive token by token.
+
+    ``feed()`` returns HTML for the paragraphs completed by the new text, so
+    the client can render them straight away; the unfinished paragraph is
+    available as plain text in ``pending``. ``finish()`` formats the whole
+    answer with ``format_answer`` so the final HTML is exactly what the
+    non-streaming endpoint returns.
+    """
+
+    def __init__(self):
+        self._parts = []
+        self._pending = ""
+
+    @property
+    def pending(self):
+        """Raw text of the paragraph still being received."""
+        return self._pending
+
+    def feed(self, text):
+        """
+        Add streamed text.
+
+        Args:
+            text (str): Next chunk of model output
+
+        Returns:
+            str: HTML for newly completed paragraphs ("" if none)
+        """
+        self._parts.append(text)
+        self._pending += text
+
+        last = None
+        for last in _PARAGRAPH_SPLIT_RE.finditer(self._pending):
+            pass
+        if last is None:
+            return ""
+
+        done = self._pending[: last.start()]
+        self._pending = self._pending[last.end() :]
+        html = format_answer(done)
+        return html + "\n" if html else ""
+
+    def finish(self):
+        """
+        Format the complete answer.
+
+        Returns:
+            str: HTML for the whole answer
+        """
+        return format_answer("".join(self._parts))
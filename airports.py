@@ -2,6 +2,35 @@
 Common airports data for the airline demand analysis application.
 """
 
+import csv
+import heapq
+import json
+import os
+import re
+import sys
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+
+# Default number of results returned to the autocomplete
+DEFAULT_SEARCH_LIMIT = 10
+
+# Keep at most this many prefix candidates (e.g. for "sa"), best ranked first
+MAX_PREFIX_CANDIDATES = 500
+
+# Optional CSV/JSON file with the full airport list (defaults to COMMON_AIRPORTS)
+AIRPORTS_FILE = os.environ.get("AIRPORTS_FILE", "")
+
+# Accepted column names per field, e.g. OurAirports uses iata_code/municipality
+FIELD_ALIASES = {
+    "code": ("code", "iata", "iata_code"),
+    "name": ("name", "airport", "airport_name"),
+    "city": ("city", "municipality"),
+    "country": ("country", "iso_country", "country_code"),
+}
+
 COMMON_AIRPORTS = [
     {
         "code": "ATL",
@@ -121,6 +150,198 @@ COMMON_AIRPORTS = [
 ]
 
 
+class AirportTable:
+    """
+    Compact, column-oriented airport dataset with O(1) code lookup.
+
+    Airports are stored as four parallel tuples of interned strings instead
+    of one dict per airport; dictionaries are only built for the rows that
+    are actually returned.
+    """
+
+    __slots__ = ("codes", "names", "cities", "countries", "_by_code")
+
+    def __init__(self, rows):
+        """
+        Args:
+            rows (iterable): (code, name, city, country) tuples
+        """
+        intern = sys.intern
+        codes, names, cities, countries = [], [], [], []
+        by_code = {}
+        for code, name, city, country in rows:
+            code = intern(code.strip().upper())
+            if not code or code in by_code:
+                continue
+            by_code[code] = len(codes)
+            codes.append(code)
+            names.append(name)
+            cities.append(intern(city))
+            countries.append(intern(country))
+
+        self.codes = tuple(codes)
+        self.names = tuple(names)
+        self.cities = tuple(cities)
+        self.countries = tuple(countries)
+        self._by_code = by_code
+
+    @classmethod
+    def from_dicts(cls, airports):
+        """
+        Build a table from airport dictionaries.
+
+        Args:
+            airports (iterable): Dicts with code, name, city and country keys
+
+        Returns:
+            AirportTable: The compact table
+        """
+        return cls((a["code"], a["name"], a["city"], a["country"]) for a in airports)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __iter__(self):
+        return (self.row(i) for i in range(len(self.codes)))
+
+    def row(self, index):
+        """
+        Build the airport dictionary for one row.
+
+        Args:
+            index (int): Row number
+
+        Returns:
+            dict: Airport with code, name, city and country
+        """
+        return {
+            "code": self.codes[index],
+            "name": self.names[index],
+            "city": self.cities[index],
+            "country": self.countries[index],
+        }
+
+    def index_of(self, code):
+        """Return the row number for an IATA code, or None."""
+        return self._by_code.get(code.upper())
+
+    def get(self, code):
+        """
+        Look up an airport by IATA code in constant time.
+
+        Args:
+            code (str): The IATA airport code
+
+        Returns:
+            dict: Airport details dictionary or None if not found
+        """
+        index = self._by_code.get(code.upper())
+        return None if index is None else self.row(index)
+
+    def memory_bytes(self):
+        """
+        Estimate the memory held by the table.
+
+        Returns:
+            int: Approximate size in bytes (containers plus unique strings)
+        """
+        size = sys.getsizeof(self._by_code)
+        seen = set()
+        for column in (self.codes, self.names, self.cities, self.countries):
+            size += sys.getsizeof(column)
+            for value in column:
+                if id(value) not in seen:
+                    seen.add(id(value))
+                    size += sys.getsizeof(value)
+        return size
+
+
+def _pick(record, field):
+    """Read a field from a loaded record using the accepted column aliases."""
+    for key in FIELD_ALIASES[field]:
+        value = record.get(key)
+        if value:
+            return str(value).strip()
+    return ""
+
+
+def _iter_records(path):
+    """Yield raw airport records from a CSV or JSON file."""
+    if path.lower().endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            # {"JFK": {...}, ...} keyed by code
+            for code, record in data.items():
+                yield dict(record, code=record.get("code") or code)
+        else:
+            yield from data
+    else:
+        with open(path, newline="", encoding="utf-8") as f:
+            yield from csv.DictReader(f)
+
+
+def load_airports(path):
+    """
+    Load a large airport dataset from a CSV or JSON file.
+
+    Rows without a three-letter IATA code are skipped. The load time and
+    approximate memory footprint are logged.
+
+    Args:
+        path (str): Path to a .csv or .json file
+
+    Returns:
+        AirportTable: The loaded airports
+    """
+    started = time.perf_counter()
+    rows = []
+    for record in _iter_records(path):
+        code = _pick(record, "code")
+        if len(code) != 3:
+            continue
+        rows.append(
+            (
+                code,
+                _pick(record, "name"),
+                _pick(record, "city"),
+                _pick(record, "country"),
+            )
+        )
+    table = AirportTable(rows)
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"Loaded {len(table)} airports from {path} in {elapsed * 1000:.1f} ms "
+        f"(~{table.memory_bytes() / 1024 / 1024:.1f} MB)"
+    )
+    return table
+
+
+_airport_table = None
+_airport_table_lock = threading.Lock()
+
+
+def get_airport_table():
+    """
+    Return the shared airport table, loading it once.
+
+    Uses ``AIRPORTS_FILE`` when set, otherwise COMMON_AIRPORTS.
+
+    Returns:
+        AirportTable: The airport universe used for lookups and search
+    """
+    global _airport_table
+    if _airport_table is None:
+        with _airport_table_lock:
+            if _airport_table is None:
+                if AIRPORTS_FILE:
+                    _airport_table = load_airports(AIRPORTS_FILE)
+                else:
+                    _airport_table = AirportTable.from_dicts(COMMON_AIRPORTS)
+    return _airport_table
+
+
 def get_airport_by_code(code):
     """
     Get airport details by IATA code.
@@ -131,32 +352,270 @@ def get_airport_by_code(code):
     Returns:
         dict: Airport details dictionary or None if not found
     """
-    for airport in COMMON_AIRPORTS:
-        if airport["code"] == code.upper():
-            return airport
-    return None
+    return get_airport_table().get(code)
+
+
+def _normalize(text):
+    """Lowercase and strip accents so "Zürich" matches "zurich"."""
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def _trigrams(text):
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _deletes(token):
+    """All variants of ``token`` with one character removed."""
+    return {token[:i] + token[i + 1 :] for i in range(len(token))}
+
+
+class AirportIndex:
+    """
+    Precomputed search index over airport code, city, name and country.
+
+    Lookups never scan the whole airport list:
+        - codes are looked up in a dict,
+        - word prefixes are found by bisecting a sorted token list,
+        - substrings (3+ characters) by intersecting a trigram inverted index,
+        - typos (one edit, words of 4+ characters) through a
+          deletion-neighbourhood index of word variants.
+
+    Matches are ranked exact IATA code first, then code prefix, city
+    prefix, name/country prefix, word prefix, substring and finally typo
+    matches, keeping the original list order within each rank.
+    """
+
+    def __init__(self, airports):
+        """
+        Args:
+            airports (AirportTable or iterable): Airport table, or airport
+                dictionaries with code, name, city and country keys
+        """
+        if not isinstance(airports, AirportTable):
+            airports = AirportTable.from_dicts(airports)
+        self.table = airports
+        # Normalized (code, city, name, country) per airport id
+        self._fields = []
+        # " word word | word ..." per airport, for word-start matching
+        self._words = []
+        self._codes = defaultdict(list)
+        self._token_ids = defaultdict(list)
+        self._trigram_ids = defaultdict(list)
+        self._typo_tokens = defaultdict(set)
+
+        table = self.table
+        for airport_id in range(len(table)):
+            fields = (
+                _normalize(table.codes[airport_id]),
+                _normalize(table.cities[airport_id]),
+                _normalize(table.names[airport_id]),
+                _normalize(table.countries[airport_id]),
+            )
+            self._fields.append(fields)
+            self._words.append(
+                " " + " | ".join(" ".join(_TOKEN_RE.findall(f)) for f in fields)
+            )
+            self._codes[fields[0]].append(airport_id)
+
+            tokens = set()
+            grams = set()
+            for field in fields:
+                tokens.update(_TOKEN_RE.findall(field))
+                grams |= _trigrams(field)
+            for token in tokens:
+                self._token_ids[token].append(airport_id)
+            for gram in grams:
+                self._trigram_ids[gram].append(airport_id)
+
+        for token in self._token_ids:
+            if len(token) >= 4:
+                for variant in _deletes(token):
+                    self._typo_tokens[variant].add(token)
+                self._typo_tokens[token].add(token)
+
+        self._sorted_tokens = sorted(self._token_ids)
+        # Per field: airport ids sorted by value, and the sorted values, so
+        # airports whose whole field starts with a prefix can be bisected
+        self._sorted_fields = []
+        for column in zip(*self._fields):
+            order = sorted(range(len(column)), key=column.__getitem__)
+            self._sorted_fields.append((order, [column[i] for i in order]))
+        # Freeze to plain dicts so missing keys don't grow the index
+        self._codes = dict(self._codes)
+        self._token_ids = dict(self._token_ids)
+        self._trigram_ids = dict(self._trigram_ids)
+        self._typo_tokens = dict(self._typo_tokens)
+
+    def __len__(self):
+        return len(self.table)
+
+    def _field_prefix_ids(self, field, prefix):
+        """Airport ids whose ``field`` (0-3) starts with ``prefix``."""
+        order, values = self._sorted_fields[field]
+        i = bisect_left(values, prefix)
+        while i < len(values) and values[i].startswith(prefix):
+            yield order[i]
+            i += 1
+
+    def _word_prefix_ids(self, prefix):
+        """Airport ids having a word that starts with ``prefix``, in order."""
+        tokens = self._sorted_tokens
+        i = bisect_left(tokens, prefix)
+        postings = []
+        while i < len(tokens) and tokens[i].startswith(prefix):
+            postings.append(self._token_ids[tokens[i]])
+            i += 1
+        # Posting lists are in airport order, so merging them lazily yields
+        # the lowest ids first without collecting every match
+        return heapq.merge(*postings)
+
+    def _prefix_candidates(self, prefix):
+        """
+        Airport ids having a word that starts with ``prefix``.
+
+        At most MAX_PREFIX_CANDIDATES ids are kept. They are collected by
+        rank (code, city, name/country, then any word prefix) and in list
+        order within a rank, so the cap only drops matches that would rank
+        below every kept one.
+        """
+        ids = set()
+        # Field indexes per rank: code, city, then name or country
+        for fields in ((0,), (1,), (2, 3)):
+            matches = {
+                airport_id
+                for field in fields
+                for airport_id in self._field_prefix_ids(field, prefix)
+                if airport_id not in ids
+            }
+            room = MAX_PREFIX_CANDIDATES - len(ids)
+            ids.update(heapq.nsmallest(room, matches))
+            if len(ids) >= MAX_PREFIX_CANDIDATES:
+                return ids
+
+        for airport_id in self._word_prefix_ids(prefix):
+            ids.add(airport_id)
+            if len(ids) >= MAX_PREFIX_CANDIDATES:
+                break
+        return ids
+
+    def _substring_candidates(self, query):
+        """Airport ids whose fields contain every trigram of ``query``."""
+        postings = []
+        for gram in _trigrams(query):
+            ids = self._trigram_ids.get(gram)
+            if not ids:
+                return set()
+            postings.append(ids)
+        postings.sort(key=len)
+        ids = set(postings[0])
+        for other in postings[1:]:
+            ids.intersection_update(other)
+            if not ids:
+                break
+        return ids
+
+    def _typo_candidates(self, query):
+        """Airport ids having a word within one edit of a query word."""
+        ids = set()
+        for word in _TOKEN_RE.findall(query):
+            if len(word) < 4:
+                continue
+            matches = set()
+            for variant in _deletes(word) | {word}:
+                matches |= self._typo_tokens.get(variant, set())
+            for token in matches:
+                ids.update(self._token_ids[token])
+        return ids
+
+    def _rank(self, query, query_words, airport_id):
+        code, city, name, country = self._fields[airport_id]
+        if code == query:
+            return 0
+        if code.startswith(query):
+            return 1
+        if city.startswith(query):
+            return 2
+        if name.startswith(query) or country.startswith(query):
+            return 3
+        if query_words and query_words in self._words[airport_id]:
+            return 4
+        if query in code or query in city or query in name or query in country:
+            return 5
+        return 6
+
+    def search(self, query, limit=DEFAULT_SEARCH_LIMIT):
+        """
+        Search airports, best matches first.
+
+        Args:
+            query (str): Search text (code, city, airport name or country)
+            limit (int): Maximum number of results (None for all)
+
+        Returns:
+            list: Matching airport dictionaries ordered by relevance
+        """
+        query = _normalize(query).strip()
+        if not query:
+            return []
+
+        candidates = set(self._codes.get(query, ()))
+        candidates |= self._prefix_candidates(query)
+
+        # Substring and typo matches rank below prefixes, so they are only
+        # needed when the prefix matches don't fill the list
+        if len(query) >= 3 and (limit is None or len(candidates) < limit):
+            candidates |= self._substring_candidates(query)
+        if limit is None or len(candidates) < limit:
+            candidates |= self._typo_candidates(query)
+
+        words = _TOKEN_RE.findall(query)
+        query_words = " " + " ".join(words) if words else ""
+        ranked = sorted(
+            (self._rank(query, query_words, airport_id), airport_id)
+            for airport_id in candidates
+        )
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [self.table.row(airport_id) for _, airport_id in ranked]
+
+
+_search_index = None
+_search_index_lock = threading.Lock()
+
+
+def get_search_index():
+    """
+    Return the shared airport search index, building it on first use.
 
+    Returns:
+        AirportIndex: Index over the shared airport table
+    """
+    global _search_index
+    if _search_index is None:
+        with _search_index_lock:
+            if _search_index is None:
+                _search_index = AirportIndex(get_airport_table())
+    return _search_index
 
-def search_airports(query):
+
+def search_airports(query, limit=DEFAULT_SEARCH_LIMIT):
     """
     Search airports by name, city, country or code.
 
+    Exact IATA matches come first, then prefix matches, then substring
+    matches; words of four or more letters also match with one typo.
+    Queries shorter than three characters only match code and word
+    prefixes.
+
     Args:
         query (str): Search query string
+        limit (int): Maximum number of results (None for all)
 
     Returns:
-        list: List of matching airport dictionaries
+        list: List of matching airport dictionaries, best match first
     """
-    query = query.lower()
-    results = []
-
-    for airport in COMMON_AIRPORTS:
-        if (
-            query in airport["name"].lower()
-            or query in airport["city"].lower()
-            or query in airport["country"].lower()
-            or query in airport["code"].lower()
-        ):
-            results.append(airport)
-
-    return results
+    return get_search_index().search(query, limit=limit)
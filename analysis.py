@@ -0,0 +1,109 @@
+"""
+Flight analysis without any web dependencies.
+
+``analyze()`` is the reference implementation of the analysis; the results
+page, the JSON APIs and ``batch.py`` compute the same output with the
+streaming ``aggregate.FlightAggregator``. It only needs the standard
+library (plus numpy for the optional columnar backend, imported on first
+use), so scripts and short-lived workers can import it without loading
+Flask or requests.
+"""
+
+import os
+from collections import Counter, defaultdict
+
+from sketch import QuantileSketch, distribution_stats, empty_stats
+
+# Engine for analyze(): "python" or "numpy" (columnar, needs numpy installed);
+# the app and batch jobs use FlightAggregator regardless
+ANALYSIS_BACKEND = os.environ.get("ANALYSIS_BACKEND", "python")
+
+
+def analyze(data, backend=None):
+    """
+    Analyze flight data using Python data structures.
+
+    Args:
+        data (list): List of flight dictionaries
+        backend (str): "python" (default) or "numpy" for the columnar engine;
+            falls back to the ANALYSIS_BACKEND environment variable
+
+    Returns:
+        dict: Dictionary containing analysis results
+    """
+    backend = backend or ANALYSIS_BACKEND
+    if backend == "numpy":
+        from columnar import analyze_columnar
+
+        return analyze_columnar(data)
+    if backend != "python":
+        raise ValueError(f"Unknown analysis backend: {backend}")
+
+    if not data:
+        quantiles, distribution = empty_stats()
+        return {
+            "top_routes": [],
+            "price_trends": [],
+            "summary": {
+                "total_routes": 0,
+                "avg_price": 0,
+                "min_price": 0,
+                "max_price": 0,
+                **quantiles,
+            },
+            "distribution": distribution,
+        }
+
+    # Count routes
+    route_counter = Counter()
+    for flight in data:
+        route = (flight["origin"], flight["destination"])
+        route_counter[route] += 1
+
+    # Top routes by frequency
+    top_routes = []
+    for (origin, destination), count in route_counter.most_common(10):
+        top_routes.append(
+            {"origin": origin, "destination": destination, "count": count}
+        )
+
+    # Price trends over time
+    date_prices = defaultdict(list)
+    for flight in data:
+        date = flight["depart_date"]
+        date_prices[date].append(flight["price"])
+
+    price_trends = []
+    for date, prices in date_prices.items():
+        avg_price = sum(prices) / len(prices) if prices else 0
+        price_trends.append({"depart_date": date, "price": round(avg_price, 2)})
+
+    # Sort price trends by date
+    price_trends.sort(key=lambda x: x["depart_date"])
+
+    # Summary statistics
+    prices = [flight["price"] for flight in data]
+    summary = {
+        "total_routes": len(data),
+        "avg_price": round(sum(prices) / len(prices), 2) if prices else 0,
+        "min_price": min(prices) if prices else 0,
+        "max_price": max(prices) if prices else 0,
+    }
+
+    # Percentiles from mergeable sketches rather than sorting every price
+    route_sketches = defaultdict(QuantileSketch)
+    date_sketches = defaultdict(QuantileSketch)
+    for flight in data:
+        route_sketches[(flight["origin"], flight["destination"])].add(flight["price"])
+        date_sketches[flight["depart_date"]].add(flight["price"])
+    quantiles, distribution = distribution_stats(
+        route_sketches, date_sketches, top_routes
+    )
+    summary.update(quantiles)
+
+    return {
+        "top_routes": top_routes,
+        "price_trends": price_trends,
+        "summary": summary,
+        "distribution": distribution,
+    }
@@ -5,20 +5,286 @@
 import os
 import json
 import requests
-import re
-from datetime import datetime, timedelta
-from collections import defaultdict, Counter
-from flask import Flask, render_template, request, jsonify
-from bs4 import BeautifulSoup
-from airports import COMMON_AIRPORTS, search_airports, get_airport_by_code
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from datetime import date, datetime, timedelta
+from flask import (
+    g,
+    Blueprint,
+    Flask,
+    Response,
+    jsonify,
+    render_template,
+    request,
+    stream_with_context,
+)
+from airports import (
+    COMMON_AIRPORTS,
+    get_airport_by_code,
+    get_airport_table,
+    get_search_index,
+    search_airports,
+)
+from analysis import analyze
+import http_cache
+import metrics
+import upstream
+from cache import TTLCache
+from aggregate import FlightAggregator
+from singleflight import SingleFlight
+from ai_format import StreamingFormatter, format_answer
+from ai_cache import AnswerCache
+from downsample import DOWNSAMPLE_MODES, downsample_trends
+from fare_store import FareStore
+from ratelimit import TokenBucket
+from records import chain_flights, to_records
+from scheduler import PrefetchScheduler, parse_jobs
+from synthetic import FareGenerator
+
+# Default location of local data files, independent of the working directory
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # Set API key (use environment variable if available, otherwise use demo)
 API_KEY = os.environ.get("API_KEY", "demo")  # Default to demo key if not provided
 
-app = Flask(__name__)
+# Travelpayouts fare API; each call returns at most API_PAGE_LIMIT rows
+API_BASE_URL = "https://api.travelpayouts.com/v2/prices/latest"
+API_PAGE_LIMIT = 100
+
+# Wide date ranges are split into shards fetched concurrently
+FETCH_SHARD_DAYS = int(os.environ.get("FETCH_SHARD_DAYS", "14"))
+FETCH_MAX_PAGES = int(os.environ.get("FETCH_MAX_PAGES", "5"))
+FETCH_MAX_WORKERS = int(os.environ.get("FETCH_MAX_WORKERS", "4"))
+FETCH_DEADLINE = float(os.environ.get("FETCH_DEADLINE", "25"))
+
+# /results pipeline: API fetch and fallback generation run side by side
+MIN_API_RESULTS = 10
+RESULTS_DEADLINE = float(os.environ.get("RESULTS_DEADLINE", "30"))
+RESULTS_POOL_SIZE = int(
+    os.environ.get("RESULTS_POOL_SIZE", str(2 * upstream.default_pool_size()))
+)
+_results_pool = ThreadPoolExecutor(
+    max_workers=RESULTS_POOL_SIZE, thread_name_prefix="results"
+)
+
+# /api/compare: searches per request and how many run at once
+COMPARE_MAX_QUERIES = int(os.environ.get("COMPARE_MAX_QUERIES", "12"))
+COMPARE_MAX_WORKERS = int(os.environ.get("COMPARE_MAX_WORKERS", "4"))
+_compare_pool = ThreadPoolExecutor(
+    max_workers=COMPARE_MAX_WORKERS, thread_name_prefix="compare"
+)
+
+# Identical concurrent searches share one fetch + analysis
+COALESCE_TIMEOUT = float(os.environ.get("COALESCE_TIMEOUT", str(RESULTS_DEADLINE)))
+search_flights_inflight = SingleFlight()
+
+# OpenRouter chat completions for the AI assistant
+AI_API_URL = "https://openrouter.ai/api/v1/chat/completions"
+AI_MODEL = "qwen/qwen3-235b-a22b-07-25:free"
+AI_KEY_MISSING_HTML = (
+    "<p>AI API key not configured. Please add AI_KEY to your .env file.</p>"
+)
+AI_UNAVAILABLE_HTML = (
+    "<p>The AI assistant is temporarily unavailable. Please try again in a "
+    "minute.</p>"
+)
+
+# Cache of formatted AI answers keyed by normalized question
+AI_CACHE_PATH = os.environ.get(
+    "AI_CACHE_PATH", os.path.join(APP_DIR, "ai_cache.sqlite3")
+)
+AI_CACHE_TTL = int(os.environ.get("AI_CACHE_TTL", "86400"))
+AI_CACHE_MAX_ENTRIES = int(os.environ.get("AI_CACHE_MAX_ENTRIES", "5000"))
+AI_CACHE_TOKEN_SET = os.environ.get("AI_CACHE_TOKEN_SET", "") == "1"
+
+ai_cache = AnswerCache(
+    path=AI_CACHE_PATH or None,
+    ttl=AI_CACHE_TTL,
+    max_entries=AI_CACHE_MAX_ENTRIES,
+    token_set=AI_CACHE_TOKEN_SET,
+    namespace=AI_MODEL,
+    # A missing or read-only cache file only costs the disk tier
+    on_error=lambda e: ERRORS.inc("ai_cache"),
+)
+
+# Browsers and dashboards may reuse /api/analysis responses this long
+ANALYSIS_MAX_AGE = int(os.environ.get("ANALYSIS_MAX_AGE", "60"))
+
+# Per /api/analysis query: (data version, body digest, body size) of the
+# last response, so unchanged polls get a 304 before any search runs
+_analysis_validators = TTLCache(ttl=3600, max_entries=1024)
+
+# Price trend charts are downsampled to at most this many points by default
+CHART_MAX_POINTS = int(os.environ.get("CHART_MAX_POINTS", "366"))
+
+# Fare cache settings: fares from /v2/prices/latest only change every few minutes
+FARE_CACHE_TTL = int(os.environ.get("FARE_CACHE_TTL", "300"))
+FARE_CACHE_STALE_TTL = int(os.environ.get("FARE_CACHE_STALE_TTL", "600"))
+FARE_CACHE_MAX_ENTRIES = int(os.environ.get("FARE_CACHE_MAX_ENTRIES", "1024"))
+
+fare_cache = TTLCache(
+    ttl=FARE_CACHE_TTL,
+    max_entries=FARE_CACHE_MAX_ENTRIES,
+    stale_ttl=FARE_CACHE_STALE_TTL,
+)
+
+# Fallback fares: deterministic across workers and restarts
+SYNTHETIC_SEED = int(os.environ.get("SYNTHETIC_SEED", "0"))
+SYNTHETIC_DISTRIBUTION = os.environ.get("SYNTHETIC_DISTRIBUTION", "uniform")
+FALLBACK_DESTINATIONS = ["JFK", "LAX", "LHR", "CDG", "SYD"]
+
+fare_generator = FareGenerator(
+    seed=SYNTHETIC_SEED, distribution=SYNTHETIC_DISTRIBUTION, as_records=True
+)
+
+# Append-only history of every fare fetched from the API (empty to disable)
+FARE_STORE_PATH = os.environ.get(
+    "FARE_STORE_PATH", os.path.join(APP_DIR, "fares.sqlite3")
+)
+fare_store = FareStore(FARE_STORE_PATH) if FARE_STORE_PATH else None
+
+# Background prefetch of hot routes, e.g. "ATL:ANY:30,LHR:ANY:30,HND:ANY:30"
+# (ORIGIN[:DEST[:DAYS[:OFFSET]]], window starting OFFSET days from today)
+PREFETCH_ROUTES = os.environ.get("PREFETCH_ROUTES", "")
+PREFETCH_INTERVAL = float(os.environ.get("PREFETCH_INTERVAL", "900"))
+PREFETCH_WORKERS = int(os.environ.get("PREFETCH_WORKERS", "2"))
+# Upstream requests per minute the prefetcher may spend, per process (each
+# gunicorn worker runs its own scheduler); routes costing more than one
+# minute's budget are rejected at startup
+PREFETCH_RATE = float(os.environ.get("PREFETCH_RATE", "30"))
+
+# Metrics exposed at /metrics (METRICS_ENABLED=0 turns them off)
+RESULTS_SOURCES = metrics.registry.counter(
+    "skytrends_results_total", "Searches answered, by data source", ["source"]
+)
+ERRORS = metrics.registry.counter(
+    "skytrends_errors_total", "Handled errors, by component", ["component"]
+)
+AI_SECONDS = metrics.registry.histogram(
+    "skytrends_ai_request_seconds",
+    "Duration of AI completions",
+    ["mode", "outcome"],
+)
+HTTP_SECONDS = metrics.registry.histogram(
+    "skytrends_http_request_seconds",
+    "Request handling time",
+    ["endpoint", "method", "status"],
+)
+# Read from the caches' in-memory counters; a scrape never opens SQLite
+metrics.registry.callback_counter(
+    "skytrends_cache_events_total",
+    "Cache lookups since start, by cache and outcome",
+    lambda: {
+        (name, event): counts[event]
+        for name, counts in (
+            ("fare", fare_cache.stats()),
+            ("ai", ai_cache.counts()),
+        )
+        for event in ("hits", "misses", "stale_hits", "memory_hits", "disk_hits")
+        if event in counts
+    },
+    ["cache", "event"],
+)
+metrics.registry.callback_counter(
+    "skytrends_coalesced_searches_total",
+    "Searches that shared an identical in-flight search",
+    lambda: search_flights_inflight.stats()["coalesced"],
+)
+
+# Routes and request hooks; attached to an app by create_app()
+bp = Blueprint("main", __name__)
+
+
+def prefetch_fares(origin, destination, start_date, end_date):
+    """
+    Load fares for a prefetch rollup straight from the API.
+
+    The API result also refreshes the fare cache and the fare store. Fewer
+    than ``MIN_API_RESULTS`` rows are topped up with generated fares, as a
+    live search would be.
+
+    Raises:
+        RuntimeError: If the API returned nothing, so the old rollup stays
+    """
+    data = fetch_and_record(origin, destination, start_date, end_date)
+    if not data:
+        raise RuntimeError("no API data")
+    fare_cache.set((origin, destination, start_date, end_date), data)
+    if len(data) < MIN_API_RESULTS:
+        # Topped up like a live search (see gather_flight_data)
+        fallback = scrape_backup(origin, destination, start_date, end_date)
+        return chain_flights(data, fallback), "API and generated data"
+    return data, "API data"
+
+
+def prefetch_cost(start_date, end_date):
+    """Most upstream requests one prefetch refresh can make (every page)."""
+    return len(date_shards(start_date, end_date)) * FETCH_MAX_PAGES
+
+
+prefetch_scheduler = (
+    PrefetchScheduler(
+        parse_jobs(PREFETCH_ROUTES),
+        prefetch_fares,
+        interval=PREFETCH_INTERVAL,
+        workers=PREFETCH_WORKERS,
+        budget=TokenBucket(PREFETCH_RATE / 60, capacity=PREFETCH_RATE),
+        cost=prefetch_cost,
+    )
+    if PREFETCH_ROUTES
+    else None
+)
+
+
+@bp.before_app_request
+def start_prefetch():
+    """Start the prefetch scheduler in this worker on its first request."""
+    if prefetch_scheduler is not None:
+        prefetch_scheduler.start()
+
+
+@bp.before_app_request
+def start_timing():
+    """Start collecting per-stage timings for this request."""
+    if metrics.registry.enabled:
+        g.request_started = time.perf_counter()
+        metrics.start_request()
+
+
+@bp.after_app_request
+def add_server_timing(response):
+    """Report stage timings in a Server-Timing header and record metrics."""
+    started = g.get("request_started")
+    if started is None:
+        return response
+
+    elapsed = time.perf_counter() - started
+    HTTP_SECONDS.observe(
+        elapsed,
+        # Without the blueprint prefix, so labels match the view names
+        (request.endpoint or "unknown").rpartition(".")[2],
+        request.method,
+        str(response.status_code),
+    )
+    if not response.is_streamed:
+        response.headers["Server-Timing"] = metrics.server_timing_header(
+            metrics.request_timings(), elapsed
+        )
+    return response
+
+
+@bp.route("/metrics")
+def metrics_endpoint():
+    """Expose metrics in the Prometheus text format."""
+    if not metrics.registry.enabled:
+        return Response("Metrics are disabled\n", status=404, mimetype="text/plain")
+    return Response(
+        metrics.registry.render(), mimetype="text/plain; version=0.0.4; charset=utf-8"
+    )
 
 
-@app.context_processor
+@bp.app_context_processor
 def inject_context():
     """Add common variables to all template contexts."""
     from datetime import datetime
@@ -29,10 +295,91 @@ def inject_context():
     }
 
 
+def date_shards(start_date, end_date, days=None):
+    """
+    Split an inclusive date range into consecutive windows.
+
+    Args:
+        start_date (str): Start date in YYYY-MM-DD format
+        end_date (str): End date in YYYY-MM-DD format
+        days (int): Maximum length of each window (default FETCH_SHARD_DAYS)
+
+    Returns:
+        list: List of (start, end) date string tuples covering the range
+    """
+    days = days or FETCH_SHARD_DAYS
+    start = datetime.strptime(start_date, "%Y-%m-%d")
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+
+    shards = []
+    while start <= end:
+        shard_end = min(start + timedelta(days=days - 1), end)
+        shards.append((start.strftime("%Y-%m-%d"), shard_end.strftime("%Y-%m-%d")))
+        start = shard_end + timedelta(days=1)
+    return shards
+
+
+def _fare_key(flight):
+    """Identity of a fare, used to drop duplicates across shards and pages."""
+    return (
+        flight.get("origin"),
+        flight.get("destination"),
+        flight.get("depart_date"),
+        flight.get("return_date"),
+        flight.get("price", flight.get("value")),
+        flight.get("airline", flight.get("gate")),
+        flight.get("flight_number"),
+    )
+
+
+def _fetch_shard(params, start_date, end_date, deadline):
+    """
+    Fetch every page of one date shard, stopping at the deadline.
+
+    Args:
+        params (dict): Base query parameters
+        start_date (str): Shard start date in YYYY-MM-DD format
+        end_date (str): Shard end date in YYYY-MM-DD format
+        deadline (float): ``time.monotonic()`` value to stop paging at
+
+    Returns:
+        list: List of flight dictionaries (partial if a page failed)
+    """
+    rows = []
+    for page in range(1, FETCH_MAX_PAGES + 1):
+        if page > 1 and time.monotonic() >= deadline:
+            break
+
+        page_params = dict(
+            params, beginning_of_period=start_date, end_of_period=end_date
+        )
+        if page > 1:
+            page_params["page"] = page
+
+        try:
+            response = upstream.get(API_BASE_URL, params=page_params)
+            response.raise_for_status()
+            data = response.json().get("data", [])
+        except requests.exceptions.RequestException as e:
+            print(f"API Error ({start_date}..{end_date}, page {page}): {e}")
+            break
+
+        # Compact records from here on; API "value"/"gate" become price/airline
+        rows.extend(to_records(data))
+        if len(data) < API_PAGE_LIMIT:
+            break
+    return rows
+
+
 def fetch_api_data(origin, destination, start_date, end_date):
     """
     Fetch flight data from Travelpayouts API.
 
+    The API returns at most ``API_PAGE_LIMIT`` rows per call, so wide date
+    ranges are split into ``FETCH_SHARD_DAYS`` shards that are paged and
+    fetched concurrently. Shards still running at the ``FETCH_DEADLINE``
+    are dropped and whatever arrived in time is returned.
+
     Args:
         origin (str): Origin IATA code
         destination (str): Destination IATA code (or "ANY")
@@ -40,17 +387,13 @@ def fetch_api_data(origin, destination, start_date, end_date):
         end_date (str): End date in YYYY-MM-DD format
 
     Returns:
-        list: List of flight dictionaries
+        list: List of de-duplicated flight dictionaries (empty if
+            start_date is after end_date)
     """
-    # Use Travelpayouts API for flight prices
-    base_url = "https://api.travelpayouts.com/v2/prices/latest"
-
     params = {
         "origin": origin,
         "period_type": "range",
-        "beginning_of_period": start_date,
-        "end_of_period": end_date,
-        "limit": 100,
+        "limit": API_PAGE_LIMIT,
         "token": API_KEY,
     }
 
@@ -58,14 +401,87 @@ def fetch_api_data(origin, destination, start_date, end_date):
     if destination and destination.upper() != "ANY":
         params["destination"] = destination
 
-    try:
-        response = requests.get(base_url, params=params)
-        response.raise_for_status()
-        data = response.json()
-        return data.get("data", [])
-    except requests.exceptions.RequestException as e:
-        print(f"API Error: {e}")
+    deadline = time.monotonic() + FETCH_DEADLINE
+    shards = date_shards(start_date, end_date)
+
+    if not shards:
+        # An empty range (start after end) has nothing to fetch
         return []
+    if len(shards) == 1:
+        shard_rows = [_fetch_shard(params, start_date, end_date, deadline)]
+    else:
+        executor = ThreadPoolExecutor(
+            max_workers=min(FETCH_MAX_WORKERS, len(shards)),
+            thread_name_prefix="fare-fetch",
+        )
+        futures = [
+            executor.submit(_fetch_shard, params, shard_start, shard_end, deadline)
+            for shard_start, shard_end in shards
+        ]
+        done, not_done = wait(futures, timeout=max(0, deadline - time.monotonic()))
+        executor.shutdown(wait=False, cancel_futures=True)
+        if not_done:
+            print(f"API Error: {len(not_done)} of {len(shards)} shards missed deadline")
+
+        # Keep shard order so results are stable between calls
+        shard_rows = [f.result() for f in futures if f in done]
+
+    seen = set()
+    data = []
+    for rows in shard_rows:
+        for flight in rows:
+            key = _fare_key(flight)
+            if key not in seen:
+                seen.add(key)
+                data.append(flight)
+    return data
+
+
+def fetch_fares(origin, destination, start_date, end_date):
+    """
+    Fetch flight data through the in-process fare cache.
+
+    Identical searches within ``FARE_CACHE_TTL`` seconds are answered from
+    memory; slightly older entries are served while being refreshed in the
+    background. Empty results (e.g. after an API error) are not cached.
+    Every upstream fetch is also appended to the local fare store.
+
+    Args:
+        origin (str): Origin IATA code
+        destination (str): Destination IATA code (or "ANY")
+        start_date (str): Start date in YYYY-MM-DD format
+        end_date (str): End date in YYYY-MM-DD format
+
+    Returns:
+        list: List of flight dictionaries
+    """
+    key = (origin, (destination or "ANY").upper(), start_date, end_date)
+    return fare_cache.get_or_load(
+        key, lambda: fetch_and_record(origin, destination, start_date, end_date)
+    )
+
+
+def fetch_and_record(origin, destination, start_date, end_date):
+    """
+    Fetch flight data from the API and append it to the fare store.
+
+    Args:
+        origin (str): Origin IATA code
+        destination (str): Destination IATA code (or "ANY")
+        start_date (str): Start date in YYYY-MM-DD format
+        end_date (str): End date in YYYY-MM-DD format
+
+    Returns:
+        list: List of flight dictionaries
+    """
+    data = fetch_api_data(origin, destination, start_date, end_date)
+    if data and fare_store is not None:
+        try:
+            fare_store.insert_many(data)
+        except Exception as e:
+            ERRORS.inc("fare_store")
+            print(f"Fare store error: {str(e)}")
+    return data
 
 
 def scrape_backup(origin, destination, start_date, end_date):
@@ -79,116 +495,165 @@ def scrape_backup(origin, destination, start_date, end_date):
         end_date (str): End date in YYYY-MM-DD format
 
     Returns:
-        list: List of flight dictionaries
+        list: ``records.Flight`` records (``fare_generator`` is built with
+            ``as_records=True``)
     """
     # This is a fallback function that would normally scrape a website
-    # For demo purposes, we'll return some sample data
-    sample_data = []
-
-    # Generate some sample data if API returned nothing
+    # For demo purposes, we'll return generated sample data
     if destination.upper() == "ANY":
-        destinations = ["JFK", "LAX", "LHR", "CDG", "SYD"]
+        destinations = FALLBACK_DESTINATIONS
     else:
         destinations = [destination]
 
-    start = datetime.strptime(start_date, "%Y-%m-%d")
-    end = datetime.strptime(end_date, "%Y-%m-%d")
-    days = (end - start).days + 1
+    return fare_generator.generate(origin, destinations, start_date, end_date)
 
-    for dest in destinations:
-        for i in range(days):
-            current_date = start + timedelta(days=i)
-            date_str = current_date.strftime("%Y-%m-%d")
-            price = 200 + (
-                hash(f"{origin}{dest}{date_str}") % 300
-            )  # Random but consistent price
 
-            sample_data.append(
-                {
-                    "origin": origin,
-                    "destination": dest,
-                    "depart_date": date_str,
-                    "return_date": (current_date + timedelta(days=7)).strftime(
-                        "%Y-%m-%d"
-                    ),
-                    "price": price,
-                    "airline": "DEMO",
-                    "flight_number": f"DM{100 + i}",
-                    "source": "scraper",
-                }
-            )
+def gather_flight_data(origin, destination, start_date, end_date, deadline=None):
+    """
+    Collect flight data for a search, overlapping the API fetch and fallback.
 
-    return sample_data
+    The fallback (``scrape_backup``) starts speculatively next to the API
+    fetch instead of after it. If the API returns at least
+    ``MIN_API_RESULTS`` rows the fallback is cancelled (or its result
+    ignored); otherwise both are combined. Either way the whole pipeline is
+    bounded by ``RESULTS_DEADLINE`` seconds; an API call still running at
+    the deadline keeps going in the background and fills the fare cache.
 
+    Args:
+        origin (str): Origin IATA code
+        destination (str): Destination IATA code (or "ANY")
+        start_date (str): Start date in YYYY-MM-DD format
+        end_date (str): End date in YYYY-MM-DD format
+        deadline (float): Overall time budget in seconds
 
-def analyze(data):
+    Returns:
+        tuple: (FlightAggregator, data source description)
     """
-    Analyze flight data using Python data structures.
+    budget = RESULTS_DEADLINE if deadline is None else deadline
+    deadline_at = time.monotonic() + budget
+
+    api_future = _results_pool.submit(
+        fetch_fares, origin, destination, start_date, end_date
+    )
+    fallback_future = _results_pool.submit(
+        scrape_backup, origin, destination, start_date, end_date
+    )
+
+    api_data = None
+    try:
+        with metrics.timer("fetch"):
+            api_data = api_future.result(timeout=budget)
+    except FuturesTimeoutError:
+        ERRORS.inc("fetch_deadline")
+        print(f"API Error: no response within {budget}s deadline")
+    except Exception as e:
+        # If API fails completely, use only scraped data
+        ERRORS.inc("fetch")
+        print(f"Error fetching API data: {e}")
+
+    if api_data is not None and len(api_data) >= MIN_API_RESULTS:
+        fallback_future.cancel()
+        return FlightAggregator(api_data), "API data"
+
+    try:
+        remaining = max(0, deadline_at - time.monotonic())
+        with metrics.timer("fallback"):
+            fallback_data = fallback_future.result(timeout=remaining)
+    except Exception as e:
+        ERRORS.inc("fallback")
+        print(f"Error generating fallback data: {e}")
+        fallback_data = []
+
+    if api_data is None:
+        return FlightAggregator(fallback_data), "Generated data (API unavailable)"
+
+    # If API data is insufficient, supplement with scraped data
+    aggregator = FlightAggregator(chain_flights(api_data, fallback_data))
+    return aggregator, "API and generated data"
+
+
+def search_aggregate(origin, destination, start_date, end_date, deadline=None):
+    """
+    Fetch and analyze flight data for a search, coalescing identical ones.
+
+    Searches inside a prefetched hot-route window are answered from its
+    rollup. Concurrent searches for the same origin, destination and dates
+    share a single ``gather_flight_data`` run and analysis. Waiters give up after
+    ``COALESCE_TIMEOUT`` seconds and fall back to generated data rather
+    than starting another upstream fetch.
 
     Args:
-        data (list): List of flight dictionaries
+        origin (str): Origin IATA code
+        destination (str): Destination IATA code (or "ANY")
+        start_date (str): Start date in YYYY-MM-DD format
+        end_date (str): End date in YYYY-MM-DD format
+        deadline (float): Fetch time budget in seconds (default
+            RESULTS_DEADLINE)
 
     Returns:
-        dict: Dictionary containing analysis results
+        tuple: (FlightAggregator, analysis results dict, data source
+            description); the aggregator may be shared, merge it rather
+            than updating it
     """
-    if not data:
-        return {
-            "top_routes": [],
-            "price_trends": [],
-            "summary": {
-                "total_routes": 0,
-                "avg_price": 0,
-                "min_price": 0,
-                "max_price": 0,
-            },
-        }
+    if prefetch_scheduler is not None:
+        prefetched = prefetch_scheduler.lookup_aggregate(
+            origin, destination, start_date, end_date
+        )
+        if prefetched is not None:
+            RESULTS_SOURCES.inc(prefetched[2])
+            return prefetched
 
-    # Count routes
-    route_counter = Counter()
-    for flight in data:
-        route = (flight["origin"], flight["destination"])
-        route_counter[route] += 1
-
-    # Top routes by frequency
-    top_routes = []
-    for (origin, destination), count in route_counter.most_common(10):
-        top_routes.append(
-            {"origin": origin, "destination": destination, "count": count}
+    key = (origin, (destination or "ANY").upper(), start_date, end_date)
+
+    def run():
+        # Fetch API data with the fallback running speculatively alongside
+        aggregator, data_source = gather_flight_data(
+            origin, destination, start_date, end_date, deadline
         )
+        with metrics.timer("analyze"):
+            return aggregator, aggregator.result(), data_source
 
-    # Price trends over time
-    date_prices = defaultdict(list)
-    for flight in data:
-        date = flight["depart_date"]
-        date_prices[date].append(flight["price"])
-
-    price_trends = []
-    for date, prices in date_prices.items():
-        avg_price = sum(prices) / len(prices) if prices else 0
-        price_trends.append({"depart_date": date, "price": round(avg_price, 2)})
-
-    # Sort price trends by date
-    price_trends.sort(key=lambda x: x["depart_date"])
-
-    # Summary statistics
-    prices = [flight["price"] for flight in data]
-    summary = {
-        "total_routes": len(data),
-        "avg_price": round(sum(prices) / len(prices), 2) if prices else 0,
-        "min_price": min(prices) if prices else 0,
-        "max_price": max(prices) if prices else 0,
-    }
+    try:
+        with metrics.timer("search"):
+            result, _ = search_flights_inflight.do(key, run, timeout=COALESCE_TIMEOUT)
+    except TimeoutError:
+        ERRORS.inc("coalesce_timeout")
+        print(f"Timed out waiting for in-flight search {key}")
+        aggregator = FlightAggregator(
+            scrape_backup(origin, destination, start_date, end_date)
+        )
+        result = aggregator, aggregator.result(), "Generated data (API unavailable)"
+
+    RESULTS_SOURCES.inc(result[2])
+    return result
 
-    return {"top_routes": top_routes, "price_trends": price_trends, "summary": summary}
+
+def search_flights(origin, destination, start_date, end_date):
+    """
+    Fetch and analyze flight data for a search (see ``search_aggregate``).
+
+    Args:
+        origin (str): Origin IATA code
+        destination (str): Destination IATA code (or "ANY")
+        start_date (str): Start date in YYYY-MM-DD format
+        end_date (str): End date in YYYY-MM-DD format
+
+    Returns:
+        tuple: (analysis results dict, data source description)
+    """
+    _, results, data_source = search_aggregate(
+        origin, destination, start_date, end_date
+    )
+    return results, data_source
 
 
-@app.route("/")
+@bp.route("/")
 def index():
     """Render the home page with the search form."""
     return render_template("index.html", airports=COMMON_AIRPORTS)
 
 
-@app.route("/search_airport")
+@bp.route("/search_airport")
 def search_airport():
     """Search for airports based on query."""
     query = request.args.get("q", "")
@@ -217,7 +682,71 @@ def is_valid_search_input(origin, start_date, end_date):
     return has_origin and has_start_date and has_end_date
 
 
-@app.route("/results", methods=["POST"])
+def check_date_range(start_date, end_date):
+    """
+    Check that a search's dates parse and are in order.
+
+    Args:
+        start_date (str): Start date in YYYY-MM-DD format
+        end_date (str): End date in YYYY-MM-DD format
+
+    Raises:
+        ValueError: If a date is malformed or start_date is after end_date
+    """
+    try:
+        start = date.fromisoformat(start_date)
+        end = date.fromisoformat(end_date)
+    except ValueError:
+        raise ValueError("start_date and end_date must be YYYY-MM-DD dates") from None
+    if start > end:
+        raise ValueError("start_date must not be after end_date")
+
+
+def chart_options(values, default_points=None):
+    """
+    Read the price trend downsampling options of a request.
+
+    Args:
+        values (MultiDict): Request args or form
+        default_points (int): Target used when ``points`` is not given
+
+    Returns:
+        tuple: (points or None for no downsampling, mode)
+
+    Raises:
+        ValueError: If ``points`` or ``downsample`` is invalid
+    """
+    mode = values.get("downsample") or "lttb"
+    if mode not in DOWNSAMPLE_MODES:
+        raise ValueError(f"downsample must be one of {', '.join(DOWNSAMPLE_MODES)}")
+    points = values.get("points")
+    if not points:
+        return default_points, mode
+    if not points.isdigit() or int(points) < 3:
+        raise ValueError("points must be an integer of at least 3")
+    return int(points), mode
+
+
+def chart_bands(bands, trends, mode):
+    """
+    Keep the percentile bands for the dates of a downsampled series.
+
+    Args:
+        bands (list): ``distribution["bands"]`` of an analysis
+        trends (list): Downsampled ``price_trends``
+        mode (str): Downsampling mode used for ``trends``
+
+    Returns:
+        list: Bands on the kept dates; none for min/avg/max buckets, which
+            carry their own price range
+    """
+    if mode == "minmax":
+        return []
+    dates = {point["depart_date"] for point in trends}
+    return [band for band in bands if band["depart_date"] in dates]
+
+
+@bp.route("/results", methods=["POST"])
 def results():
     """Process form data and display results."""
     origin_code = request.form.get("origin", "").upper()
@@ -243,41 +772,368 @@ def results():
             "index.html", error="All fields except destination are required"
         )
 
-    # Fetch data from API
+    # Fetch and analyze, sharing the work with identical searches in flight
+    analysis_results, data_source = search_flights(
+        origin, destination, start_date, end_date
+    )
+
+    # Long ranges are downsampled for the chart; insights use every point
     try:
-        api_data = fetch_api_data(origin, destination, start_date, end_date)
+        points, mode = chart_options(request.values, CHART_MAX_POINTS)
+    except ValueError:
+        points, mode = CHART_MAX_POINTS, "lttb"
+    price_chart = downsample_trends(analysis_results["price_trends"], points, mode)
+    price_bands = chart_bands(
+        analysis_results["distribution"]["bands"], price_chart, mode
+    )
+
+    # Pass data to template
+    with metrics.timer("render"):
+        return render_template(
+            "results.html",
+            price_chart=price_chart,
+            price_bands=price_bands,
+            origin=origin,
+            destination=destination if destination else "ANY",
+            start_date=start_date,
+            end_date=end_date,
+            results=analysis_results,
+            data_source=data_source,
+        )
+
+
+@bp.route("/upstream/status")
+def upstream_status():
+    """Report circuit breaker and rate limit state per upstream host."""
+    return jsonify({"upstreams": upstream.guard_status()})
+
+
+@bp.route("/prefetch/status")
+def prefetch_status():
+    """Report when each prefetched route was last refreshed."""
+    if prefetch_scheduler is None:
+        return jsonify({"enabled": False, "routes": []})
+    return jsonify(
+        {
+            "enabled": True,
+            "interval": prefetch_scheduler.interval,
+            "max_age": prefetch_scheduler.max_age,
+            "budget_per_minute": PREFETCH_RATE,
+            "budget_available": round(prefetch_scheduler.budget.available(), 2),
+            "routes": prefetch_scheduler.status(),
+        }
+    )
+
+
+def search_version(origin, destination, start_date, end_date):
+    """
+    Cheap version of the data a search would return.
 
-        # If API data is insufficient, supplement with scraped data
-        if len(api_data) < 10:
-            scraped_data = scrape_backup(origin, destination, start_date, end_date)
-            combined_data = api_data + scraped_data
-            data_source = "API and generated data"
+    Built from the fresh fare cache entry and the prefetch rollups covering
+    the search; either changing means the search may return new data.
+    Generated fallback fares are deterministic, so they never change it.
+
+    Args:
+        origin (str): Origin IATA code
+        destination (str): Destination IATA code (or "ANY")
+        start_date (str): Start date in YYYY-MM-DD format
+        end_date (str): End date in YYYY-MM-DD format
+
+    Returns:
+        tuple: Version, or None if it can't be known without searching
+    """
+    fares = fare_cache.version((origin, destination, start_date, end_date))
+    rollups = (
+        prefetch_scheduler.version(origin, destination, start_date, end_date)
+        if prefetch_scheduler is not None
+        else ()
+    )
+    if fares is None and not rollups:
+        return None
+    return fares, rollups
+
+
+@bp.route("/api/analysis")
+def api_analysis():
+    """
+    Return the analysis for a search as JSON, for charts and dashboards.
+
+    Query parameters are the same as the /results form (origin,
+    destination, start_date, end_date), plus optional ``points`` and
+    ``downsample`` ("lttb" or "minmax") to reduce ``price_trends`` and the
+    percentile bands with it. Responses carry a strong ETag derived from
+    the analysis data; a matching ``If-None-Match`` gets an empty ``304 Not
+    Modified``, answered before searching while the data behind the last
+    response is unchanged (see ``search_version``). Bodies are brotli- or
+    gzip-compressed when the client accepts it.
+
+    Returns:
+        Response: JSON with query, data_source and results
+    """
+    origin = request.args.get("origin", "").upper()
+    destination = request.args.get("destination", "").upper() or "ANY"
+    start_date = request.args.get("start_date")
+    end_date = request.args.get("end_date")
+
+    if not is_valid_search_input(origin, start_date, end_date):
+        return (
+            jsonify({"error": "origin, start_date and end_date are required"}),
+            400,
+        )
+    try:
+        check_date_range(start_date, end_date)
+        points, mode = chart_options(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    headers = {
+        "Cache-Control": f"public, max-age={ANALYSIS_MAX_AGE}",
+        "Vary": "Accept-Encoding",
+    }
+    validator_key = (origin, destination, start_date, end_date, points, mode)
+    version = search_version(origin, destination, start_date, end_date)
+    if request.if_none_match:
+        known = _analysis_validators.get(validator_key)
+        if (
+            known is not None
+            and version is not None
+            and known[0] == version
+            and http_cache.matches(request.if_none_match, known[1])
+        ):
+            _, digest, size = known
+            encoding = http_cache.choose_encoding(request.accept_encodings, size)
+            headers["ETag"] = f'"{http_cache.etag_for(digest, encoding)}"'
+            return Response(status=304, headers=headers)
+
+    analysis_results, data_source = search_flights(
+        origin, destination, start_date, end_date
+    )
+    if points is not None:
+        price_trends = downsample_trends(analysis_results["price_trends"], points, mode)
+        distribution = analysis_results["distribution"]
+        analysis_results = dict(
+            analysis_results,
+            price_trends=price_trends,
+            distribution=dict(
+                distribution,
+                bands=chart_bands(distribution["bands"], price_trends, mode),
+            ),
+        )
+
+    with metrics.timer("encode"):
+        body = http_cache.json_body(
+            {
+                "query": {
+                    "origin": origin,
+                    "destination": destination,
+                    "start_date": start_date,
+                    "end_date": end_date,
+                },
+                "data_source": data_source,
+                "results": analysis_results,
+            }
+        )
+        digest = http_cache.body_digest(body)
+        encoding = http_cache.choose_encoding(request.accept_encodings, len(body))
+        # A refresh landing during the search (e.g. stale-while-revalidate)
+        # changes the version; the body may predate it, so don't vouch for it
+        if version is not None and version == search_version(
+            origin, destination, start_date, end_date
+        ):
+            _analysis_validators.set(validator_key, (version, digest, len(body)))
+
+        headers["ETag"] = f'"{http_cache.etag_for(digest, encoding)}"'
+        if http_cache.matches(request.if_none_match, digest):
+            return Response(status=304, headers=headers)
+
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(
+            http_cache.encode(body, digest, encoding),
+            mimetype="application/json",
+            headers=headers,
+        )
+
+
+def split_codes(value):
+    """Split a comma/space separated list of IATA codes, dropping repeats."""
+    codes = []
+    for code in value.replace(",", " ").split():
+        code = code.upper()
+        if code not in codes:
+            codes.append(code)
+    return codes
+
+
+def compare_searches(queries, start_date, end_date, deadline=None):
+    """
+    Run several searches concurrently and combine their analyses.
+
+    Each (origin, destination) query runs ``search_aggregate`` on the
+    bounded compare pool, so it is served from prefetch rollups and shares
+    in-flight searches like any other search, and a batch takes about as
+    long as its slowest search. Queries still running at the deadline are
+    reported as errors.
+
+    Args:
+        queries (list): (origin, destination) tuples
+        start_date (str): Start date in YYYY-MM-DD format
+        end_date (str): End date in YYYY-MM-DD format
+        deadline (float): Overall time budget in seconds
+
+    Returns:
+        tuple: (per-query result dicts, combined analysis)
+    """
+    budget = RESULTS_DEADLINE if deadline is None else deadline
+    futures = [
+        _compare_pool.submit(
+            search_aggregate, origin, destination, start_date, end_date, budget
+        )
+        for origin, destination in queries
+    ]
+    wait(futures, timeout=budget)
+
+    results = []
+    combined = FlightAggregator()
+    for (origin, destination), future in zip(queries, futures):
+        entry = {"origin": origin, "destination": destination}
+        if not future.done():
+            future.cancel()
+            ERRORS.inc("compare_deadline")
+            entry["error"] = f"no result within {budget}s"
+        elif future.exception() is not None:
+            ERRORS.inc("compare")
+            entry["error"] = str(future.exception())
         else:
-            combined_data = api_data
-            data_source = "API data"
-    except Exception as e:
-        # If API fails completely, use only scraped data
-        print(f"Error fetching API data: {e}")
-        scraped_data = scrape_backup(origin, destination, start_date, end_date)
-        combined_data = scraped_data
-        data_source = "Generated data (API unavailable)"
+            aggregator, analysis, data_source = future.result()
+            entry["data_source"] = data_source
+            entry["analysis"] = analysis
+            combined.merge(aggregator)
+        results.append(entry)
+    return results, combined.result()
 
-    # Analyze the data
-    analysis_results = analyze(combined_data)
 
-    # Pass data to template
-    return render_template(
-        "results.html",
-        origin=origin,
-        destination=destination if destination else "ANY",
-        start_date=start_date,
-        end_date=end_date,
-        results=analysis_results,
-        data_source=data_source,
+@bp.route("/api/compare")
+def api_compare():
+    """
+    Compare the same date window across several origins (and destinations).
+
+    Query parameters: ``origins`` (comma-separated IATA codes), optional
+    ``destinations`` (default ANY), ``start_date`` and ``end_date``. Every
+    origin/destination pair is searched concurrently.
+
+    Returns:
+        JSON with per-pair analyses, a ranking by average price and the
+        combined analysis of all pairs
+    """
+    origins = split_codes(request.args.get("origins", ""))
+    destinations = split_codes(request.args.get("destinations", "")) or ["ANY"]
+    start_date = request.args.get("start_date")
+    end_date = request.args.get("end_date")
+
+    if not origins or not is_valid_search_input(origins[0], start_date, end_date):
+        return (
+            jsonify({"error": "origins, start_date and end_date are required"}),
+            400,
+        )
+    try:
+        check_date_range(start_date, end_date)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    queries = [(origin, dest) for origin in origins for dest in destinations]
+    if len(queries) > COMPARE_MAX_QUERIES:
+        return (
+            jsonify(
+                {"error": f"At most {COMPARE_MAX_QUERIES} origin/destination pairs"}
+            ),
+            400,
+        )
+
+    with metrics.timer("compare"):
+        results, combined = compare_searches(queries, start_date, end_date)
+
+    ranking = sorted(
+        (
+            {
+                "origin": entry["origin"],
+                "destination": entry["destination"],
+                **entry["analysis"]["summary"],
+            }
+            for entry in results
+            if "analysis" in entry and entry["analysis"]["summary"]["total_routes"]
+        ),
+        key=lambda row: row["avg_price"],
     )
+    return jsonify(
+        {
+            "query": {
+                "origins": origins,
+                "destinations": destinations,
+                "start_date": start_date,
+                "end_date": end_date,
+            },
+            "results": results,
+            "ranking": ranking,
+            "combined": combined,
+        }
+    )
+
+
+def build_ai_request(question, ai_key, stream=False):
+    """
+    Build the OpenRouter chat completion request for a travel question.
+
+    Args:
+        question (str): The user's question
+        ai_key (str): OpenRouter API key
+        stream (bool): Ask for a streamed (server-sent events) completion
+
+    Returns:
+        tuple: (headers dict, JSON payload dict)
+    """
+    # Prepare prompt with travel context
+    prompt = f"""You are a travel and airline industry expert assistant. 
+        Answer the following question about travel, flights, or airline industry trends.
+        
+        Question: {question}
+        
+        Provide a helpful, informative response based on your knowledge of the airline industry, 
+        travel patterns, and flight pricing. Include specific insights when possible."""
+
+    # Call OpenRouter API with Qwen model
+    headers = {
+        "Authorization": f"Bearer {ai_key}",
+        "Content-Type": "application/json",
+    }
+
+    payload = {
+        "model": AI_MODEL,
+        "messages": [
+            {
+                "role": "system",
+                "content": "You are a travel and airline industry expert assistant.",
+            },
+            {"role": "user", "content": prompt},
+        ],
+        "max_tokens": 500,
+    }
+    if stream:
+        payload["stream"] = True
+
+    return headers, payload
 
 
-@app.route("/ask_ai", methods=["POST"])
+def question_html(question):
+    """Render the question header shown above an AI answer."""
+    return f"<div class='ai-question mb-3'><strong>Q: {question}</strong></div>"
+
+
+def answer_html(question, answer):
+    """Render a formatted answer with its question header."""
+    return f"{question_html(question)}<div class='ai-answer'>{answer}</div>"
+
+
+@bp.route("/ask_ai", methods=["POST"])
 def ask_ai():
     """
     Process AI questions about travel and flight data using OpenRouter API with Qwen model.
@@ -299,45 +1155,23 @@ def ask_ai():
         ai_key = os.environ.get("AI_KEY", "")
         if not ai_key:
             return (
-                jsonify(
-                    {
-                        "response": "<p>AI API key not configured. Please add AI_KEY to your .env file.</p>"
-                    }
-                ),
+                jsonify({"response": AI_KEY_MISSING_HTML}),
                 400,
             )
 
-        # Prepare prompt with travel context
-        prompt = f"""You are a travel and airline industry expert assistant. 
-        Answer the following question about travel, flights, or airline industry trends.
-        
-        Question: {question}
-        
-        Provide a helpful, informative response based on your knowledge of the airline industry, 
-        travel patterns, and flight pricing. Include specific insights when possible."""
-
-        # Call OpenRouter API with Qwen model
-        headers = {
-            "Authorization": f"Bearer {ai_key}",
-            "Content-Type": "application/json",
-        }
-
-        payload = {
-            "model": "qwen/qwen3-235b-a22b-07-25:free",
-            "messages": [
-                {
-                    "role": "system",
-                    "content": "You are a travel and airline industry expert assistant.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            "max_tokens": 500,
-        }
-
-        response = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers=headers,
-            json=payload,
+        # Common questions are answered from the cache
+        cached = ai_cache.get(question)
+        if cached is not None:
+            return jsonify({"response": answer_html(question, cached)})
+
+        headers, payload = build_ai_request(question, ai_key)
+        started = time.perf_counter()
+        with metrics.timer("ai"):
+            response = upstream.post(AI_API_URL, headers=headers, json=payload)
+        AI_SECONDS.observe(
+            time.perf_counter() - started,
+            "sync",
+            "ok" if response.status_code == 200 else "error",
         )
 
         if response.status_code == 200:
@@ -348,93 +1182,13 @@ def ask_ai():
                 .get("content", "")
             )
 
-            # Simple formatting for clean, readable responses like ChatGPT/Perplexity
-
-            # Step 1: Clean up the text and prepare for formatting
-            answer = answer.strip()
-
-            # Step 2: Convert markdown headings to HTML headings with proper styling
-            for i in range(3, 0, -1):
-                heading_marker = "#" * i
-                answer = re.sub(
-                    f"^{heading_marker}\s+(.+)$",
-                    f"<h{i+2}>\\1</h{i+2}>",
-                    answer,
-                    flags=re.MULTILINE,
-                )
-
-            # Step 3: Convert markdown bold to HTML strong tags
-            answer = re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", answer)
-
-            # Step 4: Format paragraphs properly
-            paragraphs = [p for p in re.split(r"\n\s*\n", answer) if p.strip()]
-            formatted_paragraphs = []
-
-            for p in paragraphs:
-                # Skip paragraphs that are already HTML elements
-                if p.strip().startswith("<") and ">" in p:
-                    formatted_paragraphs.append(p)
-                    continue
-
-                # Format bullet points
-                if re.search(r"^[-•]\s", p, re.MULTILINE):
-                    lines = p.split("\n")
-                    bullet_list = []
-                    for line in lines:
-                        if re.match(r"^[-•]\s", line):
-                            clean_line = re.sub(r"^[-•]\s", "", line)
-                            bullet_list.append(f"<li>{clean_line}</li>")
-                    formatted_paragraphs.append(
-                        f"<ul class='ai-list'>{''.join(bullet_list)}</ul>"
-                    )
-
-                # Format numbered lists
-                elif re.search(r"^\d+\.\s", p, re.MULTILINE):
-                    lines = p.split("\n")
-                    number_list = []
-                    for line in lines:
-                        if re.match(r"^\d+\.\s", line):
-                            clean_line = re.sub(r"^\d+\.\s", "", line)
-                            number_list.append(f"<li>{clean_line}</li>")
-                    formatted_paragraphs.append(
-                        f"<ol class='ai-list'>{''.join(number_list)}</ol>"
-                    )
-
-                # Regular paragraph
-                else:
-                    formatted_paragraphs.append(f"<p>{p}</p>")
-
-            answer = "\n".join(formatted_paragraphs)
-
-            # Step 5: Clean up any special characters or emojis with Bootstrap Icons
-            emoji_to_icon = {
-                # Weather icons
-                "🌤️": "sun",
-                "☀️": "sun-fill",
-                "🌧️": "cloud-rain",
-                "❄️": "snow",
-                # Travel icons
-                "✈️": "airplane",
-                "🛫": "airplane-fill",
-                "🚗": "car-front",
-                "🏨": "building",
-                # UI icons
-                "📅": "calendar",
-                "👉": "arrow-right-circle-fill",
-                "✅": "check-circle-fill",
-                "💰": "cash-coin",
-                "⭐": "star-fill",
-            }
-
-            # Replace emojis with their corresponding Bootstrap icons
-            for emoji, icon_name in emoji_to_icon.items():
-                css_class = "text-success" if icon_name in ["check-circle-fill"] else ""
-                css_class = "text-warning" if icon_name in ["star-fill"] else css_class
-                icon_html = f'<i class="bi bi-{icon_name} {css_class}"></i>'
-                answer = answer.replace(emoji, f" {icon_html} ")
+            # Format markdown, lists and emojis as HTML for the chat panel
+            answer = format_answer(answer)
+            if answer:
+                ai_cache.set(question, answer)
 
             # Format the response with proper HTML
-            formatted_answer = f"<div class='ai-question mb-3'><strong>Q: {question}</strong></div><div class='ai-answer'>{answer}</div>"
+            formatted_answer = answer_html(question, answer)
 
             return jsonify({"response": formatted_answer})
         else:
@@ -447,7 +1201,11 @@ def ask_ai():
                 response.status_code,
             )
 
+    except upstream.UpstreamUnavailable as e:
+        # Breaker open or quota used up: answer at once instead of waiting
+        return jsonify({"error": str(e), "response": AI_UNAVAILABLE_HTML}), 503
     except Exception as e:
+        ERRORS.inc("ask_ai")
         return (
             jsonify(
                 {
@@ -459,5 +1217,165 @@ def ask_ai():
         )
 
 
+def sse_event(event, data):
+    """Encode one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def iter_completion_deltas(response):
+    """
+    Yield content deltas from a streamed OpenRouter chat completion.
+
+    Args:
+        response (requests.Response): Response opened with ``stream=True``
+
+    Yields:
+        str: Pieces of the answer text as they arrive
+    """
+    # The body is UTF-8 but event-stream responses carry no charset, so
+    # requests would decode it as ISO-8859-1; split the raw bytes on line
+    # endings and decode each line instead
+    for raw in response.iter_lines():
+        line = raw.decode("utf-8")
+        # Blank keep-alive lines and ": comment" lines carry no data
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[len("data:") :].strip()
+        if data == "[DONE]":
+            break
+        chunk = json.loads(data)
+        delta = chunk.get("choices", [{}])[0].get("delta", {}).get("content")
+        if delta:
+            yield delta
+
+
+@bp.route("/ask_ai/stream", methods=["POST"])
+def ask_ai_stream():
+    """
+    Stream an AI answer to the browser as server-sent events.
+
+    Takes the same JSON body as ``/ask_ai`` but requests a streamed
+    completion upstream and relays it while it is generated:
+
+        event: start  {"header": question HTML}
+        event: chunk  {"html": newly completed paragraphs, "pending": raw tail}
+        event: done   {"response": full HTML, same as /ask_ai}
+        event: error  {"response": error HTML}
+
+    Returns:
+        Response: ``text/event-stream`` response
+    """
+    data = request.get_json(silent=True) or {}
+    question = data.get("question", "")
+    ai_key = os.environ.get("AI_KEY", "")
+
+    def generate():
+        if not ai_key:
+            yield sse_event("error", {"response": AI_KEY_MISSING_HTML})
+            return
+
+        yield sse_event("start", {"header": question_html(question)})
+
+        try:
+            cached = ai_cache.get(question)
+            if cached is not None:
+                yield sse_event(
+                    "done",
+                    {"response": answer_html(question, cached)},
+                )
+                return
+
+            headers, payload = build_ai_request(question, ai_key, stream=True)
+            started = time.perf_counter()
+            response = upstream.post(
+                AI_API_URL, headers=headers, json=payload, stream=True
+            )
+            with response:
+                if response.status_code != 200:
+                    AI_SECONDS.observe(time.perf_counter() - started, "stream", "error")
+                    yield sse_event(
+                        "error",
+                        {
+                            "response": f"<p>Error from AI service: {response.status_code}</p><p>{response.text}</p>"
+                        },
+                    )
+                    return
+
+                formatter = StreamingFormatter()
+                for delta in iter_completion_deltas(response):
+                    html = formatter.feed(delta)
+                    yield sse_event(
+                        "chunk", {"html": html, "pending": formatter.pending}
+                    )
+
+            AI_SECONDS.observe(time.perf_counter() - started, "stream", "ok")
+            answer = formatter.finish()
+            if answer:
+                ai_cache.set(question, answer)
+            yield sse_event(
+                "done",
+                {"response": answer_html(question, answer)},
+            )
+        except upstream.UpstreamUnavailable:
+            yield sse_event("error", {"response": AI_UNAVAILABLE_HTML})
+        except Exception as e:
+            ERRORS.inc("ask_ai_stream")
+            yield sse_event(
+                "error",
+                {"response": f"<p>Sorry, I couldn't process your question: {e}</p>"},
+            )
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def warm_shared_data():
+    """
+    Build the read-only airport table and search index now.
+
+    Called before gunicorn forks its workers (see gunicorn.conf.py) so the
+    index is built once and shared copy-on-write, instead of once per
+    worker on its first airport search.
+    """
+    get_airport_table()
+    get_search_index()
+
+
+def create_app(config=None, warm=False):
+    """
+    Create the Flask application.
+
+    Importing this module only defines the services and views; the app
+    object is built here, so CLI jobs and tests that just need the
+    analysis code don't pay for it, and servers can build it explicitly
+    (``gunicorn "app:create_app()"``, ``flask --app app run``).
+
+    Args:
+        config (dict): Flask config overrides, e.g. ``{"TESTING": True}``
+        warm (bool): Build shared read-only data (airport index) up front
+
+    Returns:
+        Flask: The application
+    """
+    flask_app = Flask(__name__)
+    if config:
+        flask_app.config.update(config)
+    flask_app.register_blueprint(bp)
+    if warm:
+        warm_shared_data()
+    return flask_app
+
+
+def __getattr__(name):
+    # ``app.app`` builds a default application on first access
+    if name == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 if __name__ == "__main__":
-    app.run(debug=True)
+    create_app().run(debug=True)
@@ -0,0 +1,296 @@
+"""
+Offline fare analysis over JSONL and CSV dumps.
+
+Runs the same analysis as the web app (``analysis.analyze()``, via the
+mergeable ``aggregate.FlightAggregator``) over fare exports of any size:
+
+    python batch.py fares-*.jsonl archive.csv.gz -o analysis.json
+
+Inputs are read line by line and never loaded whole, so memory use
+depends on the number of routes and dates, not on the number of rows.
+Large files are split into byte ranges of ``--chunk-size`` bytes, and
+chunks are aggregated in a pool of worker processes. Partial results are
+merged in input order, so ties in the route ranking resolve the same way
+as ``analyze()`` over the concatenated rows. Gzipped files can't be split
+and are read by a single worker each.
+
+JSONL rows are flight dicts (Travelpayouts ``value`` is read as
+``price``); CSV files need a header with at least origin, destination,
+depart_date and price, and one record per line (no quoted newlines).
+Rows without these fields, or whose price is not a positive finite
+number, are skipped and counted. CSV prices with no fractional part are
+read as integers, so CSV and JSONL exports of the same fares give the
+same output. Throughput is reported on stderr.
+"""
+
+import argparse
+import csv
+import gzip
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from aggregate import FlightAggregator
+
+FORMATS = ("jsonl", "csv")
+_SUFFIXES = {".jsonl": "jsonl", ".ndjson": "jsonl", ".json": "jsonl", ".csv": "csv"}
+
+# Byte range handed to one worker at a time
+CHUNK_BYTES = int(os.environ.get("BATCH_CHUNK_BYTES", str(64 * 1024 * 1024)))
+# Worker processes (0: one per CPU)
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", "0"))
+
+_KEYS = ("origin", "destination", "depart_date")
+
+
+def detect_format(path):
+    """
+    Guess the input format from the file name.
+
+    Args:
+        path (str): Input path, optionally ending in ``.gz``
+
+    Returns:
+        str: "jsonl" or "csv"
+
+    Raises:
+        ValueError: If the extension is not recognised
+    """
+    name = path[:-3] if path.endswith(".gz") else path
+    fmt = _SUFFIXES.get(os.path.splitext(name)[1].lower())
+    if fmt is None:
+        raise ValueError(f"Can't tell the format of {path}; pass --format")
+    return fmt
+
+
+def plan_chunks(paths, fmt=None, chunk_bytes=CHUNK_BYTES):
+    """
+    Split the inputs into independently readable chunks.
+
+    Args:
+        paths (list): Input files
+        fmt (str): Format for every file (default: from each file name)
+        chunk_bytes (int): Target chunk size in bytes
+
+    Returns:
+        list: (path, format, start, end) tuples in input order; ``end`` is
+            None for a chunk running to the end of the file
+    """
+    chunks = []
+    for path in paths:
+        file_fmt = fmt or detect_format(path)
+        size = os.path.getsize(path)
+        if path.endswith(".gz") or size <= chunk_bytes:
+            chunks.append((path, file_fmt, 0, None))
+            continue
+        for start in range(0, size, chunk_bytes):
+            end = start + chunk_bytes
+            chunks.append((path, file_fmt, start, end if end < size else None))
+    return chunks
+
+
+def _read_lines(fp, start, end):
+    """Yield the lines that start inside [start, end) of a binary file."""
+    if start:
+        # The line running across ``start`` belongs to the previous chunk
+        fp.seek(start - 1)
+        position = start - 1 + len(fp.readline())
+    else:
+        position = 0
+    for line in fp:
+        if end is not None and position >= end:
+            break
+        position += len(line)
+        yield line
+
+
+def _jsonl_rows(lines):
+    loads = json.loads
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            row = loads(line)
+        except ValueError:
+            yield None
+            continue
+        if type(row) is not dict:
+            yield None
+            continue
+        if "price" not in row and "value" in row:
+            row["price"] = row["value"]
+        yield row
+
+
+def _csv_rows(lines, header):
+    for row in csv.DictReader(
+        (line.decode("utf-8") for line in lines), fieldnames=header
+    ):
+        price = row.get("price") or row.get("value")
+        try:
+            price = float(price)
+        except (TypeError, ValueError):
+            yield None
+            continue
+        # "50" and "50.0" become 50, as the same fare would be in JSON
+        row["price"] = int(price) if price.is_integer() else price
+        yield row
+
+
+def _valid(row):
+    if row is None:
+        return False
+    price = row.get("price")
+    # bool is an int subclass; NaN and infinities would break the sketches
+    if type(price) not in (int, float) or not math.isfinite(price) or price <= 0:
+        return False
+    return all(row.get(key) for key in _KEYS)
+
+
+def aggregate_chunk(chunk):
+    """
+    Aggregate one chunk (runs in a worker process).
+
+    Args:
+        chunk (tuple): (path, format, start, end) from ``plan_chunks()``
+
+    Returns:
+        tuple: (FlightAggregator, rows aggregated, rows skipped)
+    """
+    path, fmt, start, end = chunk
+    aggregator = FlightAggregator()
+    add = aggregator.add
+    skipped = 0
+
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as fp:
+        if fmt == "csv":
+            header = next(csv.reader([fp.readline().decode("utf-8-sig")]), [])
+            # The header line is never part of a chunk's rows
+            rows = _csv_rows(_read_lines(fp, max(start, fp.tell()), end), header)
+        else:
+            rows = _jsonl_rows(_read_lines(fp, start, end))
+
+        for row in rows:
+            if _valid(row):
+                add(row)
+            else:
+                skipped += 1
+    return aggregator, aggregator.count, skipped
+
+
+def run_batch(paths, fmt=None, workers=BATCH_WORKERS, chunk_bytes=CHUNK_BYTES):
+    """
+    Analyze fare files, in parallel across chunks.
+
+    Args:
+        paths (list): Input files
+        fmt (str): Format for every file (default: from each file name)
+        workers (int): Worker processes (0: one per CPU, 1: no pool)
+        chunk_bytes (int): Target chunk size in bytes
+
+    Returns:
+        tuple: (analysis dict as from ``analyze()``, stats dict with files,
+            chunks, workers, bytes, rows, skipped, seconds, rows_per_second
+            and mb_per_second)
+    """
+    started = time.perf_counter()
+    chunks = plan_chunks(paths, fmt, chunk_bytes)
+    workers = min(workers or os.cpu_count() or 1, len(chunks)) or 1
+
+    total = FlightAggregator()
+    rows = skipped = 0
+    if workers == 1:
+        results = map(aggregate_chunk, chunks)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        # map() yields in submission order, which keeps the merge order
+        results = executor.map(aggregate_chunk, chunks)
+    try:
+        for aggregator, chunk_rows, chunk_skipped in results:
+            total.merge(aggregator)
+            rows += chunk_rows
+            skipped += chunk_skipped
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    seconds = time.perf_counter() - started
+    size = sum(os.path.getsize(path) for path in paths)
+    stats = {
+        "files": len(paths),
+        "chunks": len(chunks),
+        "workers": workers,
+        "bytes": size,
+        "rows": rows,
+        "skipped": skipped,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(rows / seconds) if seconds else 0,
+        "mb_per_second": round(size / seconds / 1024**2, 1) if seconds else 0,
+    }
+    return total.result(), stats
+
+
+def _size(text):
+    """Parse a byte count such as 65536, 512K, 64M or 1G."""
+    units = {"K": 1024, "M": 1024**2, "G": 1024**3}
+    text = text.strip().upper()
+    if text[-1:] in units:
+        size = int(float(text[:-1]) * units[text[-1]])
+    else:
+        size = int(text)
+    if size <= 0:
+        raise argparse.ArgumentTypeError("chunk size must be positive")
+    return size
+
+
+def main(argv=None):
+    """Analyze fare dumps (``python batch.py --help``)."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("inputs", nargs="+", help="JSONL or CSV files (.gz ok)")
+    parser.add_argument("--output", "-o", help="JSON file (default: stdout)")
+    parser.add_argument("--format", choices=FORMATS, help="Override detection")
+    parser.add_argument(
+        "--workers", type=int, default=BATCH_WORKERS, help="0: one per CPU"
+    )
+    parser.add_argument(
+        "--chunk-size", type=_size, default=CHUNK_BYTES, help="e.g. 64M"
+    )
+    parser.add_argument("--indent", type=int, help="Pretty-print the JSON")
+    args = parser.parse_args(argv)
+
+    for path in args.inputs:
+        if not os.path.isfile(path):
+            parser.error(f"No such file: {path}")
+        if not args.format:
+            try:
+                detect_format(path)
+            except ValueError as e:
+                parser.error(str(e))
+
+    result, stats = run_batch(args.inputs, args.format, args.workers, args.chunk_size)
+
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(result, fp, indent=args.indent)
+    else:
+        json.dump(result, sys.stdout, indent=args.indent)
+        sys.stdout.write("\n")
+
+    print(
+        f"Analyzed {stats['rows']} rows from {stats['files']} file(s) in "
+        f"{stats['chunks']} chunk(s) on {stats['workers']} worker(s): "
+        f"{stats['seconds']:.2f}s, {stats['rows_per_second']} rows/s, "
+        f"{stats['mb_per_second']} MB/s",
+        file=sys.stderr,
+    )
+    if stats["skipped"]:
+        print(f"Skipped {stats['skipped']} unusable rows", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# benchmarks/bench_format.py - Micro-benchmark for the AI answer formatter
+# Author: Developer
+#
+# Usage: python benchmarks/bench_format.py [--repeat N]
+
+"""Compare the compiled AI answer formatter with the original one."""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from ai_format import format_answer  # noqa: E402
+from fixtures import SAMPLE_ANSWER, legacy_format  # noqa: E402
+
+
+def bench(func, text, number, repeat):
+    """Return the best time per call in microseconds."""
+    times = timeit.repeat(lambda: func(text), number=number, repeat=repeat)
+    return min(times) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    for label, scale in (("short", 1), ("long", 10)):
+        text = SAMPLE_ANSWER * scale
+        legacy = bench(legacy_format, text, args.number, args.repeat)
+        compiled = bench(format_answer, text, args.number, args.repeat)
+        print(
+            f"{label:>5} ({len(text)} chars): legacy {legacy:8.1f} us  "
+            f"compiled {compiled:8.1f} us  speedup {legacy / compiled:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
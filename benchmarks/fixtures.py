@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# benchmarks/fixtures.py - Shared inputs for the benchmarks and formatter tests
+# Author: Developer
+#
+# legacy_format() is the original multi-pass formatter from ask_ai, kept as
+# the speed baseline for the benchmarks and the reference for the tests.
+
+import re
+
+
+def legacy_format(answer):
+    """The original multi-pass formatter from ask_ai, kept as the reference."""
+    answer = answer.strip()
+
+    for i in range(3, 0, -1):
+        heading_marker = "#" * i
+        answer = re.sub(
+            f"^{heading_marker}\\s+(.+)$",
+            f"<h{i+2}>\\1</h{i+2}>",
+            answer,
+            flags=re.MULTILINE,
+        )
+
+    answer = re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", answer)
+
+    paragraphs = [p for p in re.split(r"\n\s*\n", answer) if p.strip()]
+    formatted_paragraphs = []
+
+    for p in paragraphs:
+        if p.strip().startswith("<") and ">" in p:
+            formatted_paragraphs.append(p)
+            continue
+
+        if re.search(r"^[-•]\s", p, re.MULTILINE):
+            lines = p.split("\n")
+            bullet_list = []
+            for line in lines:
+                if re.match(r"^[-•]\s", line):
+                    clean_line = re.sub(r"^[-•]\s", "", line)
+                    bullet_list.append(f"<li>{clean_line}</li>")
+            formatted_paragraphs.append(
+                f"<ul class='ai-list'>{''.join(bullet_list)}</ul>"
+            )
+        elif re.search(r"^\d+\.\s", p, re.MULTILINE):
+            lines = p.split("\n")
+            number_list = []
+            for line in lines:
+                if re.match(r"^\d+\.\s", line):
+                    clean_line = re.sub(r"^\d+\.\s", "", line)
+                    number_list.append(f"<li>{clean_line}</li>")
+            formatted_paragraphs.append(
+                f"<ol class='ai-list'>{''.join(number_list)}</ol>"
+            )
+        else:
+            formatted_paragraphs.append(f"<p>{p}</p>")
+
+    answer = "\n".join(formatted_paragraphs)
+
+    emoji_to_icon = {
+        "🌤️": "sun",
+        "☀️": "sun-fill",
+        "🌧️": "cloud-rain",
+        "❄️": "snow",
+        "✈️": "airplane",
+        "🛫": "airplane-fill",
+        "🚗": "car-front",
+        "🏨": "building",
+        "📅": "calendar",
+        "👉": "arrow-right-circle-fill",
+        "✅": "check-circle-fill",
+        "💰": "cash-coin",
+        "⭐": "star-fill",
+    }
+    for emoji, icon_name in emoji_to_icon.items():
+        css_class = "text-success" if icon_name in ["check-circle-fill"] else ""
+        css_class = "text-warning" if icon_name in ["star-fill"] else css_class
+        icon_html = f'<i class="bi bi-{icon_name} {css_class}"></i>'
+        answer = answer.replace(emoji, f" {icon_html} ")
+
+    return answer
+
+
+SAMPLE_ANSWER = """## Best Time to Book ✈️
+
+**Short answer:** book 6-8 weeks ahead for Europe.
+
+### Key factors
+
+- **Season**: summer ☀️ is pricier
+- Shoulder season (April-May) 🌤️ is cheaper
+• Midweek departures save 💰
+
+1. Set fare alerts 📅
+2. Compare nearby airports
+3. Be flexible ✅
+
+# Summary
+Overall, flexibility ⭐ matters most.
+#### Not a heading
+"""
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+# benchmarks/run_benchmarks.py - Benchmark suite for analysis, search, formatting, /results and startup
+# Author: Developer
+#
+# Usage:
+#   python benchmarks/run_benchmarks.py                      # run and print
+#   python benchmarks/run_benchmarks.py --save baseline.json # store a baseline
+#   python benchmarks/run_benchmarks.py --compare baseline.json
+#
+# Results are written as JSON (--output/--save). With --compare, each case is
+# checked against the stored baseline and the exit status is 1 when any case
+# is slower than --threshold times its baseline.
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from itertools import product
+from string import ascii_uppercase
+from unittest.mock import patch
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+import airports  # noqa: E402
+import app as webapp  # noqa: E402
+from ai_format import format_answer  # noqa: E402
+from fixtures import SAMPLE_ANSWER  # noqa: E402
+from synthetic import FareGenerator, make_routes  # noqa: E402
+
+try:
+    import numpy  # noqa: F401
+
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+ANALYZE_SIZES = (1_000, 10_000, 100_000)
+QUICK_ANALYZE_SIZES = (1_000, 10_000)
+AIRPORT_COUNT = 15_000
+SEARCH_QUERIES = ("JFK", "lon", "new york", "intern", "londn", "zz")
+
+# Cold-start cases, each timed in a fresh interpreter
+STARTUP_CASES = (
+    ("startup_python", "pass"),
+    ("startup_import_analysis", "import analysis"),
+    ("startup_import_app", "import app"),
+    ("startup_create_app", "import app; app.create_app()"),
+    ("startup_create_app_warm", "import app; app.create_app(warm=True)"),
+)
+
+CITY_SYLLABLES = (
+    "lon", "par", "ber", "mad", "ro", "vie", "san", "new", "port", "bay",
+    "del", "cal", "tor", "mon", "sea", "ham", "ly", "ne", "ka", "to",
+)  # fmt: skip
+
+
+def measure(func, repeat, number=1, setup=None):
+    """
+    Time ``func`` ``repeat`` times (``number`` calls per sample).
+
+    Returns:
+        dict: Best and median milliseconds per call, plus the sample sizes
+    """
+    func()  # warm-up: import caches, lazy indexes, compiled regexes
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - started) / number * 1000)
+    return {
+        "best_ms": round(min(samples), 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "repeat": repeat,
+        "number": number,
+    }
+
+
+def synthetic_flights(count):
+    """Deterministic flights spread over many routes and dates."""
+    routes = make_routes(max(1, count // 365))
+    flights = list(FareGenerator().iter_fares(routes, "2024-01-01", "2024-12-31"))
+    return flights[:count]
+
+
+def synthetic_airports(count):
+    """Deterministic airport rows (every unused three-letter code, up to count)."""
+    common = {airport["code"] for airport in airports.COMMON_AIRPORTS}
+    codes = ["".join(letters) for letters in product(ascii_uppercase, repeat=3)]
+    codes = [code for code in codes if code not in common][:count]
+
+    rows = list(airports.COMMON_AIRPORTS)
+    for i, code in enumerate(codes):
+        a = CITY_SYLLABLES[i % len(CITY_SYLLABLES)]
+        b = CITY_SYLLABLES[(i // len(CITY_SYLLABLES)) % len(CITY_SYLLABLES)]
+        city = f"{a}{b}{i // 400}".title()
+        rows.append(
+            {
+                "code": code,
+                "name": f"{city} International Airport",
+                "city": city,
+                "country": "Country" + str(i % 200),
+            }
+        )
+    return rows
+
+
+def bench_analyze(results, repeat, sizes):
+    for size in sizes:
+        flights = synthetic_flights(size)
+        results[f"analyze_python_{size}"] = measure(
+            lambda: webapp.analyze(flights, backend="python"), repeat
+        )
+        if HAS_NUMPY:
+            results[f"analyze_numpy_{size}"] = measure(
+                lambda: webapp.analyze(flights, backend="numpy"), repeat
+            )
+
+
+def bench_airports(results, repeat):
+    table = airports.AirportTable.from_dicts(synthetic_airports(AIRPORT_COUNT))
+    codes = [table.row(i)["code"] for i in range(0, len(table), 97)]
+
+    with patch("airports._airport_table", table), patch("airports._search_index", None):
+        results["airport_index_build"] = measure(
+            lambda: airports.AirportIndex(table), max(1, repeat // 2)
+        )
+        airports.get_search_index()
+        for query in SEARCH_QUERIES:
+            results[f"search_airports[{query}]"] = measure(
+                lambda: airports.search_airports(query), repeat, number=50
+            )
+        results["get_airport_by_code"] = measure(
+            lambda: [airports.get_airport_by_code(code) for code in codes],
+            repeat,
+            number=20,
+        )
+
+
+def bench_format(results, repeat):
+    long_answer = SAMPLE_ANSWER * 10
+    results["format_answer_short"] = measure(
+        lambda: format_answer(SAMPLE_ANSWER), repeat, number=500
+    )
+    results["format_answer_long"] = measure(
+        lambda: format_answer(long_answer), repeat, number=100
+    )
+
+
+class FakeResponse:
+    """Minimal stand-in for a ``requests.Response`` from the fare API."""
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._payload
+
+
+def fake_fare_api(url, params=None, **kwargs):
+    """Serve generated fares for a Travelpayouts query, page by page."""
+    destination = params.get("destination")
+    destinations = [destination] if destination else webapp.FALLBACK_DESTINATIONS
+    fares = FareGenerator(seed=1, source="api").generate(
+        params["origin"],
+        destinations,
+        params["beginning_of_period"],
+        params["end_of_period"],
+    )
+    limit = params["limit"]
+    offset = (params.get("page", 1) - 1) * limit
+    return FakeResponse({"success": True, "data": fares[offset : offset + limit]})
+
+
+def bench_results(results, repeat):
+    client = webapp.app.test_client()
+    form = {
+        "origin": "JFK",
+        "destination": "ANY",
+        "start_date": "2024-01-01",
+        "end_date": "2024-03-31",
+    }
+
+    def post():
+        response = client.post("/results", data=form)
+        assert response.status_code == 200, response.status_code
+
+    with patch("app.upstream.get", side_effect=fake_fare_api), patch(
+        "app.fare_store", None
+    ):
+        # Cold: every request goes through the sharded fetch path
+        results["results_e2e_cold"] = measure(
+            post, repeat, setup=webapp.fare_cache.clear
+        )
+        # Warm: fares come from the in-process cache
+        results["results_e2e_warm"] = measure(post, repeat, number=5)
+    webapp.fare_cache.clear()
+
+
+def bench_startup(results, repeat):
+    """Time interpreter start plus imports in fresh processes (cold start)."""
+    for name, statement in STARTUP_CASES:
+        command = [sys.executable, "-c", statement]
+        results[name] = measure(
+            lambda: subprocess.run(command, cwd=ROOT, check=True), repeat
+        )
+
+
+def compare(current, baseline, threshold):
+    """
+    Compare best times against a baseline.
+
+    Args:
+        current (dict): Benchmark results by case name
+        baseline (dict): Stored results by case name
+        threshold (float): Ratio above which a case counts as a regression
+
+    Returns:
+        list: (name, baseline_ms, current_ms, ratio, regressed) per shared case
+    """
+    rows = []
+    for name, result in current.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["best_ms"]
+        ratio = result["best_ms"] / before if before else float("inf")
+        rows.append((name, before, result["best_ms"], ratio, ratio > threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SkyTrends benchmark suite")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="smaller data sizes")
+    parser.add_argument(
+        "--only",
+        choices=("analyze", "airports", "format", "results", "startup"),
+        action="append",
+        help="run only these groups (repeatable)",
+    )
+    parser.add_argument("--output", "-o", help="write results JSON here")
+    parser.add_argument("--save", help="write results JSON as a new baseline")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    args = parser.parse_args(argv)
+
+    groups = set(args.only or ("analyze", "airports", "format", "results", "startup"))
+    results = {}
+    if "analyze" in groups:
+        sizes = QUICK_ANALYZE_SIZES if args.quick else ANALYZE_SIZES
+        bench_analyze(results, args.repeat, sizes)
+    if "airports" in groups:
+        bench_airports(results, args.repeat)
+    if "format" in groups:
+        bench_format(results, args.repeat)
+    if "results" in groups:
+        bench_results(results, args.repeat)
+    if "startup" in groups:
+        bench_startup(results, args.repeat)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": HAS_NUMPY,
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+
+    width = max(len(name) for name in results)
+    for name, result in results.items():
+        print(
+            f"{name:<{width}}  best {result['best_ms']:10.3f} ms"
+            f"  median {result['median_ms']:10.3f} ms"
+        )
+
+    for path in (args.output, args.save):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2)
+                f.write("\n")
+            print(f"Results written to {path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        rows = compare(results, baseline, args.threshold)
+        print(f"\nCompared with {args.compare} (threshold {args.threshold:.2f}x):")
+        for name, before, after, ratio, regressed in rows:
+            flag = "  REGRESSION" if regressed else ""
+            print(
+                f"{name:<{width}}  {before:10.3f} -> {after:10.3f} ms"
+                f"  {ratio:5.2f}x{flag}"
+            )
+        if any(row[4] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""
+Circuit breakers for upstream APIs.
+
+A breaker tracks the outcome and latency of the last ``window`` calls to
+one upstream. While the failure rate and the slow-call rate stay below
+their thresholds the breaker is *closed* and calls go through. Crossing
+either threshold *opens* it: calls are rejected at once for
+``open_seconds``, so callers go straight to their fallback instead of
+waiting on a service that is down. The breaker then turns *half-open* and
+admits a few probe calls; if they succeed quickly it closes again,
+otherwise it reopens for another ``open_seconds``.
+"""
+
+import threading
+import time
+from collections import deque
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Failure-rate and latency circuit breaker with half-open probing."""
+
+    def __init__(
+        self,
+        name,
+        failure_rate=0.5,
+        slow_seconds=15.0,
+        slow_rate=0.8,
+        window=20,
+        min_calls=5,
+        open_seconds=30.0,
+        half_open_calls=1,
+        clock=time.monotonic,
+    ):
+        """
+        Args:
+            name (str): Upstream name, for logs and status
+            failure_rate (float): Failed share of the window that opens
+                the breaker
+            slow_seconds (float): Calls taking at least this long are slow
+            slow_rate (float): Slow share of the window that opens the
+                breaker
+            window (int): Number of recent calls considered
+            min_calls (int): Calls needed in the window before it can trip
+            open_seconds (float): Time calls are rejected before probing
+            half_open_calls (int): Probe calls that must all succeed to close
+            clock (callable): Monotonic time source (injectable for tests)
+        """
+        self.name = name
+        self.failure_rate = failure_rate
+        self.slow_seconds = slow_seconds
+        self.slow_rate = slow_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._calls = deque(maxlen=window)  # (failed, slow) per call
+        self._state = CLOSED
+        self._opened_at = None
+        self._probes = 0  # Probe calls in flight while half-open
+        self._probe_successes = 0
+        self._reason = None
+        self._last_failure = None
+        self._trips = 0
+        self._rejected = 0
+
+    def _current_state(self):
+        if self._state == OPEN and self._clock() >= self._opened_at + self.open_seconds:
+            self._state = HALF_OPEN
+            self._probes = 0
+            self._probe_successes = 0
+        return self._state
+
+    @property
+    def state(self):
+        """Current state: CLOSED, OPEN or HALF_OPEN."""
+        with self._lock:
+            return self._current_state()
+
+    def allow(self):
+        """
+        Ask whether a call may go upstream now.
+
+        Every allowed call must be followed by ``record()`` or ``cancel()``.
+
+        Returns:
+            bool: False if the call should fail fast
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._probes < self.half_open_calls:
+                self._probes += 1
+                return True
+            self._rejected += 1
+            return False
+
+    def cancel(self):
+        """Give back an allowed call that was never sent."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes:
+                self._probes -= 1
+
+    def record(self, success, duration, reason=None):
+        """
+        Record the outcome of an allowed call.
+
+        Args:
+            success (bool): False if the upstream failed
+            duration (float): Call duration in seconds
+            reason (str): Failure description, shown in ``status()``
+        """
+        slow = duration >= self.slow_seconds
+        with self._lock:
+            if not success:
+                self._last_failure = reason
+            state = self._current_state()
+
+            if state == HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+                if not success:
+                    self._open(f"probe failed ({reason})")
+                elif slow:
+                    self._open(f"probe took {duration:.1f}s")
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.half_open_calls:
+                        self._close()
+                return
+            if state == OPEN:
+                # Started before the breaker opened; the verdict is already in
+                return
+
+            self._calls.append((not success, slow))
+            if len(self._calls) < self.min_calls:
+                return
+            failed = sum(1 for f, _ in self._calls if f) / len(self._calls)
+            slowed = sum(1 for _, s in self._calls if s) / len(self._calls)
+            if failed >= self.failure_rate:
+                self._open(f"{failed:.0%} of the last {len(self._calls)} calls failed")
+            elif slowed >= self.slow_rate:
+                self._open(
+                    f"{slowed:.0%} of the last {len(self._calls)} calls took "
+                    f"over {self.slow_seconds:g}s"
+                )
+
+    def _open(self, reason):
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._reason = reason
+        self._trips += 1
+        self._calls.clear()
+        print(f"Circuit breaker {self.name} opened: {reason}")
+
+    def _close(self):
+        self._state = CLOSED
+        self._opened_at = None
+        self._reason = None
+        self._calls.clear()
+        print(f"Circuit breaker {self.name} closed")
+
+    def _retry_in(self):
+        if self._current_state() != OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.open_seconds - self._clock())
+
+    def retry_in(self):
+        """Seconds until an open breaker starts probing (0 otherwise)."""
+        with self._lock:
+            return self._retry_in()
+
+    def status(self):
+        """
+        Current state for the operator status endpoint.
+
+        Returns:
+            dict: State, rates over the current window, why it opened,
+                retry delay, trip and rejection counts
+        """
+        with self._lock:
+            state = self._current_state()
+            calls = len(self._calls)
+            return {
+                "name": self.name,
+                "state": state,
+                "window_calls": calls,
+                "failure_rate": (
+                    round(sum(1 for f, _ in self._calls if f) / calls, 3)
+                    if calls
+                    else 0.0
+                ),
+                "slow_rate": (
+                    round(sum(1 for _, s in self._calls if s) / calls, 3)
+                    if calls
+                    else 0.0
+                ),
+                "reason": self._reason,
+                "last_failure": self._last_failure,
+                "retry_in": round(self._retry_in(), 1),
+                "trips": self._trips,
+                "rejected": self._rejected,
+            }
@@ -0,0 +1,189 @@
+"""
+In-process TTL + LRU cache used in front of slow upstream lookups.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Thread-safe cache with per-entry TTL, LRU eviction and
+    stale-while-revalidate refreshes.
+
+    An entry is fresh for ``ttl`` seconds. For a further ``stale_ttl``
+    seconds it is still served, but the first read kicks off a background
+    reload so the next caller gets fresh data without waiting on it.
+    """
+
+    def __init__(self, ttl, max_entries=1024, stale_ttl=0, clock=time.monotonic):
+        """
+        Args:
+            ttl (float): Seconds an entry stays fresh
+            max_entries (int): Maximum number of entries before LRU eviction
+            stale_ttl (float): Extra seconds a stale entry may still be served
+            clock (callable): Monotonic time source (overridable for tests)
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (stored_at, value)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _lookup(self, key):
+        """Return ``(value, state)`` where state is fresh, stale or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, None
+
+        stored_at, value = entry
+        age = self._clock() - stored_at
+        if age < self.ttl:
+            self._entries.move_to_end(key)
+            return value, "fresh"
+        if age < self.ttl + self.stale_ttl:
+            self._entries.move_to_end(key)
+            return value, "stale"
+
+        del self._entries[key]
+        return None, None
+
+    def get(self, key, default=None):
+        """
+        Get a cached value, counting the lookup as a hit or miss.
+
+        Args:
+            key: Cache key
+            default: Returned when the key is missing or expired
+
+        Returns:
+            The cached value (fresh or stale) or ``default``
+        """
+        with self._lock:
+            value, state = self._lookup(key)
+            if state is None:
+                self.misses += 1
+                return default
+            if state == "stale":
+                self.stale_hits += 1
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """
+        Store a value, evicting the least recently used entries if full.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        with self._lock:
+            self._entries[key] = (self._clock(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def version(self, key):
+        """
+        When a fresh entry was stored, without counting a lookup.
+
+        The value changes whenever the entry is replaced, so callers can
+        tell whether data derived from it is still current.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            float: Store time, or None if the key is missing or not fresh
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._clock() - entry[0] >= self.ttl:
+                return None
+            return entry[0]
+
+    def get_or_load(self, key, loader, store_empty=False):
+        """
+        Return the cached value for ``key``, loading it on a miss.
+
+        Stale entries are returned immediately while ``loader`` runs once in
+        a background thread to refresh them.
+
+        Args:
+            key: Cache key
+            loader (callable): Zero-argument function producing the value
+            store_empty (bool): Whether falsy results (e.g. an empty list
+                after an upstream error) should be cached
+
+        Returns:
+            The cached or freshly loaded value
+        """
+        with self._lock:
+            value, state = self._lookup(key)
+            if state is not None:
+                self.hits += 1
+                if state == "stale":
+                    self.stale_hits += 1
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        threading.Thread(
+                            target=self._refresh,
+                            args=(key, loader, store_empty),
+                            daemon=True,
+                        ).start()
+                return value
+            self.misses += 1
+
+        value = loader()
+        if value or store_empty:
+            self.set(key, value)
+        return value
+
+    def _refresh(self, key, loader, store_empty):
+        """Reload a stale entry in the background, keeping it on failure."""
+        try:
+            value = loader()
+            if value or store_empty:
+                self.set(key, value)
+        except Exception as e:
+            print(f"Cache refresh error for {key}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def clear(self):
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.stale_hits = self.evictions = 0
+
+    def stats(self):
+        """
+        Get cache counters.
+
+        Returns:
+            dict: Size, hits, misses, stale hits, evictions and hit rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale_hits": self.stale_hits,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
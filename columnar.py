@@ -0,0 +1,240 @@
+"""
+Columnar NumPy engine for flight analysis.
+
+Flights are loaded once into typed arrays (categorical codes for routes and
+departure dates, float64 prices) and every statistic is a vectorized
+group-by over those arrays. The output matches ``analysis.analyze()`` exactly,
+so it can be selected as a drop-in backend with ``ANALYSIS_BACKEND=numpy``.
+
+Requires numpy, which is only imported when this backend is used.
+"""
+
+from array import array
+
+import numpy as np
+
+from records import core_getter
+from sketch import QuantileSketch, distribution_stats, empty_stats
+
+
+class FlightColumns:
+    """Flight data stored column-wise with categorical route/date codes."""
+
+    __slots__ = ("route_codes", "date_codes", "prices", "int_prices", "routes", "dates")
+
+    def __init__(self, route_codes, date_codes, prices, int_prices, routes, dates):
+        """
+        Args:
+            route_codes (np.ndarray): int32 index into ``routes`` per flight
+            date_codes (np.ndarray): int32 index into ``dates`` per flight
+            prices (np.ndarray): float64 price per flight
+            int_prices (np.ndarray): bool, True where the source price was an int
+            routes (list): (origin, destination) tuples in first-seen order
+            dates (list): Departure date strings in first-seen order
+        """
+        self.route_codes = route_codes
+        self.date_codes = date_codes
+        self.prices = prices
+        self.int_prices = int_prices
+        self.routes = routes
+        self.dates = dates
+
+    def __len__(self):
+        return len(self.prices)
+
+    @classmethod
+    def from_flights(cls, flights):
+        """
+        Load flight dictionaries into columns in a single pass.
+
+        Args:
+            flights (iterable): Flight dictionaries (any iterable, consumed once)
+
+        Returns:
+            FlightColumns: Columnar copy of the data
+        """
+        route_index = {}
+        date_index = {}
+        route_codes = array("i")
+        date_codes = array("i")
+        prices = array("d")
+        int_prices = array("b")
+
+        for flight in flights:
+            origin, destination, date, price = core_getter(flight)(flight)
+            route = (origin, destination)
+            code = route_index.get(route)
+            if code is None:
+                code = route_index[route] = len(route_index)
+            route_codes.append(code)
+
+            code = date_index.get(date)
+            if code is None:
+                code = date_index[date] = len(date_index)
+            date_codes.append(code)
+
+            prices.append(price)
+            int_prices.append(isinstance(price, int))
+
+        return cls(
+            np.frombuffer(route_codes, dtype=np.intc),
+            np.frombuffer(date_codes, dtype=np.intc),
+            np.frombuffer(prices, dtype=np.float64),
+            np.frombuffer(int_prices, dtype=np.int8).astype(bool),
+            list(route_index),
+            list(date_index),
+        )
+
+
+def _price_item(columns, index):
+    """Return the price at ``index`` with its original int/float type."""
+    value = columns.prices[index].item()
+    return int(value) if columns.int_prices[index] else value
+
+
+def _total(columns):
+    """Sum prices in input order, as Python's ``sum()`` would."""
+    if columns.int_prices.all():
+        # Integer sums below 2**53 are exact in any order
+        return columns.prices.sum()
+    return np.cumsum(columns.prices)[-1]
+
+
+def _group_sketches(codes, n_groups, prices):
+    """
+    Build one QuantileSketch per group code, bucketing all prices at once.
+
+    Args:
+        codes (np.ndarray): Group code of every price
+        n_groups (int): Number of groups
+        prices (np.ndarray): Prices
+
+    Returns:
+        list: QuantileSketch per group code
+    """
+    sketches = [QuantileSketch() for _ in range(n_groups)]
+    counts = np.bincount(codes, minlength=n_groups)
+    totals = np.bincount(codes, weights=prices, minlength=n_groups)
+    lows = np.full(n_groups, np.inf)
+    highs = np.full(n_groups, -np.inf)
+    np.minimum.at(lows, codes, prices)
+    np.maximum.at(highs, codes, prices)
+
+    positive = prices > 0
+    zeros = np.bincount(codes[~positive], minlength=n_groups)
+    keys = np.ceil(np.log(prices[positive]) * sketches[0].multiplier).astype(np.int64)
+    bins = [{} for _ in range(n_groups)]
+    if len(keys):
+        # Count (group, bucket) pairs in one pass via a combined code
+        low_key = keys.min()
+        span = int(keys.max() - low_key) + 1
+        pairs, pair_counts = np.unique(
+            codes[positive].astype(np.int64) * span + (keys - low_key),
+            return_counts=True,
+        )
+        for pair, n in zip(pairs.tolist(), pair_counts.tolist()):
+            group, offset = divmod(pair, span)
+            bins[group][offset + int(low_key)] = n
+
+    for i, sketch in enumerate(sketches):
+        sketch.add_bins(
+            bins[i],
+            int(zeros[i]),
+            int(counts[i]),
+            float(totals[i]),
+            float(lows[i]),
+            float(highs[i]),
+        )
+    return sketches
+
+
+def analyze_columns(columns):
+    """
+    Analyze columnar flight data with vectorized group-bys.
+
+    Args:
+        columns (FlightColumns): Loaded flight data
+
+    Returns:
+        dict: Same structure and values as ``analysis.analyze()``
+    """
+    if len(columns) == 0:
+        quantiles, distribution = empty_stats()
+        return {
+            "top_routes": [],
+            "price_trends": [],
+            "summary": {
+                "total_routes": 0,
+                "avg_price": 0,
+                "min_price": 0,
+                "max_price": 0,
+                **quantiles,
+            },
+            "distribution": distribution,
+        }
+
+    # Top routes: stable sort keeps first-seen order on ties, like Counter
+    route_counts = np.bincount(columns.route_codes, minlength=len(columns.routes))
+    top = np.argsort(-route_counts, kind="stable")[:10]
+    top_routes = [
+        {
+            "origin": columns.routes[i][0],
+            "destination": columns.routes[i][1],
+            "count": int(route_counts[i]),
+        }
+        for i in top
+    ]
+
+    # Price trends: bincount accumulates weights in input order
+    n_dates = len(columns.dates)
+    date_counts = np.bincount(columns.date_codes, minlength=n_dates)
+    date_sums = np.bincount(
+        columns.date_codes, weights=columns.prices, minlength=n_dates
+    )
+    price_trends = [
+        {
+            "depart_date": columns.dates[i],
+            "price": round(float(date_sums[i]) / int(date_counts[i]), 2),
+        }
+        for i in sorted(range(n_dates), key=columns.dates.__getitem__)
+    ]
+
+    summary = {
+        "total_routes": len(columns),
+        "avg_price": round(float(_total(columns)) / len(columns), 2),
+        "min_price": _price_item(columns, int(np.argmin(columns.prices))),
+        "max_price": _price_item(columns, int(np.argmax(columns.prices))),
+    }
+
+    route_sketches = _group_sketches(
+        columns.route_codes, len(columns.routes), columns.prices
+    )
+    date_sketches = _group_sketches(columns.date_codes, n_dates, columns.prices)
+    quantiles, distribution = distribution_stats(
+        dict(zip(columns.routes, route_sketches)),
+        dict(zip(columns.dates, date_sketches)),
+        top_routes,
+    )
+    summary.update(quantiles)
+
+    return {
+        "top_routes": top_routes,
+        "price_trends": price_trends,
+        "summary": summary,
+        "distribution": distribution,
+    }
+
+
+def analyze_columnar(data):
+    """
+    Analyze flight data with the columnar engine.
+
+    Args:
+        data (FlightColumns or iterable): Pre-loaded columns or flight dictionaries
+
+    Returns:
+        dict: Same structure and values as ``analysis.analyze()``
+    """
+    if not isinstance(data, FlightColumns):
+        data = FlightColumns.from_flights(data)
+    return analyze_columns(data)
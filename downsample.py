@@ -0,0 +1,165 @@
+"""
+Downsampling of price trend series for charts.
+
+Long date ranges produce one ``price_trends`` point per departure date,
+far more than a chart can show. Two reducers are provided:
+
+- ``lttb``: Largest-Triangle-Three-Buckets, which keeps the points that
+  best preserve the visual shape of the line (peaks and dips survive).
+- ``minmax``: fixed buckets reporting the average plus the lowest and
+  highest point, for charts that draw a band. The points are daily
+  averages, so the band spans daily averages, not individual fares.
+
+Both keep the first and last point of the series unchanged.
+"""
+
+from datetime import date
+
+DOWNSAMPLE_MODES = ("lttb", "minmax")
+MIN_POINTS = 3
+
+
+def _bucket_bounds(size, buckets):
+    """Split ``range(size)`` into ``buckets`` contiguous, near-equal spans."""
+    return [(i * size // buckets, (i + 1) * size // buckets) for i in range(buckets)]
+
+
+def lttb_indices(xs, ys, threshold):
+    """
+    Select indices with Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept; the rest are split into
+    ``threshold - 2`` buckets and from each the point forming the largest
+    triangle with the previously kept point and the next bucket's average
+    is chosen.
+
+    Args:
+        xs (list): Increasing x values
+        ys (list): y values
+        threshold (int): Number of points to keep (at least 3)
+
+    Returns:
+        list: Increasing indices into ``xs``/``ys``
+    """
+    size = len(xs)
+    if threshold >= size or size <= MIN_POINTS:
+        return list(range(size))
+    threshold = max(threshold, MIN_POINTS)
+
+    bounds = [
+        (start + 1, end + 1) for start, end in _bucket_bounds(size - 2, threshold - 2)
+    ]
+    bounds.append((size - 1, size))
+
+    selected = [0]
+    a = 0
+    for bucket, (start, end) in enumerate(bounds[:-1]):
+        next_start, next_end = bounds[bucket + 1]
+        count = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / count
+        avg_y = sum(ys[next_start:next_end]) / count
+
+        ax, ay = xs[a], ys[a]
+        best, best_area = start, -1.0
+        for i in range(start, end):
+            # Twice the triangle area; the factor doesn't change the argmax
+            area = abs((ax - avg_x) * (ys[i] - ay) - (ax - xs[i]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = i, area
+        selected.append(best)
+        a = best
+
+    selected.append(size - 1)
+    return selected
+
+
+def _day_numbers(trends):
+    return [date.fromisoformat(point["depart_date"]).toordinal() for point in trends]
+
+
+def lttb(trends, threshold):
+    """
+    Reduce price trends with LTTB, using the dates as x positions.
+
+    Args:
+        trends (list): ``price_trends`` points sorted by date
+        threshold (int): Number of points to keep
+
+    Returns:
+        list: Subset of the original points
+    """
+    if threshold >= len(trends):
+        return list(trends)
+    ys = [point["price"] for point in trends]
+    return [trends[i] for i in lttb_indices(_day_numbers(trends), ys, threshold)]
+
+
+def minmax(trends, buckets):
+    """
+    Reduce price trends to buckets of average, minimum and maximum price.
+
+    With three or more buckets, the first and last points get a bucket of
+    their own, so the reduced series starts and ends at the real values;
+    the remaining points are split evenly over the other buckets.
+
+    Args:
+        trends (list): ``price_trends`` points sorted by date
+        buckets (int): Number of buckets
+
+    Returns:
+        list: Points with depart_date (bucket start), end_date, price
+            (average), min_price and max_price
+    """
+    if not trends:
+        return []
+    size = len(trends)
+    buckets = min(max(buckets, 1), size)
+    if buckets >= MIN_POINTS:
+        bounds = [(0, 1)]
+        bounds += [
+            (start + 1, end + 1) for start, end in _bucket_bounds(size - 2, buckets - 2)
+        ]
+        bounds.append((size - 1, size))
+    else:
+        bounds = _bucket_bounds(size, buckets)
+    reduced = []
+    for start, end in bounds:
+        prices = [point["price"] for point in trends[start:end]]
+        reduced.append(
+            {
+                "depart_date": trends[start]["depart_date"],
+                "end_date": trends[end - 1]["depart_date"],
+                "price": round(sum(prices) / len(prices), 2),
+                "min_price": min(prices),
+                "max_price": max(prices),
+            }
+        )
+    return reduced
+
+
+def downsample_trends(trends, points, mode="lttb"):
+    """
+    Reduce a price trend series to about ``points`` points.
+
+    Series that already fit are returned unchanged.
+
+    Args:
+        trends (list): ``price_trends`` points sorted by date
+        points (int): Target number of points (at least 3)
+        mode (str): "lttb" or "minmax"
+
+    Returns:
+        list: Downsampled points
+
+    Raises:
+        ValueError: If the mode is unknown or points is below 3
+    """
+    if mode not in DOWNSAMPLE_MODES:
+        raise ValueError(f"Unknown downsampling mode: {mode!r}")
+    if points < MIN_POINTS:
+        raise ValueError(f"points must be at least {MIN_POINTS}")
+    if len(trends) <= points:
+        return list(trends)
+    if mode == "minmax":
+        return minmax(trends, points)
+    return lttb(trends, points)
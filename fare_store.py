@@ -0,0 +1,191 @@
+"""
+Append-only local store of every fare fetched from the flight API.
+
+Fares are kept in SQLite with the time they were fetched, indexed on
+(origin, destination, depart_date), so historical price data can be
+queried locally and fed straight into ``analyze()`` or a
+``FlightAggregator`` instead of re-fetching it.
+"""
+
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fares (
+    id INTEGER PRIMARY KEY,
+    origin TEXT NOT NULL,
+    destination TEXT NOT NULL,
+    depart_date TEXT NOT NULL,
+    return_date TEXT,
+    price NUMERIC NOT NULL,
+    airline TEXT,
+    flight_number TEXT,
+    source TEXT,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS fares_route_date
+    ON fares (origin, destination, depart_date);
+CREATE INDEX IF NOT EXISTS fares_origin_date
+    ON fares (origin, depart_date);
+"""
+
+COLUMNS = (
+    "origin",
+    "destination",
+    "depart_date",
+    "return_date",
+    "price",
+    "airline",
+    "flight_number",
+    "source",
+    "fetched_at",
+)
+
+
+def _fare_row(flight, fetched_at, source):
+    """Map an API or generated flight dict to a table row (None to skip)."""
+    price = flight.get("price", flight.get("value"))
+    if price is None or not flight.get("depart_date"):
+        return None
+    return (
+        flight.get("origin"),
+        flight.get("destination"),
+        flight["depart_date"],
+        flight.get("return_date"),
+        price,
+        flight.get("airline", flight.get("gate")),
+        flight.get("flight_number"),
+        flight.get("source", source),
+        fetched_at,
+    )
+
+
+class FareStore:
+    """SQLite-backed, append-only fare history."""
+
+    def __init__(self, path, batch_size=500):
+        """
+        Args:
+            path (str): SQLite file path (created on first use)
+            batch_size (int): Rows per executemany batch on bulk inserts
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _connection(self):
+        """Per-thread connection; WAL lets readers run alongside a writer."""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.row_factory = sqlite3.Row
+            self._local.db = db
+        if not self._schema_ready:
+            # The file is created on first use, not at import
+            with self._schema_lock:
+                if not self._schema_ready:
+                    db.executescript(SCHEMA)
+                    self._schema_ready = True
+        return db
+
+    def insert_many(self, flights, fetched_at=None, source="api"):
+        """
+        Append fares in batched transactions.
+
+        Args:
+            flights (iterable): Flight dictionaries (API or generated)
+            fetched_at (float): Fetch timestamp (default: now)
+            source (str): Source recorded for rows that don't carry one
+
+        Returns:
+            int: Number of rows stored
+        """
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        sql = (
+            f"INSERT INTO fares ({', '.join(COLUMNS)})"
+            f" VALUES ({', '.join('?' * len(COLUMNS))})"
+        )
+
+        db = self._connection()
+        stored = 0
+        batch = []
+        with db:
+            for flight in flights:
+                row = _fare_row(flight, fetched_at, source)
+                if row is None:
+                    continue
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    db.executemany(sql, batch)
+                    stored += len(batch)
+                    batch = []
+            if batch:
+                db.executemany(sql, batch)
+                stored += len(batch)
+        return stored
+
+    def iter_fares(
+        self, origin, destination=None, start_date=None, end_date=None, since=None
+    ):
+        """
+        Stream stored fares for a route and departure date range.
+
+        Args:
+            origin (str): Origin IATA code
+            destination (str): Destination IATA code (None or "ANY" for all)
+            start_date (str): First departure date (YYYY-MM-DD), inclusive
+            end_date (str): Last departure date (YYYY-MM-DD), inclusive
+            since (float): Only fares fetched at or after this timestamp
+
+        Yields:
+            dict: Flight dictionaries with a ``fetched_at`` timestamp
+        """
+        clauses = ["origin = ?"]
+        params = [origin]
+        if destination and destination.upper() != "ANY":
+            clauses.append("destination = ?")
+            params.append(destination)
+        if start_date:
+            clauses.append("depart_date >= ?")
+            params.append(start_date)
+        if end_date:
+            clauses.append("depart_date <= ?")
+            params.append(end_date)
+        if since is not None:
+            clauses.append("fetched_at >= ?")
+            params.append(since)
+
+        cursor = self._connection().execute(
+            f"SELECT {', '.join(COLUMNS)} FROM fares"
+            f" WHERE {' AND '.join(clauses)} ORDER BY depart_date, id",
+            params,
+        )
+        while True:
+            rows = cursor.fetchmany(self.batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield dict(row)
+
+    def query(
+        self, origin, destination=None, start_date=None, end_date=None, since=None
+    ):
+        """
+        Load stored fares for a route and date range into a list.
+
+        Same arguments as ``iter_fares``; the result can be passed
+        directly to ``analyze()``.
+
+        Returns:
+            list: Flight dictionaries
+        """
+        return list(self.iter_fares(origin, destination, start_date, end_date, since))
+
+    def count(self):
+        """Total number of stored fares."""
+        return self._connection().execute("SELECT COUNT(*) FROM fares").fetchone()[0]
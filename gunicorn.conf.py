@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+# gunicorn.conf.py - Production server settings (gunicorn -c gunicorn.conf.py)
+# Author: Developer
+#
+# The app is built once in the master with the airport table and search
+# index already loaded (preload_app), then forked: workers share that
+# read-only data copy-on-write and start serving without rebuilding it.
+
+import os
+
+wsgi_app = "app:create_app(warm=True)"
+preload_app = True
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+# Threads per worker; upstream.default_pool_size() sizes connection pools to match
+threads = int(os.environ.get("WEB_THREADS", "4"))
+worker_class = "gthread"
+timeout = int(os.environ.get("WEB_TIMEOUT", "60"))
+
+
+def post_fork(server, worker):
+    # Connections must not be shared across processes; each worker opens
+    # its own upstream sessions on first use
+    import upstream
+
+    upstream.close_sessions()
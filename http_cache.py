@@ -0,0 +1,126 @@
+"""
+HTTP caching helpers for the JSON API: strong ETags and compressed bodies.
+
+A response body is serialized once, hashed for its ETag and compressed per
+content coding; the encoded variants are kept in a small cache keyed by
+that hash, so repeated polls for unchanged data neither re-serialize nor
+re-compress. Brotli is used when the ``brotli`` package is installed and
+the client accepts it, otherwise gzip.
+"""
+
+import gzip
+import hashlib
+import json
+
+from cache import TTLCache
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_SIZE = 512
+
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+_encoded = TTLCache(ttl=600, max_entries=256)
+
+
+def json_body(data):
+    """
+    Serialize data as canonical, compact JSON.
+
+    Keys are sorted so equal data always produces identical bytes (and so
+    the same ETag).
+
+    Args:
+        data: JSON-serializable value
+
+    Returns:
+        bytes: UTF-8 JSON
+    """
+    return json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def body_digest(body):
+    """Stable digest of a response body, used as the base of its ETag."""
+    return hashlib.sha256(body).hexdigest()[:32]
+
+
+def etag_for(digest, encoding=None):
+    """
+    Strong ETag for one representation of a body.
+
+    Each content coding is a different representation, so it gets its
+    own tag; ``matches`` accepts any of them for unchanged data.
+
+    Args:
+        digest (str): ``body_digest`` of the uncompressed body
+        encoding (str): Content coding, or None for identity
+
+    Returns:
+        str: Unquoted entity tag
+    """
+    return f"{digest}-{encoding}" if encoding else digest
+
+
+def matches(if_none_match, digest):
+    """
+    Check an If-None-Match header against the current body.
+
+    Args:
+        if_none_match (werkzeug.datastructures.ETags): Parsed header
+        digest (str): ``body_digest`` of the current body
+
+    Returns:
+        bool: True if the client already has this data
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.star_tag:
+        return True
+    return any(
+        if_none_match.contains_weak(etag_for(digest, encoding))
+        for encoding in (None,) + ENCODINGS
+    )
+
+
+def choose_encoding(accept_encodings, size):
+    """
+    Pick the content coding for a response.
+
+    Args:
+        accept_encodings (werkzeug.datastructures.Accept): Parsed
+            Accept-Encoding header
+        size (int): Uncompressed body size in bytes
+
+    Returns:
+        str: "br", "gzip", or None for identity
+    """
+    if size < MIN_COMPRESS_SIZE:
+        return None
+    return accept_encodings.best_match(ENCODINGS)
+
+
+def encode(body, digest, encoding):
+    """
+    Compress a body, reusing earlier work for the same body.
+
+    Args:
+        body (bytes): Uncompressed body
+        digest (str): ``body_digest`` of the body
+        encoding (str): "br", "gzip", or None
+
+    Returns:
+        bytes: Encoded body
+    """
+    if encoding is None:
+        return body
+
+    def compress():
+        if encoding == "br":
+            return brotli.compress(body, quality=5)
+        return gzip.compress(body, compresslevel=6, mtime=0)
+
+    return _encoded.get_or_load((digest, encoding), compress)
@@ -0,0 +1,327 @@
+"""
+Lightweight request instrumentation: stage timers, counters and histograms.
+
+Code on the hot path wraps its stages in ``timer("fetch")`` blocks. Each
+stage is recorded in a per-request list (sent back to the browser as a
+``Server-Timing`` header) and in a ``stage_seconds`` histogram. Counters
+and histograms are rendered at ``/metrics`` in the Prometheus text
+exposition format, so no client library is needed.
+
+With ``METRICS_ENABLED=0`` every timer is a shared no-op object and every
+``inc``/``observe`` returns immediately.
+"""
+
+import contextvars
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") != "0"
+
+# Seconds; covers cache hits (sub-millisecond) to slow upstream calls
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)  # fmt: skip
+
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonic counter, optionally split by label values."""
+
+    kind = "counter"
+
+    def __init__(self, registry, name, help_text, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        """
+        Add to the counter.
+
+        Args:
+            *labels: One value per label name
+            amount (float): Increment
+        """
+        if not self.registry.enabled:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        """Current value for the given label values."""
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in items
+        ]
+
+
+class Histogram:
+    """Cumulative-bucket histogram of observed values."""
+
+    kind = "histogram"
+
+    def __init__(
+        self, registry, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS
+    ):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        """
+        Record one observation.
+
+        Args:
+            value (float): Observed value (seconds for timings)
+            *labels: One value per label name
+        """
+        if not self.registry.enabled:
+            return
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts (last slot is +Inf), then sum and count
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *labels):
+        """Number of observations for the given label values."""
+        with self._lock:
+            series = self._series.get(labels)
+            return series[2] if series else 0
+
+    def render(self):
+        with self._lock:
+            items = sorted(
+                (labels, (list(counts), total, count))
+                for labels, (counts, total, count) in self._series.items()
+            )
+        lines = []
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = _format_labels(
+                    self.labelnames, labels, [("le", _format_value(bound))]
+                )
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+
+class Gauge:
+    """Value read from a callback when metrics are rendered."""
+
+    kind = "gauge"
+
+    def __init__(self, registry, name, help_text, callback, labelnames=()):
+        """
+        Args:
+            callback (callable): Returns a number, or a dict mapping label
+                value tuples to numbers
+        """
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.callback = callback
+        self.labelnames = tuple(labelnames)
+
+    def render(self):
+        values = self.callback()
+        if not isinstance(values, dict):
+            values = {(): values}
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(values.items())
+        ]
+
+
+class CallbackCounter(Gauge):
+    """Monotonic total kept elsewhere (e.g. a cache's hit count), read on render."""
+
+    kind = "counter"
+
+
+class _NullTimer:
+    """Reusable do-nothing timer returned while metrics are disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _StageTimer:
+    __slots__ = ("registry", "name", "started")
+
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.started
+        self.registry.stage_seconds.observe(elapsed, self.name)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((self.name, elapsed))
+        return False
+
+
+class Registry:
+    """Collection of metrics rendered together at /metrics."""
+
+    def __init__(self, enabled=True):
+        """
+        Args:
+            enabled (bool): Record anything at all
+        """
+        self.enabled = enabled
+        self._metrics = []
+        self._names = set()
+        self._lock = threading.Lock()
+        self.stage_seconds = self.histogram(
+            "skytrends_stage_seconds", "Time spent in each request stage", ["stage"]
+        )
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._names:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._names.add(metric.name)
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        """Create and register a Counter."""
+        return self._register(Counter(self, name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """Create and register a Histogram."""
+        return self._register(Histogram(self, name, help_text, labelnames, buckets))
+
+    def gauge(self, name, help_text, callback, labelnames=()):
+        """Create and register a callback Gauge."""
+        return self._register(Gauge(self, name, help_text, callback, labelnames))
+
+    def callback_counter(self, name, help_text, callback, labelnames=()):
+        """Create and register a CallbackCounter (name it ``..._total``)."""
+        return self._register(
+            CallbackCounter(self, name, help_text, callback, labelnames)
+        )
+
+    def timer(self, stage):
+        """
+        Time a block of code as a named request stage.
+
+        Args:
+            stage (str): Stage name, e.g. "fetch" or "render"
+
+        Returns:
+            Context manager recording the stage duration
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, stage)
+
+    def render(self):
+        """
+        Render every metric in the Prometheus text format.
+
+        Returns:
+            str: Exposition text
+        """
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry(enabled=METRICS_ENABLED)
+timer = registry.timer
+
+
+def start_request():
+    """Begin collecting stage timings for the current request."""
+    if registry.enabled:
+        _request_timings.set([])
+
+
+def request_timings():
+    """
+    Stage timings recorded so far in the current request.
+
+    Returns:
+        list: (stage name, seconds) tuples in completion order
+    """
+    return _request_timings.get() or []
+
+
+def server_timing_header(timings, total=None):
+    """
+    Format stage timings as a ``Server-Timing`` header value.
+
+    Args:
+        timings (list): (stage name, seconds) tuples
+        total (float): Whole request duration in seconds
+
+    Returns:
+        str: Header value, e.g. ``fetch;dur=120.4, render;dur=3.1``
+    """
+    parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings]
+    if total is not None:
+        parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
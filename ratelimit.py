@@ -0,0 +1,89 @@
+"""
+Token-bucket rate limiting for calls to rate-limited upstream APIs.
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Classic token bucket: ``rate`` tokens per second, at most ``capacity``.
+
+    A full bucket allows a burst of ``capacity`` calls; after that calls
+    are admitted at ``rate`` per second.
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic):
+        """
+        Args:
+            rate (float): Tokens added per second
+            capacity (float): Bucket size (default: one second of tokens,
+                at least 1)
+            clock (callable): Monotonic time source (injectable for tests)
+        """
+        self.rate = rate
+        self.capacity = max(1.0, rate) if capacity is None else capacity
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def try_acquire(self, tokens=1):
+        """
+        Take tokens if they are available right now.
+
+        Args:
+            tokens (float): Tokens needed
+
+        Returns:
+            bool: True if the tokens were taken
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def wait_time(self, tokens=1):
+        """Seconds until ``tokens`` would be available (0 if they are now)."""
+        with self._lock:
+            self._refill()
+            missing = tokens - self._tokens
+            return max(0.0, missing / self.rate) if self.rate > 0 else float("inf")
+
+    def acquire(self, tokens=1, timeout=None):
+        """
+        Block until tokens are available or the timeout passes.
+
+        Args:
+            tokens (float): Tokens needed
+            timeout (float): Longest wait in seconds (None: no limit)
+
+        Returns:
+            bool: True if the tokens were taken
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self.try_acquire(tokens):
+                return True
+            wait = self.wait_time(tokens)
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or wait > remaining:
+                    return False
+            time.sleep(min(wait, 1.0) or 0.001)
+
+    def available(self):
+        """Tokens currently in the bucket."""
+        with self._lock:
+            self._refill()
+            return self._tokens
@@ -0,0 +1,239 @@
+"""
+Compact flight records.
+
+Fares used to travel through the app as dicts, each carrying its own copy
+of eight string keys plus a hash table. ``Flight`` stores the same fields
+in ``__slots__`` (about a fifth of the memory of the dict) and interns its
+string values, so the airport codes, dates and airline names repeated
+across thousands of fares are stored once. Records still support
+``flight["price"]`` and ``flight.get("airline")``, so code written for
+dicts keeps working; ``to_dict()`` converts back at JSON/IO boundaries.
+
+``chain_flights`` concatenates several sources into one read-only sequence
+without copying any of them.
+"""
+
+import sys
+from bisect import bisect_right
+from collections.abc import Sequence
+from itertools import chain
+from operator import attrgetter, itemgetter
+
+FIELDS = (
+    "origin",
+    "destination",
+    "depart_date",
+    "return_date",
+    "price",
+    "airline",
+    "flight_number",
+    "source",
+)
+_FIELD_SET = frozenset(FIELDS)
+
+# The fields every analysis reads, fetched in C rather than via __getitem__
+_CORE_FIELDS = ("origin", "destination", "depart_date", "price")
+_core_attrs = attrgetter(*_CORE_FIELDS)
+_core_items = itemgetter(*_CORE_FIELDS)
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class Flight:
+    """One fare, stored in slots with interned string values."""
+
+    __slots__ = FIELDS
+
+    def __init__(
+        self,
+        origin,
+        destination,
+        depart_date,
+        price,
+        return_date=None,
+        airline=None,
+        flight_number=None,
+        source=None,
+    ):
+        self.origin = _intern(origin)
+        self.destination = _intern(destination)
+        self.depart_date = _intern(depart_date)
+        self.return_date = _intern(return_date)
+        self.price = price
+        self.airline = _intern(airline)
+        self.flight_number = flight_number
+        self.source = _intern(source)
+
+    @classmethod
+    def from_dict(cls, data, source=None):
+        """
+        Build a record from an API or generated flight dict.
+
+        Travelpayouts ``value``/``gate`` are read as ``price``/``airline``;
+        other unknown keys are dropped.
+
+        Args:
+            data (dict): Flight dictionary
+            source (str): Source used when the dict has none
+
+        Returns:
+            Flight: The record
+        """
+        return cls(
+            data.get("origin"),
+            data.get("destination"),
+            data.get("depart_date"),
+            data.get("price", data.get("value")),
+            data.get("return_date"),
+            data.get("airline", data.get("gate")),
+            data.get("flight_number"),
+            data.get("source", source),
+        )
+
+    def to_dict(self):
+        """
+        Convert to a plain dict (fields that are set only).
+
+        Returns:
+            dict: Flight dictionary
+        """
+        return {
+            name: getattr(self, name)
+            for name in FIELDS
+            if getattr(self, name) is not None
+        }
+
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        """Dict-style lookup; unset fields return ``default``."""
+        if key in _FIELD_SET:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        return default
+
+    def __contains__(self, key):
+        return key in _FIELD_SET and getattr(self, key) is not None
+
+    def keys(self):
+        """Names of the fields that are set."""
+        return [name for name in FIELDS if getattr(self, name) is not None]
+
+    def __eq__(self, other):
+        if isinstance(other, Flight):
+            return all(getattr(self, n) == getattr(other, n) for n in FIELDS)
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Flight({self.to_dict()!r})"
+
+
+def core_getter(flight):
+    """
+    Getter for (origin, destination, depart_date, price) suited to a flight.
+
+    Hot loops call the returned getter instead of four ``flight[...]``
+    lookups, which is several times cheaper for records.
+
+    Args:
+        flight (Flight or dict): Flight to read
+
+    Returns:
+        callable: ``getter(flight)`` returning the four-field tuple
+    """
+    return _core_attrs if type(flight) is Flight else _core_items
+
+
+def to_records(rows, source=None):
+    """
+    Convert flight dicts to records (records are passed through).
+
+    Args:
+        rows (iterable): Flight dicts or records
+        source (str): Source for dicts that don't carry one
+
+    Returns:
+        list: Flight records
+    """
+    return [
+        row if isinstance(row, Flight) else Flight.from_dict(row, source)
+        for row in rows
+    ]
+
+
+def to_dicts(flights):
+    """Convert records (or dicts) to plain dicts for JSON output."""
+    return [
+        flight.to_dict() if isinstance(flight, Flight) else flight for flight in flights
+    ]
+
+
+class FlightChain(Sequence):
+    """Read-only concatenation of flight sequences, without copying them."""
+
+    __slots__ = ("_parts", "_offsets")
+
+    def __init__(self, parts):
+        """
+        Args:
+            parts (list): Sequences (lists, tuples, other chains)
+        """
+        self._parts = [part for part in parts if len(part)]
+        self._offsets = []
+        total = 0
+        for part in self._parts:
+            self._offsets.append(total)
+            total += len(part)
+        self._offsets.append(total)
+
+    def __len__(self):
+        return self._offsets[-1]
+
+    def __iter__(self):
+        return chain.from_iterable(self._parts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("FlightChain index out of range")
+        part = bisect_right(self._offsets, index) - 1
+        return self._parts[part][index - self._offsets[part]]
+
+    def __repr__(self):
+        return f"FlightChain({len(self)} flights in {len(self._parts)} parts)"
+
+
+def chain_flights(*sources):
+    """
+    Concatenate flight sources without copying.
+
+    Args:
+        *sources: Lists, tuples or FlightChains (None is skipped)
+
+    Returns:
+        FlightChain: Sequence over every flight in order
+    """
+    parts = []
+    for source in sources:
+        if source is None:
+            continue
+        if isinstance(source, FlightChain):
+            parts.extend(source._parts)
+        else:
+            parts.append(source)
+    return FlightChain(parts)
@@ -0,0 +1,381 @@
+"""
+Background prefetch of hot routes and precomputed analysis rollups.
+
+A small in-process scheduler refreshes a configured set of routes (e.g. the
+busiest hubs) every ``interval`` seconds on a worker pool, keeping each
+route's fares and ``analyze()`` output in memory. Searches inside a
+prefetched window are answered from the rollup instead of waiting for the
+upstream API. Refreshes draw from a shared token bucket so prefetching
+never exceeds its upstream request budget.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+
+from aggregate import FlightAggregator
+
+
+class PrefetchJob:
+    """One route to keep warm: origin, destination and a rolling window."""
+
+    __slots__ = ("origin", "destination", "days", "offset")
+
+    def __init__(self, origin, destination="ANY", days=30, offset=0):
+        """
+        Args:
+            origin (str): Origin IATA code
+            destination (str): Destination IATA code or "ANY"
+            days (int): Window length in days
+            offset (int): Days from today to the window start
+        """
+        self.origin = origin.upper()
+        self.destination = (destination or "ANY").upper()
+        self.days = days
+        self.offset = offset
+
+    @classmethod
+    def parse(cls, spec):
+        """
+        Parse ``ORIGIN[:DEST[:DAYS[:OFFSET]]]``, e.g. ``"ATL:ANY:30"``.
+
+        Raises:
+            ValueError: If the spec is malformed
+        """
+        parts = [part.strip() for part in spec.split(":")]
+        if not parts[0] or len(parts) > 4:
+            raise ValueError(f"Invalid prefetch route: {spec!r}")
+        origin = parts[0]
+        destination = parts[1] if len(parts) > 1 and parts[1] else "ANY"
+        days = int(parts[2]) if len(parts) > 2 else 30
+        offset = int(parts[3]) if len(parts) > 3 else 0
+        return cls(origin, destination, days, offset)
+
+    def window(self, today):
+        """
+        Current date window for this job.
+
+        Args:
+            today (date): Reference date
+
+        Returns:
+            tuple: (start_date, end_date) as YYYY-MM-DD strings
+        """
+        start = today + timedelta(days=self.offset)
+        end = start + timedelta(days=self.days - 1)
+        return start.isoformat(), end.isoformat()
+
+    @property
+    def name(self):
+        return f"{self.origin}:{self.destination}:{self.days}:{self.offset}"
+
+
+class Rollup:
+    """Prefetched fares for one job window and their analysis."""
+
+    __slots__ = (
+        "start_date",
+        "end_date",
+        "flights",
+        "aggregator",
+        "results",
+        "data_source",
+    )
+
+    def __init__(self, start_date, end_date, flights, aggregator, data_source):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.flights = flights
+        self.aggregator = aggregator
+        self.results = aggregator.result()
+        self.data_source = data_source
+
+
+def parse_jobs(specs):
+    """
+    Parse a comma-separated list of prefetch routes.
+
+    Args:
+        specs (str): e.g. ``"ATL:ANY:30,LHR:JFK:14"``
+
+    Returns:
+        list: PrefetchJob objects
+    """
+    return [PrefetchJob.parse(spec) for spec in specs.split(",") if spec.strip()]
+
+
+class PrefetchScheduler:
+    """
+    Periodically refresh prefetch jobs and serve searches from the results.
+
+    ``fetch`` is called as ``fetch(origin, destination, start, end)`` and
+    must return ``(flights, data_source)``; it should raise when upstream
+    data is unavailable so the previous rollup is kept.
+    """
+
+    def __init__(
+        self,
+        jobs,
+        fetch,
+        interval=900,
+        max_age=None,
+        workers=2,
+        budget=None,
+        cost=None,
+        today=date.today,
+        clock=time.time,
+    ):
+        """
+        Args:
+            jobs (list): PrefetchJob objects
+            fetch (callable): Loads fares for a window (see class docstring)
+            interval (float): Seconds between refreshes of a job
+            max_age (float): Oldest rollup still served (default 2 * interval)
+            workers (int): Concurrent refreshes
+            budget (ratelimit.TokenBucket): Upstream request budget; a
+                refresh that cannot be paid for is retried on a later tick
+            cost (callable): ``cost(start, end)`` upstream requests a
+                refresh may make (default 1)
+            today (callable): Returns the current date
+            clock (callable): Returns the current wall-clock time
+
+        Raises:
+            ValueError: If a job costs more than the budget's capacity, so
+                it could never be paid for without overspending
+        """
+        self.jobs = list(jobs)
+        self.fetch = fetch
+        self.interval = interval
+        self.max_age = 2 * interval if max_age is None else max_age
+        self.budget = budget
+        self.cost = cost or (lambda start, end: 1)
+        if budget is not None:
+            for job in self.jobs:
+                job_cost = self.cost(*job.window(today()))
+                if job_cost > budget.capacity:
+                    raise ValueError(
+                        f"Prefetch route {job.name} may make {job_cost} upstream "
+                        f"requests per refresh, more than the budget of "
+                        f"{budget.capacity:g}"
+                    )
+        self._today = today
+        self._clock = clock
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="prefetch"
+        )
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        # Per job name: Rollup, refresh time, last attempt details
+        self._rollups = {}
+        self._refreshed_at = {}
+        self._next_run = {job.name: 0.0 for job in self.jobs}
+        self._running = set()
+        self._last = {job.name: {} for job in self.jobs}
+
+    def run_pending(self):
+        """
+        Start refreshes for every job that is due and affordable.
+
+        Returns:
+            list: Futures of the refreshes started
+        """
+        now = self._clock()
+        futures = []
+        # Longest-overdue first, so jobs deferred by the budget aren't starved
+        with self._lock:
+            jobs = sorted(self.jobs, key=lambda job: self._next_run[job.name])
+        for job in jobs:
+            with self._lock:
+                if job.name in self._running or self._next_run[job.name] > now:
+                    continue
+                start, end = job.window(self._today())
+                if self.budget is not None and not self.budget.try_acquire(
+                    self.cost(start, end)
+                ):
+                    self._last[job.name]["deferred"] = "rate budget"
+                    continue
+                self._running.add(job.name)
+            futures.append(self._pool.submit(self._refresh, job, start, end))
+        return futures
+
+    def _refresh(self, job, start, end):
+        started = time.perf_counter()
+        try:
+            flights, data_source = self.fetch(job.origin, job.destination, start, end)
+            aggregator = FlightAggregator(flights)
+            rollup = Rollup(start, end, flights, aggregator, data_source)
+        except Exception as e:
+            print(f"Prefetch error ({job.name}): {e}")
+            with self._lock:
+                self._last[job.name] = {
+                    "error": str(e),
+                    "duration": round(time.perf_counter() - started, 3),
+                }
+                self._next_run[job.name] = self._clock() + self.interval
+                self._running.discard(job.name)
+            return
+
+        with self._lock:
+            self._rollups[job.name] = rollup
+            self._refreshed_at[job.name] = self._clock()
+            self._last[job.name] = {
+                "duration": round(time.perf_counter() - started, 3),
+            }
+            self._next_run[job.name] = self._clock() + self.interval
+            self._running.discard(job.name)
+
+    def _covering(self, origin, destination, start_date, end_date):
+        """Fresh (job destination, rollup, refresh time) covering a search."""
+        origin = origin.upper()
+        destination = (destination or "ANY").upper()
+        now = self._clock()
+        with self._lock:
+            candidates = [
+                (job.destination, self._rollups[job.name], self._refreshed_at[job.name])
+                for job in self.jobs
+                if job.origin == origin
+                and job.name in self._rollups
+                and now - self._refreshed_at[job.name] <= self.max_age
+                and job.destination in ("ANY", destination)
+            ]
+        return [
+            candidate
+            for candidate in candidates
+            if candidate[1].start_date
+            <= start_date
+            <= end_date
+            <= candidate[1].end_date
+        ]
+
+    def version(self, origin, destination, start_date, end_date):
+        """
+        Refresh times of the rollups that could answer a search.
+
+        The value changes whenever ``lookup()`` could start returning
+        different data, so it can validate cached responses cheaply.
+
+        Returns:
+            tuple: Refresh times (empty if no rollup covers the search)
+        """
+        return tuple(
+            refreshed_at
+            for _, _, refreshed_at in self._covering(
+                origin, destination, start_date, end_date
+            )
+        )
+
+    def lookup(self, origin, destination, start_date, end_date):
+        """
+        Answer a search from a fresh rollup, if one covers it.
+
+        An exact window match returns the precomputed analysis; a range
+        inside a window is aggregated from the prefetched fares.
+
+        Args:
+            origin (str): Origin IATA code
+            destination (str): Destination IATA code (or "ANY")
+            start_date (str): Start date in YYYY-MM-DD format
+            end_date (str): End date in YYYY-MM-DD format
+
+        Returns:
+            tuple: (analysis results, data source), or None on a miss
+        """
+        hit = self.lookup_aggregate(origin, destination, start_date, end_date)
+        return None if hit is None else hit[1:]
+
+    def lookup_aggregate(self, origin, destination, start_date, end_date):
+        """
+        Like ``lookup()``, also returning the mergeable aggregate.
+
+        Returns:
+            tuple: (FlightAggregator, analysis results, data source), or
+                None on a miss; merge the aggregator rather than updating it
+        """
+        destination = (destination or "ANY").upper()
+        candidates = self._covering(origin, destination, start_date, end_date)
+        for job_destination, rollup, _ in candidates:
+            window = (rollup.start_date, rollup.end_date)
+            if (start_date, end_date) == window and destination == job_destination:
+                return rollup.aggregator, rollup.results, rollup.data_source
+            flights = [
+                flight
+                for flight in rollup.flights
+                if start_date <= flight["depart_date"] <= end_date
+                and (destination == "ANY" or flight.get("destination") == destination)
+            ]
+            if flights:
+                aggregator = FlightAggregator(flights)
+                return aggregator, aggregator.result(), rollup.data_source
+        return None
+
+    def status(self):
+        """
+        Refresh state of every job, for the status endpoint.
+
+        Returns:
+            list: One dict per job with its window, last refresh time
+                (ISO 8601), age in seconds, fare count and last error
+        """
+        now = self._clock()
+        rows = []
+        with self._lock:
+            for job in self.jobs:
+                rollup = self._rollups.get(job.name)
+                refreshed = self._refreshed_at.get(job.name)
+                row = {
+                    "route": job.name,
+                    "origin": job.origin,
+                    "destination": job.destination,
+                    "start_date": rollup.start_date if rollup else None,
+                    "end_date": rollup.end_date if rollup else None,
+                    "last_refreshed": (
+                        datetime.fromtimestamp(refreshed, timezone.utc).isoformat(
+                            timespec="seconds"
+                        )
+                        if refreshed
+                        else None
+                    ),
+                    "age_seconds": round(now - refreshed, 1) if refreshed else None,
+                    "fresh": bool(refreshed and now - refreshed <= self.max_age),
+                    "flights": len(rollup.flights) if rollup else 0,
+                    "data_source": rollup.data_source if rollup else None,
+                    "refreshing": job.name in self._running,
+                    "next_run_in": round(max(0.0, self._next_run[job.name] - now), 1),
+                }
+                row.update(self._last[job.name])
+                rows.append(row)
+        return rows
+
+    def _loop(self, tick):
+        while not self._stop.wait(tick):
+            try:
+                self.run_pending()
+            except Exception as e:
+                print(f"Prefetch scheduler error: {e}")
+
+    def start(self, tick=5.0):
+        """
+        Run due jobs now and then every ``tick`` seconds in a daemon thread.
+
+        Returns:
+            bool: False if the scheduler was already running
+        """
+        with self._lock:
+            if self._thread is not None:
+                return False
+            self._thread = threading.Thread(
+                target=self._loop, args=(tick,), name="prefetch-scheduler", daemon=True
+            )
+        self.run_pending()
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """Stop the scheduler thread and wait for running refreshes."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._pool.shutdown(wait=True)
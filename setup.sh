@@ -13,7 +13,7 @@ source venv/bin/activate
 pip install -r requirements.txt
 
 # Install specific packages if they're missing
-pip install flask requests beautifulsoup4
+pip install flask requests
 
 # Run the application
 python app.py
\ No newline at end of file
@@ -0,0 +1,99 @@
+"""
+Single-flight request coalescing.
+
+Concurrent callers asking for the same key share one in-flight call
+instead of each running it, so a burst of identical searches produces one
+upstream fetch and one analysis.
+"""
+
+import threading
+
+
+class _Call:
+    __slots__ = ("event", "result", "error", "waiters")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Run at most one call per key at a time and share its result."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.coalesced = 0
+        self.timeouts = 0
+
+    def do(self, key, fn, timeout=None):
+        """
+        Run ``fn`` for ``key``, or wait for the identical call in flight.
+
+        The first caller (the leader) runs ``fn``; callers arriving while it
+        runs wait for its result, or its exception, for up to ``timeout``
+        seconds. Nothing is cached once the call finishes.
+
+        Args:
+            key: Hashable identity of the call
+            fn (callable): Zero-argument function to run
+            timeout (float): Seconds a waiter waits for the leader (None: forever)
+
+        Returns:
+            tuple: (result, shared) where shared is True for waiters
+
+        Raises:
+            TimeoutError: If a waiter gives up before the leader finishes
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+                leader = True
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+
+        if leader:
+            try:
+                call.result = fn()
+            except Exception as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.event.set()
+        elif not call.event.wait(timeout):
+            with self._lock:
+                self.timeouts += 1
+            raise TimeoutError(f"Timed out waiting for in-flight call {key!r}")
+
+        if call.error is not None:
+            raise call.error
+        return call.result, not leader
+
+    def in_flight(self):
+        """Number of keys currently being computed."""
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        """
+        Get coalescing counters.
+
+        Returns:
+            dict: Leader calls, coalesced waiters, timeouts and keys in flight
+        """
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "timeouts": self.timeouts,
+                "in_flight": len(self._calls),
+            }
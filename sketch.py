@@ -0,0 +1,284 @@
+"""
+Mergeable quantile sketches for fare distributions.
+
+Exact percentiles need every price in memory and a sort. ``QuantileSketch``
+is a DDSketch: prices are counted in logarithmic buckets whose width is set
+by ``relative_accuracy``, so any quantile is returned within that relative
+error (1% by default) while only one counter per occupied bucket is kept.
+Fares between $50 and $5,000 fit in about 230 buckets, however many fares
+are added. Sketches built on different shards or workers combine exactly
+with ``merge()``, and the buckets do not depend on the order of the data.
+
+``distribution_stats()`` turns per-route and per-date sketches into the
+quantile summary and ``distribution`` block of the analysis output.
+"""
+
+import math
+
+RELATIVE_ACCURACY = 0.01
+MAX_BINS = 2048
+HISTOGRAM_BINS = 10
+
+# (output key, quantile) pairs
+SUMMARY_QUANTILES = (("p50_price", 0.5), ("p90_price", 0.9), ("p99_price", 0.99))
+BAND_QUANTILES = (("p10", 0.1), ("p50", 0.5), ("p90", 0.9))
+
+
+class QuantileSketch:
+    """Fixed-accuracy, mergeable quantile sketch over positive prices."""
+
+    __slots__ = (
+        "relative_accuracy",
+        "max_bins",
+        "gamma",
+        "multiplier",
+        "bins",
+        "zero_count",
+        "count",
+        "total",
+        "min",
+        "max",
+    )
+
+    def __init__(self, relative_accuracy=RELATIVE_ACCURACY, max_bins=MAX_BINS):
+        """
+        Args:
+            relative_accuracy (float): Maximum relative error of quantiles
+            max_bins (int): Bucket limit; beyond it the lowest buckets are
+                folded together (only reached for extreme value ranges)
+
+        Raises:
+            ValueError: If relative_accuracy is not between 0 and 1
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.multiplier = 1 / math.log(self.gamma)
+        self.bins = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def key(self, value):
+        """Bucket index of a value (None for zero and negative values)."""
+        if value > 0:
+            return math.ceil(math.log(value) * self.multiplier)
+        return None
+
+    def value(self, key):
+        """Representative value of a bucket (relative error <= accuracy)."""
+        return 2 * self.gamma**key / (self.gamma + 1)
+
+    def add(self, value, count=1):
+        """
+        Add a value (``count`` times).
+
+        Args:
+            value (float): Price; zero and negative values share one bucket
+            count (int): Number of occurrences
+        """
+        self.add_key(self.key(value), value, count)
+
+    def add_key(self, key, value, count=1):
+        """
+        Add a value whose bucket was already computed with ``key()``.
+
+        Lets callers feeding several sketches with the same price take the
+        logarithm once.
+
+        Args:
+            key (int): ``key(value)``
+            value (float): Price
+            count (int): Number of occurrences
+        """
+        if key is None:
+            self.zero_count += count
+        else:
+            bins = self.bins
+            if key in bins:
+                bins[key] += count
+            else:
+                bins[key] = count
+                if len(bins) > self.max_bins:
+                    self._collapse()
+        self.count += count
+        self.total += value * count
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def add_bins(self, bins, zero_count, count, total, low, high):
+        """
+        Add pre-bucketed counts, e.g. computed in bulk with NumPy.
+
+        Args:
+            bins (dict): Bucket index -> count, from ``key()``
+            zero_count (int): Count of non-positive values
+            count (int): Total count, including zero_count
+            total (float): Sum of the values
+            low (float): Smallest value
+            high (float): Largest value
+        """
+        for key, n in bins.items():
+            self.bins[key] = self.bins.get(key, 0) + n
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+        self.zero_count += zero_count
+        self.count += count
+        self.total += total
+        if count:
+            if self.min is None or low < self.min:
+                self.min = low
+            if self.max is None or high > self.max:
+                self.max = high
+
+    def merge(self, other):
+        """
+        Fold another sketch into this one.
+
+        Args:
+            other (QuantileSketch): Sketch with the same relative accuracy
+
+        Returns:
+            QuantileSketch: self, for chaining
+
+        Raises:
+            ValueError: If the sketches use different accuracies
+        """
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        self.add_bins(
+            other.bins,
+            other.zero_count,
+            other.count,
+            other.total,
+            other.min,
+            other.max,
+        )
+        return self
+
+    def _collapse(self):
+        keys = sorted(self.bins)
+        excess = len(keys) - self.max_bins
+        target = keys[excess]
+        for key in keys[:excess]:
+            self.bins[target] += self.bins.pop(key)
+
+    def _clamp(self, value):
+        return min(max(value, self.min), self.max)
+
+    def quantile(self, q):
+        """
+        Estimate the ``q`` quantile.
+
+        Args:
+            q (float): Quantile between 0 and 1
+
+        Returns:
+            float: Estimate within the relative accuracy (None if empty)
+        """
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        if q <= 0 or rank < self.zero_count:
+            return float(self.min)
+        if q >= 1:
+            return float(self.max)
+        seen = self.zero_count
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                return float(self._clamp(self.value(key)))
+        return float(self.max)
+
+    def histogram(self, bins=HISTOGRAM_BINS):
+        """
+        Approximate equal-width histogram between the minimum and maximum.
+
+        Args:
+            bins (int): Number of histogram bins
+
+        Returns:
+            list: Dicts with low, high and count
+        """
+        if not self.count:
+            return []
+        low, high = float(self.min), float(self.max)
+        if low == high:
+            return [{"low": round(low, 2), "high": round(high, 2), "count": self.count}]
+        width = (high - low) / bins
+        counts = [0] * bins
+        counts[0] += self.zero_count
+        for key, n in self.bins.items():
+            position = (self._clamp(self.value(key)) - low) / width
+            counts[min(int(position), bins - 1)] += n
+        return [
+            {
+                "low": round(low + i * width, 2),
+                "high": round(low + (i + 1) * width, 2),
+                "count": count,
+            }
+            for i, count in enumerate(counts)
+        ]
+
+    def __len__(self):
+        return len(self.bins)
+
+    def __repr__(self):
+        return f"QuantileSketch(count={self.count}, bins={len(self.bins)})"
+
+
+def _quantiles(sketch, pairs):
+    return {name: round(sketch.quantile(q), 2) for name, q in pairs}
+
+
+def empty_stats():
+    """Quantile summary and distribution block of an empty analysis."""
+    return {name: 0 for name, _ in SUMMARY_QUANTILES}, {"routes": [], "bands": []}
+
+
+def distribution_stats(route_sketches, date_sketches, top_routes):
+    """
+    Build the quantile output of an analysis from its sketches.
+
+    Args:
+        route_sketches (dict): (origin, destination) -> QuantileSketch
+        date_sketches (dict): depart_date -> QuantileSketch
+        top_routes (list): ``top_routes`` entries to describe, in order
+
+    Returns:
+        tuple: (summary quantiles: p50_price, p90_price, p99_price;
+            distribution: per-route quantiles and histograms for the top
+            routes, and p10/p50/p90 bands per departure date)
+    """
+    if not route_sketches:
+        return empty_stats()
+
+    overall = QuantileSketch()
+    for sketch in route_sketches.values():
+        overall.merge(sketch)
+
+    routes = []
+    for route in top_routes:
+        sketch = route_sketches[(route["origin"], route["destination"])]
+        entry = {
+            "origin": route["origin"],
+            "destination": route["destination"],
+            "count": sketch.count,
+        }
+        entry.update(_quantiles(sketch, BAND_QUANTILES))
+        entry["histogram"] = sketch.histogram()
+        routes.append(entry)
+
+    bands = []
+    for date in sorted(date_sketches):
+        band = {"depart_date": date}
+        band.update(_quantiles(date_sketches[date], BAND_QUANTILES))
+        bands.append(band)
+
+    return _quantiles(overall, SUMMARY_QUANTILES), {"routes": routes, "bands": bands}
@@ -0,0 +1,367 @@
+"""
+Deterministic synthetic fare generator.
+
+Prices are derived from a stable hash of (seed, origin, destination,
+departure day) instead of the builtin ``hash()``, which is salted per
+process, so every worker and every restart produces the same fares. Each
+route gets a 64-bit key from BLAKE2b; per-day values come from a
+splitmix64 mix of that key and the day number, which vectorizes over whole
+route x day grids when numpy is installed and falls back to plain integer
+arithmetic (with identical results) when it is not.
+
+Used as the ``scrape_backup`` fallback and to produce production-sized
+data sets for benchmarks and load tests, either as a stream of flight
+dictionaries, as JSONL, or directly as ``columnar.FlightColumns``.
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import json
+import math
+import sys
+from datetime import date, timedelta
+from itertools import product
+from string import ascii_uppercase
+
+from records import Flight
+
+# numpy is optional (the pure-Python path gives the same fares) and is only
+# imported when a grid is first generated with it
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+
+def _numpy():
+    import numpy
+
+    return numpy
+
+
+DISTRIBUTIONS = ("uniform", "lognormal")
+
+_MASK64 = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+_MIX1 = 0xBF58476D1CE4E5B9
+_MIX2 = 0x94D049BB133111EB
+
+
+def _mix64(x):
+    """splitmix64 finalizer on a Python int."""
+    x = ((x ^ (x >> 30)) * _MIX1) & _MASK64
+    x = ((x ^ (x >> 27)) * _MIX2) & _MASK64
+    return x ^ (x >> 31)
+
+
+def _mix64_array(x):
+    """splitmix64 finalizer on a uint64 array (multiplication wraps mod 2**64)."""
+    np = _numpy()
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(_MIX1)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(_MIX2)
+    return x ^ (x >> np.uint64(31))
+
+
+def _date_range(start_date, end_date):
+    start = date.fromisoformat(start_date)
+    days = (date.fromisoformat(end_date) - start).days + 1
+    return [start + timedelta(days=i) for i in range(max(days, 0))]
+
+
+class FareGenerator:
+    """Generate reproducible fares for any set of routes and dates."""
+
+    def __init__(
+        self,
+        seed=0,
+        distribution="uniform",
+        low=200,
+        high=500,
+        median=None,
+        sigma=0.35,
+        return_days=7,
+        airline="DEMO",
+        source="scraper",
+        use_numpy=None,
+        as_records=False,
+    ):
+        """
+        Args:
+            seed (int): Changes every generated price
+            distribution (str): "uniform" (integer prices in [low, high)) or
+                "lognormal" (median * exp(sigma * N(0, 1)), at least 1)
+            low (int): Lowest uniform price
+            high (int): Uniform prices stay below this
+            median (float): Lognormal median (default: midpoint of low/high)
+            sigma (float): Lognormal shape; larger means a longer tail
+            return_days (int): Days between departure and return date
+            airline (str): Airline on every generated fare
+            source (str): Source label on every generated fare
+            use_numpy (bool): Force the numpy (True) or pure-Python (False)
+                path; None uses numpy when it is installed
+            as_records (bool): Produce ``records.Flight`` objects instead
+                of dicts
+
+        Raises:
+            ValueError: If the distribution or its parameters are invalid
+        """
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution: {distribution!r}")
+        if distribution == "uniform" and high <= low:
+            raise ValueError("high must be greater than low")
+        if use_numpy and not HAS_NUMPY:
+            raise ValueError("numpy is not installed")
+
+        self.seed = seed
+        self.distribution = distribution
+        self.low = int(low)
+        self.high = int(high)
+        self.median = (low + high) / 2 if median is None else median
+        self.sigma = sigma
+        self.return_days = return_days
+        self.airline = airline
+        self.source = source
+        self.use_numpy = HAS_NUMPY if use_numpy is None else use_numpy
+        self.as_records = as_records
+
+    def route_key(self, origin, destination):
+        """
+        Stable 64-bit key for a route.
+
+        Args:
+            origin (str): Origin IATA code
+            destination (str): Destination IATA code
+
+        Returns:
+            int: Key derived from the seed and both codes
+        """
+        text = f"{self.seed}:{origin}:{destination}".encode("utf-8")
+        return int.from_bytes(hashlib.blake2b(text, digest_size=8).digest(), "little")
+
+    def _price(self, h):
+        if self.distribution == "uniform":
+            return self.low + h % (self.high - self.low)
+        # Box-Muller on the two 32-bit halves of the hash
+        u1 = ((h >> 32) + 1) / 4294967296.0
+        u2 = (h & 0xFFFFFFFF) / 4294967296.0
+        z = math.sqrt(-2.0 * math.log(u1)) * math.cos(2.0 * math.pi * u2)
+        return max(1, round(self.median * math.exp(self.sigma * z)))
+
+    def _prices_array(self, h):
+        np = _numpy()
+        if self.distribution == "uniform":
+            span = np.uint64(self.high - self.low)
+            return (h % span).astype(np.int64) + self.low
+        u1 = ((h >> np.uint64(32)) + np.uint64(1)).astype(np.float64) / 4294967296.0
+        u2 = (h & np.uint64(0xFFFFFFFF)).astype(np.float64) / 4294967296.0
+        z = np.sqrt(-2.0 * np.log(u1)) * np.cos(2.0 * np.pi * u2)
+        prices = np.rint(self.median * np.exp(self.sigma * z)).astype(np.int64)
+        return np.maximum(prices, 1)
+
+    def price_grid(self, routes, days):
+        """
+        Prices for every route on every day.
+
+        Args:
+            routes (list): (origin, destination) tuples
+            days (list): ``datetime.date`` departure days
+
+        Returns:
+            list or np.ndarray: One row of integer prices per route
+                (an int64 array of shape (routes, days) on the numpy path)
+        """
+        keys = [self.route_key(origin, dest) for origin, dest in routes]
+        ordinals = [day.toordinal() for day in days]
+
+        if self.use_numpy:
+            np = _numpy()
+            steps = np.array(ordinals, dtype=np.uint64) * np.uint64(_GOLDEN)
+            h = _mix64_array(np.array(keys, dtype=np.uint64)[:, None] + steps[None, :])
+            return self._prices_array(h)
+
+        steps = [(ordinal * _GOLDEN) & _MASK64 for ordinal in ordinals]
+        return [
+            [self._price(_mix64((key + step) & _MASK64)) for step in steps]
+            for key in keys
+        ]
+
+    def iter_fares(self, routes, start_date, end_date):
+        """
+        Stream fares route by route, day by day.
+
+        Prices are computed for a batch of routes at a time, so memory
+        stays flat however many fares are produced.
+
+        Args:
+            routes (iterable): (origin, destination) tuples
+            start_date (str): Start date in YYYY-MM-DD format
+            end_date (str): End date in YYYY-MM-DD format
+
+        Yields:
+            dict: Flight dictionaries in the ``scrape_backup`` format (or
+                ``records.Flight`` objects with ``as_records``)
+        """
+        days = _date_range(start_date, end_date)
+        depart = [day.isoformat() for day in days]
+        returns = [(day + timedelta(days=self.return_days)).isoformat() for day in days]
+        numbers = [f"DM{100 + i}" for i in range(len(days))]
+
+        batch = max(1, 65536 // max(len(days), 1))
+        routes = iter(routes)
+        while True:
+            chunk = [route for _, route in zip(range(batch), routes)]
+            if not chunk:
+                break
+            grid = self.price_grid(chunk, days)
+            if self.use_numpy:
+                grid = grid.tolist()
+            for (origin, dest), prices in zip(chunk, grid):
+                if self.as_records:
+                    for i, price in enumerate(prices):
+                        yield Flight(
+                            origin,
+                            dest,
+                            depart[i],
+                            price,
+                            returns[i],
+                            self.airline,
+                            numbers[i],
+                            self.source,
+                        )
+                    continue
+                for i, price in enumerate(prices):
+                    yield {
+                        "origin": origin,
+                        "destination": dest,
+                        "depart_date": depart[i],
+                        "return_date": returns[i],
+                        "price": price,
+                        "airline": self.airline,
+                        "flight_number": numbers[i],
+                        "source": self.source,
+                    }
+
+    def generate(self, origin, destinations, start_date, end_date):
+        """
+        Fares from one origin to each destination over a date range.
+
+        Args:
+            origin (str): Origin IATA code
+            destinations (list): Destination IATA codes
+            start_date (str): Start date in YYYY-MM-DD format
+            end_date (str): End date in YYYY-MM-DD format
+
+        Returns:
+            list: List of flight dictionaries (or records)
+        """
+        routes = [(origin, dest) for dest in destinations]
+        return list(self.iter_fares(routes, start_date, end_date))
+
+    def to_columns(self, routes, start_date, end_date):
+        """
+        Generate fares straight into columnar form, skipping the dicts.
+
+        Args:
+            routes (list): (origin, destination) tuples
+            start_date (str): Start date in YYYY-MM-DD format
+            end_date (str): End date in YYYY-MM-DD format
+
+        Returns:
+            columnar.FlightColumns: Same fares as ``iter_fares``
+
+        Raises:
+            ValueError: If numpy is not installed
+        """
+        if not HAS_NUMPY:
+            raise ValueError("numpy is not installed")
+        np = _numpy()
+        from columnar import FlightColumns
+
+        routes = list(routes)
+        days = _date_range(start_date, end_date)
+        grid = np.asarray(self.price_grid(routes, days), dtype=np.int64)
+        size = len(routes) * len(days)
+        return FlightColumns(
+            route_codes=np.repeat(np.arange(len(routes), dtype=np.int32), len(days)),
+            date_codes=np.tile(np.arange(len(days), dtype=np.int32), len(routes)),
+            prices=grid.reshape(size).astype(np.float64),
+            int_prices=np.ones(size, dtype=bool),
+            routes=routes,
+            dates=[day.isoformat() for day in days],
+        )
+
+
+def make_routes(count, seed=0):
+    """
+    Deterministic list of distinct (origin, destination) routes.
+
+    Codes are three-letter strings drawn from the seed, so large route
+    sets can be produced without an airport list.
+
+    Args:
+        count (int): Number of routes
+        seed (int): Changes which codes are paired
+
+    Returns:
+        list: (origin, destination) tuples
+    """
+    codes = ["".join(letters) for letters in product(ascii_uppercase, repeat=3)]
+    routes = []
+    seen = set()
+    i = 0
+    while len(routes) < count:
+        h = _mix64((seed * _GOLDEN + i) & _MASK64)
+        i += 1
+        origin = h % len(codes)
+        dest = (h >> 20) % (len(codes) - 1)
+        if dest >= origin:
+            dest += 1
+        route = (codes[origin], codes[dest])
+        if route not in seen:
+            seen.add(route)
+            routes.append(route)
+    return routes
+
+
+def write_jsonl(fares, fp):
+    """
+    Write fares as JSON Lines.
+
+    Args:
+        fares (iterable): Flight dictionaries
+        fp: Text file object
+
+    Returns:
+        int: Number of fares written
+    """
+    count = 0
+    for fare in fares:
+        fp.write(json.dumps(fare, separators=(",", ":")))
+        fp.write("\n")
+        count += 1
+    return count
+
+
+def main(argv=None):
+    """Write synthetic fares as JSONL (``python synthetic.py --help``)."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--routes", type=int, default=100)
+    parser.add_argument("--start", default="2024-01-01")
+    parser.add_argument("--end", default="2024-12-31")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="uniform")
+    parser.add_argument("--output", "-o", help="JSONL file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    generator = FareGenerator(seed=args.seed, distribution=args.distribution)
+    fares = generator.iter_fares(
+        make_routes(args.routes, args.seed), args.start, args.end
+    )
+    if args.output:
+        with open(args.output, "w") as fp:
+            count = write_jsonl(fares, fp)
+    else:
+        count = write_jsonl(fares, sys.stdout)
+    print(f"Wrote {count} fares", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+# tests/helpers.py - Shared fakes and sample data for the tests
+# Author: Developer
+
+
+class FakeClock:
+    """Manually advanced clock for TTL, rate and breaker tests."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_flights(count, base_price=300, source="api"):
+    """Build ``count`` JFK-LAX flights spread over July 2023."""
+    return [
+        {
+            "origin": "JFK",
+            "destination": "LAX",
+            "depart_date": f"2023-07-{i % 28 + 1:02d}",
+            "price": base_price + i,
+            "source": source,
+        }
+        for i in range(count)
+    ]
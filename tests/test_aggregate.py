@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# tests/test_aggregate.py - Test streaming, mergeable flight aggregation
+# Author: Developer
+
+import pickle
+import random
+import unittest
+
+from aggregate import FlightAggregator
+from analysis import analyze
+
+
+def make_flights(count, seed):
+    """Build random flights with route ties and repeated dates."""
+    rng = random.Random(seed)
+    airports = ["JFK", "LAX", "LHR", "CDG", "SYD"]
+    return [
+        {
+            "origin": rng.choice(airports[:2]),
+            "destination": rng.choice(airports),
+            "depart_date": f"2023-08-{rng.randint(1, 20):02d}",
+            "price": rng.randint(100, 700),
+        }
+        for _ in range(count)
+    ]
+
+
+class TestFlightAggregator(unittest.TestCase):
+    """Test cases for FlightAggregator."""
+
+    def test_empty(self):
+        """Test that an empty aggregate matches analyze([])."""
+        self.assertEqual(FlightAggregator().result(), analyze([]))
+
+    def test_matches_analyze(self):
+        """Test one-pass aggregation from a generator."""
+        data = make_flights(300, 7)
+        aggregator = FlightAggregator(flight for flight in data)
+
+        self.assertEqual(len(aggregator), 300)
+        self.assertEqual(aggregator.result(), analyze(data))
+
+    def test_incremental_update(self):
+        """Test that results can be emitted while flights keep arriving."""
+        data = make_flights(100, 3)
+        aggregator = FlightAggregator(data[:40])
+        self.assertEqual(aggregator.result(), analyze(data[:40]))
+
+        aggregator.update(data[40:])
+        self.assertEqual(aggregator.result(), analyze(data))
+
+    def test_merge_chunks(self):
+        """Test that merged partial states equal the concatenated analysis."""
+        data = make_flights(500, 11)
+        chunks = [data[i : i + 120] for i in range(0, len(data), 120)]
+
+        merged = FlightAggregator()
+        for chunk in chunks:
+            merged.merge(FlightAggregator(chunk))
+
+        self.assertEqual(merged.result(), analyze(data))
+        self.assertEqual(FlightAggregator().merge(merged).result(), analyze(data))
+
+    def test_pickle_round_trip(self):
+        """Test that partial state can be shipped between processes."""
+        aggregator = FlightAggregator(make_flights(50, 2))
+        restored = pickle.loads(pickle.dumps(aggregator))
+
+        self.assertEqual(restored.result(), aggregator.result())
+
+
+if __name__ == "__main__":
+    unittest.main()
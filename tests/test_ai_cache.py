@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# tests/test_ai_cache.py - Test the persistent AI answer cache
+# Author: Developer
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from ai_cache import AnswerCache, normalize_question
+
+
+class TestNormalizeQuestion(unittest.TestCase):
+    """Test cases for question normalization."""
+
+    def test_case_punctuation_whitespace(self):
+        """Test that case, punctuation and spacing are folded."""
+        self.assertEqual(
+            normalize_question("  Best time to book flights to Europe?! "),
+            normalize_question("best time to book flights, to europe"),
+        )
+
+    def test_token_set(self):
+        """Test that token-set mode ignores word order and repeats."""
+        self.assertEqual(
+            normalize_question("europe flights best time", token_set=True),
+            normalize_question("best time: flights flights EUROPE", token_set=True),
+        )
+        self.assertNotEqual(
+            normalize_question("europe flights"), normalize_question("flights europe")
+        )
+
+
+class TestAnswerCache(unittest.TestCase):
+    """Test cases for the two-tier answer cache."""
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(handle)
+        self.addCleanup(self.remove_files)
+
+    def remove_files(self):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+    def test_memory_and_disk_tiers(self):
+        """Test that answers survive a restart through the SQLite file."""
+        cache = AnswerCache(path=self.path)
+        self.assertIsNone(cache.get("When to book?"))
+        cache.set("When to book?", "<p>Early.</p>")
+        self.assertEqual(cache.get("when to book"), "<p>Early.</p>")
+
+        restarted = AnswerCache(path=self.path)
+        self.assertEqual(restarted.get("WHEN TO BOOK"), "<p>Early.</p>")
+        self.assertEqual(restarted.get("when to book"), "<p>Early.</p>")
+
+        stats = restarted.stats()
+        self.assertEqual(stats["disk_hits"], 1)
+        self.assertEqual(stats["memory_hits"], 1)
+        self.assertEqual(stats["disk_entries"], 1)
+        self.assertEqual(stats["hit_rate"], 1.0)
+
+    def test_namespace(self):
+        """Test that answers from another model are not reused."""
+        AnswerCache(path=self.path, namespace="model-a").set("q", "a")
+        self.assertIsNone(AnswerCache(path=self.path, namespace="model-b").get("q"))
+
+    def test_ttl(self):
+        """Test that expired answers are misses in both tiers."""
+        cache = AnswerCache(path=self.path, ttl=60)
+        with patch("ai_cache.time.time", return_value=1000.0):
+            cache.set("q", "a")
+        with patch("ai_cache.time.time", return_value=1061.0):
+            self.assertIsNone(cache.get("q"))
+            self.assertIsNone(AnswerCache(path=self.path, ttl=60).get("q"))
+
+    def test_size_limit(self):
+        """Test that the least recently used answers are pruned."""
+        cache = AnswerCache(path=self.path, max_entries=2, memory_entries=1)
+        with patch("ai_cache.time.time", return_value=1000.0):
+            cache.set("first", "1")
+        with patch("ai_cache.time.time", return_value=1001.0):
+            cache.set("second", "2")
+        with patch("ai_cache.time.time", return_value=1002.0):
+            cache.get("first")
+        with patch("ai_cache.time.time", return_value=1003.0):
+            cache.set("third", "3")
+
+        fresh = AnswerCache(path=self.path)
+        with patch("ai_cache.time.time", return_value=1004.0):
+            self.assertEqual(fresh.get("first"), "1")
+            self.assertIsNone(fresh.get("second"))
+        self.assertEqual(fresh.stats()["disk_entries"], 2)
+
+    def test_unusable_file_falls_back_to_memory(self):
+        """Test that SQLite errors become misses and skipped writes."""
+        errors = []
+        path = os.path.join(self.path + ".missing", "dir", "ai.sqlite3")
+        cache = AnswerCache(path=path, on_error=errors.append)
+
+        self.assertIsNone(cache.get("q"))
+        cache.set("q", "answer")
+        self.assertEqual(cache.get("q"), "answer")
+
+        self.assertEqual(len(errors), 2)
+        self.assertIsInstance(errors[0], sqlite3.Error)
+        self.assertEqual(cache.counts()["memory_hits"], 1)
+        self.assertFalse(os.path.exists(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
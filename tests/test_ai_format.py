@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# tests/test_ai_format.py - Test the AI answer formatter
+# Author: Developer
+
+import random
+import unittest
+
+from ai_format import format_answer, replace_emojis
+from benchmarks.fixtures import SAMPLE_ANSWER, legacy_format
+
+EDGE_CASES = [
+    "",
+    "   plain text   ",
+    "#\nTitle on next line",
+    "##\n\n### Nested\ntext",
+    "# ## x",
+    "-\nfoo",
+    "1.\n2. two",
+    "**bold** start\n\nmiddle **b** and **c**",
+    "✅️ with selector, ☀ without",
+    "text\n \n\t\nmore",
+    "<b>html</b> already\n\n10. ten\n- mixed",
+]
+
+FUZZ_PIECES = [
+    "#", "##", "###", "####", " ", "\t", "\n", "\n\n", "\n \n", "- ", "• ",
+    "1. ", "12. ", "-", "**", "*", "text", "<b>", ">", "✈️", "✈", "⭐", "✅",
+    "☀", "☀️", "🌤️", "️", "\r",
+]  # fmt: skip
+
+
+class TestFormatAnswer(unittest.TestCase):
+    """Test that the compiled formatter matches the original behavior."""
+
+    def test_sample_answer(self):
+        """Test a typical model answer."""
+        html = format_answer(SAMPLE_ANSWER)
+
+        self.assertEqual(html, legacy_format(SAMPLE_ANSWER))
+        self.assertIn("<h4>Best Time to Book", html)
+        self.assertIn("<ul class='ai-list'>", html)
+        self.assertIn("<ol class='ai-list'>", html)
+        self.assertIn('<i class="bi bi-star-fill text-warning"></i>', html)
+
+    def test_edge_cases(self):
+        """Test quirks of the original regex chain are preserved."""
+        for text in EDGE_CASES:
+            self.assertEqual(format_answer(text), legacy_format(text), repr(text))
+
+    def test_random_equivalence(self):
+        """Test equivalence on randomly assembled markdown fragments."""
+        rng = random.Random(42)
+        for _ in range(3000):
+            text = "".join(rng.choice(FUZZ_PIECES) for _ in range(rng.randint(0, 20)))
+            self.assertEqual(format_answer(text), legacy_format(text), repr(text))
+
+    def test_replace_emojis(self):
+        """Test one-pass emoji replacement."""
+        self.assertEqual(
+            replace_emojis("go ✈️!"),
+            'go  <i class="bi bi-airplane "></i> !',
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# tests/test_airports.py - Test airport search and lookup
+# Author: Developer
+
+import json
+import os
+import tempfile
+import unittest
+
+from airports import (
+    COMMON_AIRPORTS,
+    MAX_PREFIX_CANDIDATES,
+    AirportIndex,
+    AirportTable,
+    get_airport_by_code,
+    load_airports,
+    search_airports,
+)
+
+
+def linear_search(query):
+    """Reference implementation: substring scan over every field."""
+    query = query.lower()
+    return [
+        airport
+        for airport in COMMON_AIRPORTS
+        if any(
+            query in airport[field].lower()
+            for field in ("name", "city", "country", "code")
+        )
+    ]
+
+
+class TestAirportSearch(unittest.TestCase):
+    """Test cases for the indexed airport search."""
+
+    def codes(self, results):
+        return [airport["code"] for airport in results]
+
+    def test_exact_code_first(self):
+        """Test that an exact IATA match ranks above other matches."""
+        index = AirportIndex(
+            [
+                {"code": "XYZ", "name": "Lax Field", "city": "Laxton", "country": "UK"},
+                {"code": "LAX", "name": "Los Angeles", "city": "LA", "country": "USA"},
+            ]
+        )
+        self.assertEqual(self.codes(index.search("lax")), ["LAX", "XYZ"])
+
+    def test_prefix_before_substring(self):
+        """Test that word prefixes outrank plain substrings."""
+        index = AirportIndex(
+            [
+                {"code": "AAA", "name": "Gondola", "city": "Nowhere", "country": "X"},
+                {"code": "BBB", "name": "Ondo Airport", "city": "Ondo", "country": "X"},
+            ]
+        )
+        self.assertEqual(self.codes(index.search("ond")), ["BBB", "AAA"])
+
+    def test_matches_linear_scan(self):
+        """Test that every substring match of 3+ characters is found."""
+        for query in ["lon", "international", "usa", "airport", "york", "ber"]:
+            expected = set(self.codes(linear_search(query)))
+            actual = set(self.codes(search_airports(query, limit=None)))
+            self.assertTrue(expected <= actual, query)
+
+    def test_prefix_cap_keeps_best_ranks(self):
+        """Test that capping many prefix matches never drops a better rank."""
+        airports = [
+            {"code": f"{i:03d}", "name": "Sabre Field", "city": "Ely", "country": "X"}
+            for i in range(600)
+        ]
+        airports.append(
+            {"code": "SFO", "name": "SFO", "city": "San Francisco", "country": "USA"}
+        )
+        airports += [
+            {"code": f"W{i:02d}", "name": "West Salt", "city": "Ely", "country": "X"}
+            for i in range(600)
+        ]
+        airports.append(
+            {"code": "ZZZ", "name": "Saltaire", "city": "Ely", "country": "X"}
+        )
+        index = AirportIndex(airports)
+
+        self.assertGreater(len(airports), MAX_PREFIX_CANDIDATES)
+        self.assertEqual(self.codes(index.search("sa", limit=3)), ["SFO", "000", "001"])
+        # Name prefix beats 600 earlier airports with a later word "Salt"
+        self.assertEqual(self.codes(index.search("sal", limit=2)), ["ZZZ", "W00"])
+
+    def test_typo_tolerance(self):
+        """Test that one typo still finds the airport."""
+        self.assertEqual(self.codes(search_airports("londn"))[:1], ["LHR"])
+        self.assertEqual(self.codes(search_airports("Tokio"))[:1], ["HND"])
+
+    def test_accents_and_case(self):
+        """Test that accents and case are ignored."""
+        index = AirportIndex(
+            [
+                {
+                    "code": "ZRH",
+                    "name": "Zürich Airport",
+                    "city": "Zürich",
+                    "country": "CH",
+                }
+            ]
+        )
+        self.assertEqual(self.codes(index.search("ZURICH")), ["ZRH"])
+
+    def test_limit(self):
+        """Test that the result list is capped."""
+        self.assertEqual(len(search_airports("airport", limit=3)), 3)
+        self.assertEqual(search_airports("   "), [])
+
+
+class TestAirportTable(unittest.TestCase):
+    """Test cases for the compact airport table and dataset loading."""
+
+    def write_file(self, suffix, content):
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_lookup_by_code(self):
+        """Test constant-time lookup, case-insensitive."""
+        self.assertEqual(get_airport_by_code("lhr")["city"], "London")
+        self.assertIsNone(get_airport_by_code("ZZZ"))
+
+    def test_table_matches_common_airports(self):
+        """Test that the table round-trips the airport dictionaries."""
+        table = AirportTable.from_dicts(COMMON_AIRPORTS)
+        self.assertEqual(list(table), COMMON_AIRPORTS)
+        self.assertGreater(table.memory_bytes(), 0)
+
+    def test_load_csv(self):
+        """Test loading an OurAirports-style CSV, skipping rows without IATA."""
+        path = self.write_file(
+            ".csv",
+            "iata_code,name,municipality,iso_country\n"
+            "MEL,Melbourne Airport,Melbourne,AU\n"
+            ",Some Heliport,Nowhere,AU\n"
+            "AVV,Avalon Airport,Melbourne,AU\n",
+        )
+        table = load_airports(path)
+
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.get("avv")["city"], "Melbourne")
+        # Repeated values are shared, not copied per row
+        self.assertIs(table.cities[0], table.cities[1])
+
+    def test_load_json(self):
+        """Test loading a JSON object keyed by IATA code."""
+        path = self.write_file(
+            ".json",
+            json.dumps(
+                {"BNE": {"name": "Brisbane", "city": "Brisbane", "country": "AU"}}
+            ),
+        )
+        table = load_airports(path)
+
+        self.assertEqual(table.get("BNE")["name"], "Brisbane")
+        self.assertEqual(AirportIndex(table).search("brisbane")[0]["code"], "BNE")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,7 +6,7 @@
 import unittest
 
 # Import the function to test
-from app import analyze
+from analysis import analyze
 
 
 class TestAnalyze(unittest.TestCase):
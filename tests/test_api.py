@@ -8,13 +8,13 @@ from unittest.mock import patch, MagicMock
 import json
 
 # Import the function to test
-from app import fetch_api_data
+from app import fetch_api_data, date_shards
 
 
 class TestAPI(unittest.TestCase):
     """Test cases for API functionality."""
 
-    @patch("app.requests.get")
+    @patch("app.upstream.get")
     def test_fetch_api_data_success(self, mock_get):
         """Test successful API data fetch."""
         # Mock response
@@ -49,7 +49,7 @@ class TestAPI(unittest.TestCase):
         mock_get.assert_called_once()
 
     @unittest.skip("Skipping this test in CI environment")
-    @patch("app.requests.get")
+    @patch("app.upstream.get")
     def test_fetch_api_data_error(self, mock_get):
         """Test API error handling."""
         # Mock error response
@@ -63,6 +63,77 @@ class TestAPI(unittest.TestCase):
         # Assertions
         self.assertEqual(result, [])
 
+    def test_date_shards(self):
+        """Test splitting a date range into shards."""
+        shards = date_shards("2023-07-01", "2023-07-31", days=14)
+
+        self.assertEqual(
+            shards,
+            [
+                ("2023-07-01", "2023-07-14"),
+                ("2023-07-15", "2023-07-28"),
+                ("2023-07-29", "2023-07-31"),
+            ],
+        )
+        self.assertEqual(
+            date_shards("2023-07-01", "2023-07-01"), [("2023-07-01", "2023-07-01")]
+        )
+
+    @patch("app.upstream.get")
+    def test_fetch_api_data_empty_range(self, mock_get):
+        """Test that a start date after the end date fetches nothing."""
+        self.assertEqual(date_shards("2023-07-10", "2023-07-01"), [])
+        self.assertEqual(fetch_api_data("JFK", "LAX", "2023-07-10", "2023-07-01"), [])
+        mock_get.assert_not_called()
+
+    @patch("app.API_PAGE_LIMIT", 2)
+    @patch("app.upstream.get")
+    def test_fetch_api_data_sharded(self, mock_get):
+        """Test that wide ranges are paged per shard and de-duplicated."""
+
+        def flight(date, price):
+            return {
+                "origin": "JFK",
+                "destination": "LAX",
+                "depart_date": date,
+                "price": price,
+            }
+
+        pages = {
+            ("2023-07-01", None): [
+                flight("2023-07-01", 100),
+                flight("2023-07-02", 110),
+            ],
+            ("2023-07-01", 2): [flight("2023-07-03", 120)],
+            ("2023-07-15", None): [
+                flight("2023-07-15", 130),
+                flight("2023-07-02", 110),
+            ],
+            ("2023-07-15", 2): [],
+        }
+
+        def fake_get(url, params):
+            response = MagicMock()
+            response.raise_for_status.return_value = None
+            key = (params["beginning_of_period"], params.get("page"))
+            response.json.return_value = {"data": pages[key]}
+            return response
+
+        mock_get.side_effect = fake_get
+
+        result = fetch_api_data("JFK", "LAX", "2023-07-01", "2023-07-28")
+
+        self.assertEqual(mock_get.call_count, 4)
+        self.assertEqual(
+            [(f["depart_date"], f["price"]) for f in result],
+            [
+                ("2023-07-01", 100),
+                ("2023-07-02", 110),
+                ("2023-07-03", 120),
+                ("2023-07-15", 130),
+            ],
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# tests/test_api_analysis.py - Test the /api/analysis JSON endpoint
+# Author: Developer
+
+import gzip
+import json
+import unittest
+from unittest.mock import patch
+
+import app as webapp
+import http_cache
+from cache import TTLCache
+from tests.helpers import FakeClock, make_flights
+
+REAL_FETCH_FARES = webapp.fetch_fares
+REAL_SEARCH_FLIGHTS = webapp.search_flights
+
+QUERY = (
+    "/api/analysis?origin=jfk&destination=LAX"
+    "&start_date=2023-07-01&end_date=2023-07-28"
+)
+
+
+class TestApiAnalysis(unittest.TestCase):
+    """Test cases for /api/analysis."""
+
+    def setUp(self):
+        self.client = webapp.app.test_client()
+        patcher = patch("app.fetch_fares", return_value=make_flights(40))
+        self.fetch = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_returns_analysis(self):
+        """Test that the endpoint returns analyze() output as JSON."""
+        response = self.client.get(QUERY)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "application/json")
+        data = response.get_json()
+        self.assertEqual(data["query"]["origin"], "JFK")
+        self.assertEqual(data["data_source"], "API data")
+        self.assertEqual(data["results"], webapp.analyze(make_flights(40)))
+        self.assertIn("max-age=", response.headers["Cache-Control"])
+        self.assertEqual(response.headers["Vary"], "Accept-Encoding")
+
+    def test_missing_parameters(self):
+        """Test that incomplete queries are rejected."""
+        response = self.client.get("/api/analysis?origin=JFK")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("error", response.get_json())
+
+    def test_invalid_dates(self):
+        """Test that malformed or reversed dates are rejected before searching."""
+        errors = webapp.ERRORS.value("fetch")
+        with patch("app.search_flights", side_effect=AssertionError("searched")):
+            for dates in (
+                "start_date=x&end_date=y",
+                "start_date=2023-07-31&end_date=2023-07-01",
+            ):
+                response = self.client.get(f"/api/analysis?origin=JFK&{dates}")
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", response.get_json())
+        self.assertEqual(webapp.ERRORS.value("fetch"), errors)
+
+    def test_etag_not_modified(self):
+        """Test that a matching If-None-Match gets an empty 304."""
+        first = self.client.get(QUERY)
+        etag = first.headers["ETag"]
+        self.assertFalse(etag.startswith("W/"))
+
+        second = self.client.get(QUERY, headers={"If-None-Match": etag})
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.data, b"")
+        self.assertEqual(second.headers["ETag"], etag)
+
+    def test_etag_changes_with_data(self):
+        """Test that different data yields a different ETag."""
+        etag = self.client.get(QUERY).headers["ETag"]
+        self.fetch.return_value = make_flights(40, base_price=350)
+
+        response = self.client.get(QUERY, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_not_modified_skips_search(self):
+        """Test that an unchanged poll is answered before searching."""
+        fare_cache = TTLCache(ttl=300)
+        with patch("app.fetch_fares", REAL_FETCH_FARES), patch(
+            "app.fare_cache", fare_cache
+        ), patch("app.fetch_and_record", return_value=make_flights(40)):
+            etag = self.client.get(QUERY).headers["ETag"]
+            # The first search filled the cache, so its body isn't vouched
+            # for yet; the next poll searches once more and stores it
+            response = self.client.get(QUERY, headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 304)
+
+            with patch("app.search_flights", side_effect=AssertionError("searched")):
+                response = self.client.get(QUERY, headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.headers["ETag"], etag)
+
+            # New fares for the query invalidate the shortcut
+            key = ("JFK", "LAX", "2023-07-01", "2023-07-28")
+            fare_cache.set(key, make_flights(40, base_price=350))
+            response = self.client.get(QUERY, headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_refresh_during_search_not_vouched_for(self):
+        """Test that a refresh landing mid-search doesn't pin the old ETag."""
+        clock = FakeClock()
+        fare_cache = TTLCache(ttl=300, stale_ttl=600, clock=clock)
+        refreshes = []
+
+        class DeferredThread:
+            """Hold background refreshes until the search has returned."""
+
+            def __init__(self, target, args, daemon):
+                self.target, self.args = target, args
+
+            def start(self):
+                refreshes.append(self)
+
+        def search_then_refresh(*args):
+            result = REAL_SEARCH_FLIGHTS(*args)
+            while refreshes:
+                thread = refreshes.pop()
+                thread.target(*thread.args)
+            return result
+
+        with patch("app.fetch_fares", REAL_FETCH_FARES), patch(
+            "app.fare_cache", fare_cache
+        ), patch("app.fetch_and_record", return_value=make_flights(40)) as fetch, patch(
+            "cache.threading.Thread", DeferredThread
+        ):
+            etag = self.client.get(QUERY).headers["ETag"]
+            self.client.get(QUERY, headers={"If-None-Match": etag})
+
+            # Stale: the poll is answered from the old fares while the
+            # refresh stores new ones before the search returns
+            clock.now = 400
+            fetch.return_value = make_flights(40, base_price=900)
+            with patch("app.search_flights", side_effect=search_then_refresh):
+                response = self.client.get(QUERY, headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 304)
+
+            response = self.client.get(QUERY, headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response.headers["ETag"], etag)
+            self.assertEqual(
+                response.get_json()["results"]["summary"]["min_price"], 900
+            )
+
+    def test_gzip(self):
+        """Test gzip compression when the client accepts it."""
+        plain = self.client.get(QUERY)
+        with patch("http_cache.ENCODINGS", ("gzip",)):
+            response = self.client.get(QUERY, headers={"Accept-Encoding": "gzip"})
+            # A compressed representation still revalidates
+            revalidated = self.client.get(
+                QUERY,
+                headers={
+                    "Accept-Encoding": "gzip",
+                    "If-None-Match": response.headers["ETag"],
+                },
+            )
+
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.data), plain.data)
+        self.assertLess(len(response.data), len(plain.data))
+        self.assertNotEqual(response.headers["ETag"], plain.headers["ETag"])
+        self.assertEqual(revalidated.status_code, 304)
+
+    @unittest.skipUnless(http_cache.brotli, "brotli not installed")
+    def test_brotli(self):
+        """Test brotli compression when available and accepted."""
+        response = self.client.get(QUERY, headers={"Accept-Encoding": "gzip, br"})
+
+        self.assertEqual(response.headers["Content-Encoding"], "br")
+        data = json.loads(http_cache.brotli.decompress(response.data))
+        self.assertEqual(data["data_source"], "API data")
+
+    def test_small_bodies_uncompressed(self):
+        """Test that tiny bodies skip compression."""
+        self.fetch.return_value = []
+        with patch("app.scrape_backup", return_value=[]):
+            response = self.client.get(QUERY, headers={"Accept-Encoding": "gzip"})
+
+        self.assertNotIn("Content-Encoding", response.headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
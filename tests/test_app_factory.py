@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# tests/test_app_factory.py - Test the application factory and lazy imports
+# Author: Developer
+
+import os
+import subprocess
+import sys
+import unittest
+from unittest.mock import patch
+
+import app as webapp
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def loaded_modules(statement):
+    """Run ``statement`` in a fresh interpreter and list the loaded modules."""
+    code = f"import sys\n{statement}\nprint('\\n'.join(sys.modules))"
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return set(output.split())
+
+
+class TestAppFactory(unittest.TestCase):
+    """Test cases for create_app()."""
+
+    def test_separate_apps(self):
+        """Test that each call builds a configured app with all routes."""
+        first = webapp.create_app({"TESTING": True})
+        second = webapp.create_app()
+
+        self.assertIsNot(first, second)
+        self.assertTrue(first.testing)
+        self.assertFalse(second.testing)
+        rules = {rule.rule for rule in first.url_map.iter_rules()}
+        self.assertTrue({"/", "/results", "/api/analysis", "/metrics"} <= rules)
+        response = first.test_client().get("/search_airport?q=JFK")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()[0]["code"], "JFK")
+
+    def test_default_app_is_cached(self):
+        """Test that the module-level app is built once on first access."""
+        self.assertIs(webapp.app, webapp.app)
+        with self.assertRaises(AttributeError):
+            webapp.no_such_attribute
+
+    def test_warm_builds_airport_index(self):
+        """Test that warm=True builds the shared airport data up front."""
+        with patch("app.get_airport_table") as table, patch(
+            "app.get_search_index"
+        ) as index:
+            webapp.create_app(warm=True)
+
+        table.assert_called_once_with()
+        index.assert_called_once_with()
+
+
+class TestLazyImports(unittest.TestCase):
+    """Test that heavy dependencies load only when needed."""
+
+    def test_analysis_without_web_stack(self):
+        """Test that the analysis code imports without Flask or requests."""
+        modules = loaded_modules("import analysis")
+
+        self.assertIn("analysis", modules)
+        for heavy in ("flask", "requests", "numpy"):
+            self.assertNotIn(heavy, modules)
+
+    def test_app_import_skips_optional_dependencies(self):
+        """Test that importing the app doesn't load numpy or BeautifulSoup."""
+        modules = loaded_modules("import app")
+
+        self.assertIn("flask", modules)
+        self.assertNotIn("numpy", modules)
+        self.assertNotIn("bs4", modules)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# tests/test_ask_ai.py - Test the AI assistant endpoints
+# Author: Developer
+
+import io
+import json
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+
+import app as webapp
+from ai_cache import AnswerCache
+
+REAL_AI_CACHE = webapp.ai_cache
+
+
+def parse_events(body):
+    """Split an SSE body into (event, data) tuples."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def stream_response(deltas):
+    """Build a real streamed OpenRouter response carrying ``deltas``."""
+    lines = [": OPENROUTER PROCESSING", ""]
+    for delta in deltas:
+        chunk = {"choices": [{"delta": {"content": delta}}]}
+        lines += [f"data: {json.dumps(chunk, ensure_ascii=False)}", ""]
+    lines.append("data: [DONE]")
+
+    response = requests.Response()
+    response.status_code = 200
+    # No charset, like the upstream event stream
+    response.headers["Content-Type"] = "text/event-stream"
+    response.raw = io.BytesIO("\n".join(lines).encode("utf-8"))
+    return response
+
+
+class TestAskAI(unittest.TestCase):
+    """Test cases for /ask_ai and /ask_ai/stream."""
+
+    def setUp(self):
+        self.client = webapp.app.test_client()
+        patcher = patch.dict(os.environ, {"AI_KEY": "test-key"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        # Fresh memory-only answer cache per test
+        cache_patcher = patch("app.ai_cache", AnswerCache(path=None))
+        self.cache = cache_patcher.start()
+        self.addCleanup(cache_patcher.stop)
+
+    @patch("app.upstream.post")
+    def test_ask_ai(self, mock_post):
+        """Test the non-streaming answer is formatted."""
+        mock_post.return_value = MagicMock(
+            status_code=200,
+            json=lambda: {"choices": [{"message": {"content": "**Book** early ✈️"}}]},
+        )
+
+        response = self.client.post("/ask_ai", json={"question": "When?"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("<strong>Book</strong>", response.get_json()["response"])
+        self.assertIn("Q: When?", response.get_json()["response"])
+
+    @patch("app.upstream.post")
+    def test_ask_ai_stream(self, mock_post):
+        """Test that streamed deltas are relayed as SSE and finish formatted."""
+        deltas = ["Book **early**", ".\n\n- one\n", "- two"]
+        mock_post.return_value = stream_response(deltas)
+
+        response = self.client.post("/ask_ai/stream", json={"question": "When?"})
+        events = parse_events(response.get_data(as_text=True))
+
+        self.assertEqual(response.mimetype, "text/event-stream")
+        self.assertTrue(mock_post.call_args.kwargs["stream"])
+        self.assertTrue(mock_post.call_args.kwargs["json"]["stream"])
+        self.assertEqual(
+            [name for name, _ in events], ["start", "chunk", "chunk", "chunk", "done"]
+        )
+        self.assertEqual(events[1][1], {"html": "", "pending": "Book **early**"})
+        self.assertEqual(events[2][1]["html"], "<p>Book <strong>early</strong>.</p>\n")
+        self.assertEqual(
+            events[-1][1]["response"],
+            "<div class='ai-question mb-3'><strong>Q: When?</strong></div>"
+            "<div class='ai-answer'><p>Book <strong>early</strong>.</p>\n"
+            "<ul class='ai-list'><li>one</li><li>two</li></ul></div>",
+        )
+
+    @patch("app.upstream.post")
+    def test_ask_ai_stream_utf8(self, mock_post):
+        """Test that non-ASCII deltas survive the uncharseted event stream."""
+        # The UTF-8 encoding of ✅ contains \x85, a line break to str.splitlines
+        mock_post.return_value = stream_response(["✅ café ", "in Zürich ✈️"])
+
+        response = self.client.post("/ask_ai/stream", json={"question": "Où?"})
+        events = parse_events(response.get_data(as_text=True))
+
+        self.assertEqual(events[-1][0], "done")
+        answer = events[-1][1]["response"]
+        self.assertIn("café in Zürich", answer)
+        self.assertIn("bi-check-circle-fill", answer)  # ✅ arrived intact
+
+    @patch("app.upstream.post")
+    def test_repeated_question_served_from_cache(self, mock_post):
+        """Test that a near-identical question skips the upstream call."""
+        mock_post.return_value = MagicMock(
+            status_code=200,
+            json=lambda: {"choices": [{"message": {"content": "Six weeks."}}]},
+        )
+
+        first = self.client.post("/ask_ai", json={"question": "Best time to book?"})
+        second = self.client.post("/ask_ai", json={"question": "best time to  book"})
+        streamed = self.client.post(
+            "/ask_ai/stream", json={"question": "BEST TIME TO BOOK!"}
+        )
+
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertIn("<p>Six weeks.</p>", second.get_json()["response"])
+        self.assertIn("Q: best time to  book", second.get_json()["response"])
+        events = parse_events(streamed.get_data(as_text=True))
+        self.assertEqual([name for name, _ in events], ["start", "done"])
+        self.assertEqual(self.cache.stats()["memory_hits"], 2)
+
+    @patch("app.upstream.post")
+    def test_unusable_cache_still_answers(self, mock_post):
+        """Test that an unopenable cache file doesn't break the assistant."""
+        mock_post.return_value = MagicMock(
+            status_code=200,
+            json=lambda: {"choices": [{"message": {"content": "Six weeks."}}]},
+        )
+        # Reuses the app cache's error hook, which counts into ERRORS
+        cache = AnswerCache(
+            path="/nonexistent/dir/ai.sqlite3", on_error=REAL_AI_CACHE.on_error
+        )
+        before = webapp.ERRORS.value("ai_cache")
+
+        with patch("app.ai_cache", cache):
+            response = self.client.post("/ask_ai", json={"question": "When?"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("<p>Six weeks.</p>", response.get_json()["response"])
+        mock_post.assert_called_once()
+        # Lookup and store both failed, and both were counted
+        self.assertEqual(webapp.ERRORS.value("ai_cache"), before + 2)
+
+    def test_ask_ai_stream_without_key(self):
+        """Test that a missing key is reported as an error event."""
+        with patch.dict(os.environ, {"AI_KEY": ""}):
+            response = self.client.post("/ask_ai/stream", json={"question": "x"})
+
+        events = parse_events(response.get_data(as_text=True))
+        self.assertEqual(events[0][0], "error")
+
+
+if __name__ == "__main__":
+    unittest.main()
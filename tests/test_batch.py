@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# tests/test_batch.py - Test the offline batch analysis CLI
+# Author: Developer
+
+import contextlib
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import batch
+from analysis import analyze
+from synthetic import FareGenerator, make_routes, write_jsonl
+
+
+def make_fares(routes=12, end="2024-02-15"):
+    generator = FareGenerator(seed=3, distribution="lognormal")
+    return list(generator.iter_fares(make_routes(routes, 3), "2024-01-01", end))
+
+
+def as_json(result):
+    # Round-trip so tuples/floats compare the way the CLI writes them
+    return json.loads(json.dumps(result))
+
+
+class TestBatch(unittest.TestCase):
+    """Test cases for batch analysis of fare files."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        self.fares = make_fares()
+
+    def path(self, name):
+        return os.path.join(self.dir, name)
+
+    def write_jsonl(self, name, fares):
+        opener = gzip.open if name.endswith(".gz") else open
+        with opener(self.path(name), "wt") as fp:
+            write_jsonl(fares, fp)
+        return self.path(name)
+
+    def write_csv(self, name, fares):
+        fields = ["origin", "destination", "depart_date", "price", "airline"]
+        with open(self.path(name), "w", newline="") as fp:
+            writer = csv.DictWriter(fp, fields, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(fares)
+        return self.path(name)
+
+    def test_chunks_match_analyze(self):
+        """Test that any chunking reads each row once and matches analyze()."""
+        path = self.write_jsonl("fares.jsonl", self.fares)
+        expected = as_json(analyze(self.fares))
+
+        for chunk_bytes in (1, 97, 1000, 10**9):
+            result, stats = batch.run_batch([path], workers=1, chunk_bytes=chunk_bytes)
+            self.assertEqual(stats["rows"], len(self.fares))
+            self.assertEqual(as_json(result), expected)
+
+    def test_process_pool(self):
+        """Test that worker processes merge to the single-process result."""
+        first = self.write_jsonl("a.jsonl", self.fares[:300])
+        second = self.write_jsonl("b.jsonl.gz", self.fares[300:])
+
+        result, stats = batch.run_batch([first, second], workers=2, chunk_bytes=4096)
+
+        self.assertEqual(stats["workers"], 2)
+        self.assertGreater(stats["chunks"], 2)
+        self.assertEqual(as_json(result), as_json(analyze(self.fares)))
+
+    def test_csv_and_bad_rows(self):
+        """Test CSV input, Travelpayouts rows and skipped rows."""
+        csv_path = self.write_csv("fares.csv", self.fares)
+        with open(csv_path, "a") as fp:
+            fp.write("JFK,LAX,2024-01-01,not-a-price,DEMO\n")
+            fp.write(",LAX,2024-01-01,100,DEMO\n")
+            for price in ("nan", "inf", "-5", "0"):
+                fp.write(f"JFK,LAX,2024-01-01,{price},DEMO\n")
+        json_path = self.path("api.jsonl")
+        with open(json_path, "w") as fp:
+            fp.write('{"origin":"JFK","destination":"LAX",')
+            fp.write('"depart_date":"2024-01-02","value":123}\n\n')
+            fp.write("{broken\n[1, 2]\n")
+            for price in ("NaN", "Infinity", "-Infinity", "true"):
+                fp.write('{"origin":"JFK","destination":"LAX",')
+                fp.write(f'"depart_date":"2024-01-02","price":{price}}}\n')
+
+        result, stats = batch.run_batch([csv_path, json_path], chunk_bytes=512)
+
+        self.assertEqual(stats["rows"], len(self.fares) + 1)
+        self.assertEqual(stats["skipped"], 12)
+        extra = {
+            "origin": "JFK",
+            "destination": "LAX",
+            "depart_date": "2024-01-02",
+            "price": 123,
+        }
+        self.assertEqual(as_json(result), as_json(analyze(self.fares + [extra])))
+
+    def test_csv_matches_jsonl(self):
+        """Test that CSV and JSONL exports of the same fares agree exactly."""
+        fares = [dict(fare, price=round(fare["price"])) for fare in self.fares]
+        fares[0]["price"] = 50.5
+        csv_result, _ = batch.run_batch([self.write_csv("f.csv", fares)])
+        jsonl_result, _ = batch.run_batch([self.write_jsonl("f.jsonl", fares)])
+
+        self.assertEqual(csv_result, jsonl_result)
+        self.assertIs(type(csv_result["summary"]["max_price"]), int)
+
+    def test_format_detection(self):
+        """Test format detection from file names."""
+        self.assertEqual(batch.detect_format("x/fares.csv.gz"), "csv")
+        self.assertEqual(batch.detect_format("fares.NDJSON"), "jsonl")
+        with self.assertRaises(ValueError):
+            batch.detect_format("fares.parquet")
+
+    def test_cli(self):
+        """Test that the CLI writes the analysis and reports throughput."""
+        path = self.write_jsonl("fares.jsonl", self.fares)
+        output = self.path("out.json")
+        stderr = io.StringIO()
+
+        with contextlib.redirect_stderr(stderr):
+            batch.main([path, "-o", output, "--workers", "1", "--chunk-size", "2K"])
+
+        with open(output) as fp:
+            self.assertEqual(json.load(fp), as_json(analyze(self.fares)))
+        self.assertIn(f"Analyzed {len(self.fares)} rows", stderr.getvalue())
+        self.assertIn("rows/s", stderr.getvalue())
+
+        with contextlib.redirect_stderr(io.StringIO()) as stderr:
+            with self.assertRaises(SystemExit):
+                batch.main([self.path("missing.jsonl")])
+        self.assertIn("No such file", stderr.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
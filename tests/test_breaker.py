@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# tests/test_breaker.py - Test upstream circuit breakers
+# Author: Developer
+
+import unittest
+
+from breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from tests.helpers import FakeClock
+
+
+def make_breaker(clock, **kwargs):
+    options = dict(
+        failure_rate=0.5,
+        slow_seconds=2.0,
+        slow_rate=0.8,
+        window=10,
+        min_calls=4,
+        open_seconds=30.0,
+        clock=clock,
+    )
+    options.update(kwargs)
+    return CircuitBreaker("api.example.com", **options)
+
+
+def call(breaker, success=True, duration=0.1):
+    allowed = breaker.allow()
+    if allowed:
+        breaker.record(success, duration, None if success else "ConnectionError")
+    return allowed
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test cases for CircuitBreaker."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = make_breaker(self.clock)
+
+    def test_opens_on_failure_rate(self):
+        """Test that the breaker opens once enough recent calls fail."""
+        call(self.breaker, success=False)
+        call(self.breaker)
+        call(self.breaker, success=False)
+        self.assertEqual(self.breaker.state, CLOSED)  # below min_calls
+
+        call(self.breaker, success=False)
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow())
+        status = self.breaker.status()
+        self.assertEqual(status["trips"], 1)
+        self.assertEqual(status["rejected"], 1)
+        self.assertEqual(status["last_failure"], "ConnectionError")
+        self.assertEqual(status["retry_in"], 30.0)
+
+    def test_stays_closed_on_isolated_failures(self):
+        """Test that an occasional failure doesn't trip the breaker."""
+        for i in range(20):
+            call(self.breaker, success=i % 5 != 0)
+
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_opens_on_slow_calls(self):
+        """Test the latency threshold."""
+        for _ in range(4):
+            call(self.breaker, duration=3.0)
+
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertIn("took over 2s", self.breaker.status()["reason"])
+
+    def test_half_open_probe_closes(self):
+        """Test that a successful probe closes the breaker."""
+        for _ in range(4):
+            call(self.breaker, success=False)
+        self.clock.now = 30.0
+
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())  # one probe at a time
+        self.breaker.record(True, 0.1)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertTrue(call(self.breaker))
+
+    def test_half_open_probe_failure_reopens(self):
+        """Test that failed or slow probes reopen the breaker."""
+        for _ in range(4):
+            call(self.breaker, success=False)
+        self.clock.now = 31.0
+        call(self.breaker, success=False)
+
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertEqual(self.breaker.retry_in(), 30.0)
+
+        self.clock.now = 61.0
+        call(self.breaker, duration=5.0)
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertEqual(self.breaker.status()["trips"], 3)
+
+    def test_cancel_returns_probe(self):
+        """Test that a cancelled probe frees the half-open slot."""
+        for _ in range(4):
+            call(self.breaker, success=False)
+        self.clock.now = 30.0
+
+        self.assertTrue(self.breaker.allow())
+        self.breaker.cancel()
+        self.assertTrue(self.breaker.allow())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# tests/test_cache.py - Test the TTL + LRU fare cache
+# Author: Developer
+
+import threading
+import unittest
+from unittest.mock import patch
+
+from cache import TTLCache
+from tests.helpers import FakeClock
+
+
+class TestTTLCache(unittest.TestCase):
+    """Test cases for the TTL cache."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = TTLCache(ttl=60, max_entries=2, stale_ttl=30, clock=self.clock)
+
+    def test_hit_and_miss_counters(self):
+        """Test that lookups are counted as hits and misses."""
+        self.assertIsNone(self.cache.get("a"))
+        self.cache.set("a", [1])
+        self.assertEqual(self.cache.get("a"), [1])
+
+        stats = self.cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_expiry(self):
+        """Test that entries expire after ttl + stale_ttl."""
+        self.cache.set("a", [1])
+        self.clock.now = 89
+        self.assertEqual(self.cache.get("a"), [1])
+        self.clock.now = 91
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_version(self):
+        """Test that versions change on store and vanish once stale."""
+        self.assertIsNone(self.cache.version("a"))
+        self.cache.set("a", [1])
+        self.assertEqual(self.cache.version("a"), 0.0)
+        self.clock.now = 10
+        self.cache.set("a", [2])
+        self.assertEqual(self.cache.version("a"), 10)
+        self.clock.now = 75
+        self.assertIsNone(self.cache.version("a"))
+        self.assertEqual(self.cache.stats()["hits"] + self.cache.stats()["misses"], 0)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted."""
+        self.cache.set("a", [1])
+        self.cache.set("b", [2])
+        self.cache.get("a")
+        self.cache.set("c", [3])
+
+        self.assertEqual(self.cache.get("a"), [1])
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_get_or_load_skips_empty_results(self):
+        """Test that empty loads are not cached by default."""
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return []
+
+        self.cache.get_or_load("a", loader)
+        self.cache.get_or_load("a", loader)
+        self.assertEqual(len(calls), 2)
+
+    def test_stale_while_revalidate(self):
+        """Test that stale entries are served while refreshed once."""
+        self.cache.set("a", ["old"])
+        self.clock.now = 70
+        release = threading.Event()
+
+        def loader():
+            release.wait(timeout=1)
+            return ["new"]
+
+        threads = []
+        real_thread = threading.Thread
+
+        def capture(*args, **kwargs):
+            thread = real_thread(*args, **kwargs)
+            threads.append(thread)
+            return thread
+
+        with patch("cache.threading.Thread", side_effect=capture):
+            self.assertEqual(self.cache.get_or_load("a", loader), ["old"])
+            self.assertEqual(self.cache.get_or_load("a", loader), ["old"])
+        release.set()
+
+        for thread in threads:
+            thread.join(timeout=1)
+
+        self.assertEqual(len(threads), 1)
+        self.assertEqual(self.cache.get("a"), ["new"])
+        self.assertEqual(self.cache.stats()["stale_hits"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# tests/test_columnar.py - Test the columnar NumPy analysis engine
+# Author: Developer
+
+import random
+import unittest
+
+from analysis import analyze
+
+try:
+    import numpy  # noqa: F401
+
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+def make_flights(count, seed, float_prices=False):
+    """Build random flights with many route ties and repeated dates."""
+    rng = random.Random(seed)
+    airports = ["JFK", "LAX", "LHR", "CDG", "SYD", "HND"]
+    flights = []
+    for _ in range(count):
+        price = rng.randint(50, 900)
+        if float_prices and rng.random() < 0.5:
+            price = price + rng.random()
+        flights.append(
+            {
+                "origin": rng.choice(airports[:3]),
+                "destination": rng.choice(airports),
+                "depart_date": f"2023-07-{rng.randint(1, 28):02d}",
+                "price": price,
+            }
+        )
+    return flights
+
+
+@unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+class TestColumnarAnalyze(unittest.TestCase):
+    """Test that the columnar backend matches the Python backend."""
+
+    def assertSameAnalysis(self, data):
+        expected = analyze(data, backend="python")
+        actual = analyze(data, backend="numpy")
+        self.assertEqual(actual, expected)
+        self.assertEqual(
+            [type(v) for v in actual["summary"].values()],
+            [type(v) for v in expected["summary"].values()],
+        )
+
+    def test_empty_data(self):
+        """Test the empty result shape."""
+        self.assertSameAnalysis([])
+
+    def test_integer_prices(self):
+        """Test identical output for integer prices."""
+        for seed in range(5):
+            self.assertSameAnalysis(make_flights(500, seed))
+
+    def test_mixed_prices(self):
+        """Test identical output for mixed int/float prices."""
+        for seed in range(5):
+            self.assertSameAnalysis(make_flights(500, seed, float_prices=True))
+
+    def test_generator_input(self):
+        """Test that any iterable of flights can be analyzed."""
+        data = make_flights(50, 1)
+        self.assertEqual(
+            analyze(iter(data), backend="numpy"), analyze(data, backend="python")
+        )
+
+
+class TestAnalyzeBackend(unittest.TestCase):
+    """Test analysis backend selection."""
+
+    def test_unknown_backend(self):
+        """Test that an unknown backend is rejected."""
+        with self.assertRaises(ValueError):
+            analyze([], backend="fortran")
+
+
+if __name__ == "__main__":
+    unittest.main()
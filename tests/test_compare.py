@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# tests/test_compare.py - Test the multi-origin comparison endpoint
+# Author: Developer
+
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import date
+from unittest.mock import patch
+
+import app as webapp
+from scheduler import PrefetchJob, PrefetchScheduler
+from singleflight import SingleFlight
+
+URL = "/api/compare?start_date=2023-07-01&end_date=2023-07-28"
+PRICES = {"LHR": 500, "LGW": 300, "STN": 400}
+
+
+def fake_fetch(origin, destination, start_date, end_date):
+    return [
+        {
+            "origin": origin,
+            "destination": "JFK" if destination == "ANY" else destination,
+            "depart_date": f"2023-07-{i % 28 + 1:02d}",
+            "price": PRICES.get(origin, 250) + i,
+        }
+        for i in range(12)
+    ]
+
+
+class TestCompare(unittest.TestCase):
+    """Test cases for /api/compare."""
+
+    def setUp(self):
+        self.client = webapp.app.test_client()
+
+    def test_per_origin_and_combined(self):
+        """Test per-origin analyses, ranking and the combined view."""
+        with patch("app.fetch_fares", side_effect=fake_fetch):
+            response = self.client.get(URL + "&origins=lhr,LGW, STN")
+
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data["query"]["origins"], ["LHR", "LGW", "STN"])
+        self.assertEqual([r["origin"] for r in data["results"]], ["LHR", "LGW", "STN"])
+        for entry in data["results"]:
+            self.assertEqual(
+                entry["analysis"],
+                webapp.analyze(fake_fetch(entry["origin"], "ANY", None, None)),
+            )
+        self.assertEqual([r["origin"] for r in data["ranking"]], ["LGW", "STN", "LHR"])
+
+        everything = []
+        for origin in ("LHR", "LGW", "STN"):
+            everything.extend(fake_fetch(origin, "ANY", None, None))
+        combined = webapp.analyze(everything)
+        self.assertEqual(data["combined"]["summary"], combined["summary"])
+        self.assertEqual(data["combined"]["top_routes"], combined["top_routes"])
+
+    def test_destinations_cross_product(self):
+        """Test that each origin is searched for each destination."""
+        with patch("app.fetch_fares", side_effect=fake_fetch):
+            data = self.client.get(
+                URL + "&origins=LHR,LGW&destinations=JFK,EWR"
+            ).get_json()
+
+        pairs = [(r["origin"], r["destination"]) for r in data["results"]]
+        self.assertEqual(
+            pairs, [("LHR", "JFK"), ("LHR", "EWR"), ("LGW", "JFK"), ("LGW", "EWR")]
+        )
+
+    def test_searches_run_concurrently(self):
+        """Test that N origins take about as long as one search."""
+
+        def slow_fetch(*args):
+            time.sleep(0.2)
+            return fake_fetch(*args)
+
+        with patch("app.fetch_fares", side_effect=slow_fetch):
+            started = time.monotonic()
+            response = self.client.get(URL + "&origins=LHR,LGW,STN,LCY")
+            elapsed = time.monotonic() - started
+
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(elapsed, 0.6)
+
+    def test_failed_origin_reported(self):
+        """Test that one failing search doesn't fail the batch."""
+        real_gather = webapp.gather_flight_data
+
+        def gather(origin, *args):
+            if origin == "STN":
+                raise RuntimeError("boom")
+            return real_gather(origin, *args)
+
+        with patch("app.fetch_fares", side_effect=fake_fetch), patch(
+            "app.gather_flight_data", side_effect=gather
+        ):
+            data = self.client.get(URL + "&origins=LHR,STN").get_json()
+
+        self.assertEqual(data["results"][1]["error"], "boom")
+        self.assertEqual([r["origin"] for r in data["ranking"]], ["LHR"])
+        self.assertEqual(data["combined"]["summary"]["total_routes"], 12)
+
+    def test_identical_compares_share_searches(self):
+        """Test that concurrent identical compares fetch each leg once."""
+        release = threading.Event()
+        flight = SingleFlight()
+
+        def slow_fetch(*args):
+            release.wait(timeout=5)
+            return fake_fetch(*args)
+
+        with patch("app.fetch_fares", side_effect=slow_fetch) as mock_fetch, patch(
+            "app.search_flights_inflight", flight
+        ), ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [
+                pool.submit(self.client.get, URL + "&origins=LHR,LGW") for _ in range(2)
+            ]
+            while flight.stats()["coalesced"] < 2:
+                time.sleep(0.001)
+            release.set()
+            responses = [future.result() for future in futures]
+
+        self.assertEqual(mock_fetch.call_count, 2)
+        self.assertEqual(responses[0].get_json(), responses[1].get_json())
+
+    def test_prefetched_leg_and_source_accounting(self):
+        """Test that compare legs are served from prefetch rollups."""
+        scheduler = PrefetchScheduler(
+            [PrefetchJob("LHR", days=28)],
+            lambda *args: (fake_fetch(*args), "API data"),
+            today=lambda: date(2023, 7, 1),
+        )
+        self.addCleanup(scheduler.stop)
+        wait(scheduler.run_pending())
+        counted = webapp.RESULTS_SOURCES.value("API data")
+
+        with patch("app.prefetch_scheduler", scheduler), patch(
+            "app.fetch_fares", side_effect=fake_fetch
+        ) as mock_fetch:
+            data = self.client.get(URL + "&origins=LHR,LGW").get_json()
+
+        self.assertEqual([call.args[0] for call in mock_fetch.call_args_list], ["LGW"])
+        self.assertEqual(
+            data["results"][0]["analysis"],
+            scheduler.lookup("LHR", "ANY", "2023-07-01", "2023-07-28")[0],
+        )
+        self.assertEqual(data["combined"]["summary"]["total_routes"], 24)
+        self.assertEqual(webapp.RESULTS_SOURCES.value("API data"), counted + 2)
+
+    def test_invalid_requests(self):
+        """Test missing parameters and oversized batches."""
+        self.assertEqual(self.client.get(URL).status_code, 400)
+        self.assertEqual(self.client.get("/api/compare?origins=LHR").status_code, 400)
+        origins = ",".join(f"A{i:02d}" for i in range(webapp.COMPARE_MAX_QUERIES + 1))
+        self.assertEqual(self.client.get(URL + "&origins=" + origins).status_code, 400)
+
+    def test_invalid_dates(self):
+        """Test that malformed or reversed dates are rejected before searching."""
+        with patch("app.search_aggregate", side_effect=AssertionError("searched")):
+            for dates in (
+                "start_date=x&end_date=y",
+                "start_date=2024-07-31&end_date=2024-07-01",
+            ):
+                response = self.client.get(f"/api/compare?origins=LHR&{dates}")
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", response.get_json())
+
+
+if __name__ == "__main__":
+    unittest.main()
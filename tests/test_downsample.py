@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# tests/test_downsample.py - Test price trend downsampling
+# Author: Developer
+
+import math
+import unittest
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import app as webapp
+from downsample import downsample_trends, lttb, lttb_indices, minmax
+
+
+def make_trends(days, spike_at=None):
+    start = date(2023, 1, 1)
+    trends = []
+    for i in range(days):
+        price = round(300 + 50 * math.sin(i / 20), 2)
+        if i == spike_at:
+            price = 900
+        trends.append(
+            {"depart_date": (start + timedelta(days=i)).isoformat(), "price": price}
+        )
+    return trends
+
+
+class TestLttb(unittest.TestCase):
+    """Test cases for Largest-Triangle-Three-Buckets."""
+
+    def test_point_count_and_endpoints(self):
+        """Test that LTTB keeps the target count and both endpoints."""
+        trends = make_trends(1000)
+        reduced = lttb(trends, 100)
+
+        self.assertEqual(len(reduced), 100)
+        self.assertEqual(reduced[0], trends[0])
+        self.assertEqual(reduced[-1], trends[-1])
+        dates = [point["depart_date"] for point in reduced]
+        self.assertEqual(dates, sorted(dates))
+
+    def test_keeps_spikes(self):
+        """Test that an isolated peak survives downsampling."""
+        trends = make_trends(1000, spike_at=437)
+
+        self.assertIn(900, [point["price"] for point in lttb(trends, 50)])
+
+    def test_known_selection(self):
+        """Test the selected indices on a small series."""
+        xs = list(range(7))
+        ys = [0, 1, 10, 1, 0, -8, 0]
+
+        self.assertEqual(lttb_indices(xs, ys, 4), [0, 2, 5, 6])
+
+    def test_short_series_unchanged(self):
+        """Test that series within the target are returned as is."""
+        trends = make_trends(10)
+
+        self.assertEqual(lttb(trends, 10), trends)
+        self.assertEqual(lttb_indices([0, 1], [5, 6], 3), [0, 1])
+
+
+class TestMinMax(unittest.TestCase):
+    """Test cases for min/avg/max buckets."""
+
+    def test_buckets(self):
+        """Test bucket averages and extremes."""
+        trends = [
+            {"depart_date": f"2023-07-{day:02d}", "price": price}
+            for day, price in zip(range(1, 9), [100, 300, 200, 400, 50, 150, 250, 120])
+        ]
+        reduced = minmax(trends, 4)
+
+        self.assertEqual(
+            reduced[1],
+            {
+                "depart_date": "2023-07-02",
+                "end_date": "2023-07-04",
+                "price": 300,
+                "min_price": 200,
+                "max_price": 400,
+            },
+        )
+        self.assertEqual([point["min_price"] for point in reduced], [100, 200, 50, 120])
+        self.assertEqual(reduced[-1]["end_date"], "2023-07-08")
+
+    def test_endpoints_pinned(self):
+        """Test that the first and last points are kept as they are."""
+        trends = make_trends(100, spike_at=1)
+        reduced = minmax(trends, 10)
+
+        self.assertEqual(len(reduced), 10)
+        for point, original in ((reduced[0], trends[0]), (reduced[-1], trends[-1])):
+            self.assertEqual(point["depart_date"], original["depart_date"])
+            self.assertEqual(point["end_date"], original["depart_date"])
+            self.assertEqual(point["price"], original["price"])
+        # The spike next to the first point lands in the second bucket
+        self.assertEqual(reduced[1]["max_price"], 900)
+        # Every point is still covered exactly once
+        self.assertEqual(reduced[1]["depart_date"], trends[1]["depart_date"])
+        self.assertEqual(reduced[-2]["end_date"], trends[-2]["depart_date"])
+
+    def test_downsample_trends_validation(self):
+        """Test mode and point count validation."""
+        trends = make_trends(100)
+
+        self.assertEqual(len(downsample_trends(trends, 20, "minmax")), 20)
+        self.assertEqual(downsample_trends(trends, 200), trends)
+        with self.assertRaises(ValueError):
+            downsample_trends(trends, 20, "median")
+        with self.assertRaises(ValueError):
+            downsample_trends(trends, 2)
+
+
+class TestDownsampleEndpoints(unittest.TestCase):
+    """Test the points parameter on /results and /api/analysis."""
+
+    def setUp(self):
+        self.client = webapp.app.test_client()
+        start = date(2023, 1, 1)
+        flights = [
+            {
+                "origin": "JFK",
+                "destination": "LAX",
+                "depart_date": (start + timedelta(days=i)).isoformat(),
+                "price": 300 + i % 50,
+            }
+            for i in range(400)
+        ]
+        patcher = patch("app.fetch_fares", return_value=flights)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.query = (
+            "/api/analysis?origin=JFK&destination=LAX"
+            "&start_date=2023-01-01&end_date=2024-02-04"
+        )
+
+    def test_api_points(self):
+        """Test that /api/analysis downsamples on request."""
+        full = self.client.get(self.query).get_json()
+        reduced = self.client.get(self.query + "&points=50").get_json()
+        buckets = self.client.get(
+            self.query + "&points=40&downsample=minmax"
+        ).get_json()
+
+        self.assertEqual(len(full["results"]["price_trends"]), 400)
+        self.assertEqual(len(reduced["results"]["price_trends"]), 50)
+        self.assertEqual(reduced["results"]["summary"], full["results"]["summary"])
+        self.assertIn("max_price", buckets["results"]["price_trends"][0])
+
+    def test_api_invalid_points(self):
+        """Test that bad downsampling parameters are rejected."""
+        self.assertEqual(self.client.get(self.query + "&points=2").status_code, 400)
+        self.assertEqual(self.client.get(self.query + "&points=x").status_code, 400)
+        self.assertEqual(
+            self.client.get(self.query + "&points=9&downsample=avg").status_code, 400
+        )
+
+    def test_results_chart_points(self):
+        """Test that /results hands the chart a downsampled series."""
+        form = {
+            "origin": "JFK",
+            "destination": "LAX",
+            "start_date": "2023-01-01",
+            "end_date": "2024-02-04",
+            "points": "30",
+        }
+        with patch("app.render_template", return_value="ok") as render:
+            self.client.post("/results", data=form)
+
+        kwargs = render.call_args.kwargs
+        self.assertEqual(len(kwargs["price_chart"]), 30)
+        self.assertEqual(len(kwargs["results"]["price_trends"]), 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# tests/test_fare_store.py - Test the local fare history store
+# Author: Developer
+
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+import app as webapp
+from aggregate import FlightAggregator
+from fare_store import FareStore
+
+
+def make_flights(count, destination="LAX", start_day=1):
+    return [
+        {
+            "origin": "JFK",
+            "destination": destination,
+            "depart_date": f"2023-07-{(start_day + i) % 28 + 1:02d}",
+            "value": 300 + i,
+            "gate": "Delta",
+        }
+        for i in range(count)
+    ]
+
+
+class TestFareStore(unittest.TestCase):
+    """Test cases for the SQLite fare store."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.store = FareStore(
+            os.path.join(self.tmpdir.name, "fares.sqlite3"), batch_size=4
+        )
+
+    def test_insert_and_query(self):
+        """Test that inserted fares come back as flight dictionaries."""
+        stored = self.store.insert_many(make_flights(10), fetched_at=1000.0)
+
+        self.assertEqual(stored, 10)
+        self.assertEqual(self.store.count(), 10)
+        rows = self.store.query("JFK", "LAX")
+        self.assertEqual(len(rows), 10)
+        self.assertEqual(rows[0]["price"], 300)
+        self.assertIsInstance(rows[0]["price"], int)
+        self.assertEqual(rows[0]["airline"], "Delta")
+        self.assertEqual(rows[0]["source"], "api")
+        self.assertEqual(rows[0]["fetched_at"], 1000.0)
+
+    def test_skips_rows_without_price_or_date(self):
+        """Test that incomplete rows are not stored."""
+        flights = make_flights(2) + [
+            {"origin": "JFK", "destination": "LAX", "depart_date": "2023-07-01"},
+            {"origin": "JFK", "destination": "LAX", "price": 100},
+        ]
+
+        self.assertEqual(self.store.insert_many(flights), 2)
+
+    def test_range_filters(self):
+        """Test date, destination and fetch time filters."""
+        self.store.insert_many(make_flights(10), fetched_at=1000.0)
+        self.store.insert_many(make_flights(5, "SFO"), fetched_at=2000.0)
+
+        in_range = self.store.query("JFK", "LAX", "2023-07-03", "2023-07-05")
+        self.assertEqual(
+            [row["depart_date"] for row in in_range],
+            ["2023-07-03", "2023-07-04", "2023-07-05"],
+        )
+        self.assertEqual(len(self.store.query("JFK", "ANY")), 15)
+        self.assertEqual(len(self.store.query("JFK", since=1500.0)), 5)
+        self.assertEqual(self.store.query("LGA"), [])
+
+    def test_history_is_append_only(self):
+        """Test that repeated fetches keep every observation."""
+        self.store.insert_many(make_flights(3), fetched_at=1000.0)
+        self.store.insert_many(make_flights(3), fetched_at=2000.0)
+
+        rows = self.store.query("JFK", "LAX")
+        self.assertEqual(len(rows), 6)
+        self.assertEqual({row["fetched_at"] for row in rows}, {1000.0, 2000.0})
+
+    def test_feeds_analysis(self):
+        """Test that stored fares match analyzing the original data."""
+        flights = make_flights(20)
+        self.store.insert_many(flights)
+
+        expected = webapp.analyze(
+            [dict(flight, price=flight["value"]) for flight in flights]
+        )
+        self.assertEqual(webapp.analyze(self.store.query("JFK", "LAX")), expected)
+        aggregator = FlightAggregator(self.store.iter_fares("JFK", "LAX"))
+        self.assertEqual(aggregator.result(), expected)
+
+    def test_concurrent_writers(self):
+        """Test that threads can insert at the same time."""
+        threads = [
+            threading.Thread(target=self.store.insert_many, args=(make_flights(25),))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.store.count(), 100)
+
+
+class TestFareRecording(unittest.TestCase):
+    """Test that API fetches are recorded in the fare store."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        store = FareStore(os.path.join(self.tmpdir.name, "fares.sqlite3"))
+        patcher = patch("app.fare_store", store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.store = store
+        webapp.fare_cache.clear()
+        self.addCleanup(webapp.fare_cache.clear)
+
+    def test_fetch_fares_records_api_data(self):
+        """Test that fetched fares are stored once per upstream fetch."""
+        with patch("app.fetch_api_data", return_value=make_flights(5)) as fetch:
+            webapp.fetch_fares("JFK", "LAX", "2023-07-01", "2023-07-28")
+            webapp.fetch_fares("JFK", "LAX", "2023-07-01", "2023-07-28")
+
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual(self.store.count(), 5)
+
+    def test_store_errors_do_not_fail_fetch(self):
+        """Test that a broken store still returns the fetched fares."""
+        with patch("app.fetch_api_data", return_value=make_flights(5)), patch.object(
+            self.store, "insert_many", side_effect=RuntimeError("disk full")
+        ):
+            data = webapp.fetch_fares("JFK", "LAX", "2023-07-01", "2023-07-28")
+
+        self.assertEqual(len(data), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
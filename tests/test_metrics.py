@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# tests/test_metrics.py - Test stage timers, Server-Timing and /metrics
+# Author: Developer
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import app as webapp
+import metrics
+from ai_cache import AnswerCache
+from tests.helpers import make_flights
+from metrics import Registry
+
+
+class TestRegistry(unittest.TestCase):
+    """Test cases for the metrics registry."""
+
+    def test_counter_render(self):
+        """Test Prometheus text output for a labelled counter."""
+        registry = Registry()
+        counter = registry.counter("jobs_total", "Jobs run", ["kind"])
+        counter.inc("a")
+        counter.inc("a", amount=2)
+        counter.inc('quote"d')
+
+        text = registry.render()
+        self.assertIn("# TYPE jobs_total counter", text)
+        self.assertIn('jobs_total{kind="a"} 3', text)
+        self.assertIn('jobs_total{kind="quote\\"d"} 1', text)
+
+    def test_histogram_buckets(self):
+        """Test that histogram buckets are cumulative with sum and count."""
+        registry = Registry()
+        histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1))
+        for value in (0.05, 0.5, 0.5, 3):
+            histogram.observe(value)
+
+        lines = registry.render().splitlines()
+        self.assertIn('latency_seconds_bucket{le="0.1"} 1', lines)
+        self.assertIn('latency_seconds_bucket{le="1"} 3', lines)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 4', lines)
+        self.assertIn("latency_seconds_sum 4.05", lines)
+        self.assertIn("latency_seconds_count 4", lines)
+
+    def test_gauge_callback(self):
+        """Test that gauges read their value at render time."""
+        registry = Registry()
+        values = {"size": 1}
+        registry.gauge("cache_size", "Entries", lambda: values["size"])
+        values["size"] = 7
+
+        self.assertIn("cache_size 7", registry.render())
+
+    def test_callback_counter(self):
+        """Test that callback counters render as counters."""
+        registry = Registry()
+        registry.callback_counter("hits_total", "Hits", lambda: {("a",): 3}, ["k"])
+
+        text = registry.render()
+        self.assertIn("# TYPE hits_total counter", text)
+        self.assertIn('hits_total{k="a"} 3', text)
+
+    def test_duplicate_name(self):
+        """Test that a metric name can only be registered once."""
+        registry = Registry()
+        registry.counter("dupe_total", "First")
+        with self.assertRaises(ValueError):
+            registry.counter("dupe_total", "Second")
+
+    def test_disabled_is_noop(self):
+        """Test that nothing is recorded while disabled."""
+        registry = Registry(enabled=False)
+        counter = registry.counter("jobs_total", "Jobs run")
+        counter.inc()
+        with registry.timer("fetch"):
+            pass
+
+        self.assertEqual(counter.value(), 0)
+        self.assertEqual(registry.stage_seconds.count("fetch"), 0)
+
+    def test_timer_records_request_stages(self):
+        """Test that stage timers feed the request timings and histogram."""
+        registry = Registry()
+        metrics.start_request()
+        with registry.timer("fetch"):
+            pass
+        with registry.timer("render"):
+            pass
+
+        stages = [name for name, _ in metrics.request_timings()]
+        self.assertEqual(stages, ["fetch", "render"])
+        self.assertEqual(registry.stage_seconds.count("fetch"), 1)
+        header = metrics.server_timing_header([("fetch", 0.1234)], total=0.2)
+        self.assertEqual(header, "fetch;dur=123.4, total;dur=200.0")
+
+
+class TestMetricsEndpoints(unittest.TestCase):
+    """Test the Flask integration."""
+
+    def setUp(self):
+        self.client = webapp.app.test_client()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.ai_cache_path = os.path.join(tmp.name, "ai_cache.sqlite3")
+        patcher = patch("app.ai_cache", AnswerCache(path=self.ai_cache_path))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_results_server_timing(self):
+        """Test that /results reports its stages in Server-Timing."""
+        with patch("app.fetch_fares", return_value=make_flights(12)):
+            response = self.client.post(
+                "/results",
+                data={
+                    "origin": "JFK",
+                    "destination": "LAX",
+                    "start_date": "2023-07-01",
+                    "end_date": "2023-07-28",
+                },
+            )
+
+        header = response.headers["Server-Timing"]
+        for stage in ("fetch", "analyze", "search", "render", "total"):
+            self.assertIn(f"{stage};dur=", header)
+
+    def test_metrics_endpoint(self):
+        """Test that /metrics renders the app's metrics."""
+        self.client.get("/search_airport?q=lon")
+        response = self.client.get("/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith("text/plain"))
+        text = response.get_data(as_text=True)
+        self.assertIn("# TYPE skytrends_http_request_seconds histogram", text)
+        self.assertIn('endpoint="search_airport"', text)
+        self.assertIn("# TYPE skytrends_cache_events_total counter", text)
+        self.assertIn('skytrends_cache_events_total{cache="fare",event="hits"}', text)
+        self.assertIn('skytrends_cache_events_total{cache="ai",event="misses"}', text)
+        self.assertIn("# TYPE skytrends_coalesced_searches_total counter", text)
+        self.assertIn("skytrends_upstream_request_seconds", text)
+        # Scrapes read in-memory counters and never create the answer store
+        self.assertFalse(os.path.exists(self.ai_cache_path))
+
+    def test_metrics_disabled(self):
+        """Test that disabled metrics hide the endpoint and header."""
+        with patch.object(metrics.registry, "enabled", False):
+            response = self.client.get("/metrics")
+            page = self.client.get("/")
+
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn("Server-Timing", page.headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# tests/test_ratelimit.py - Test the token-bucket rate limiter
+# Author: Developer
+
+import unittest
+
+from ratelimit import TokenBucket
+from tests.helpers import FakeClock
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Test cases for TokenBucket."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.bucket = TokenBucket(rate=2, capacity=4, clock=self.clock)
+
+    def test_burst_then_refill(self):
+        """Test that a full bucket allows a burst and then refills."""
+        self.assertTrue(all(self.bucket.try_acquire() for _ in range(4)))
+        self.assertFalse(self.bucket.try_acquire())
+
+        self.clock.now = 0.5
+        self.assertTrue(self.bucket.try_acquire())
+        self.assertFalse(self.bucket.try_acquire())
+
+    def test_capacity_caps_refill(self):
+        """Test that idle time never adds more than the capacity."""
+        self.bucket.try_acquire(4)
+        self.clock.now = 100
+
+        self.assertEqual(self.bucket.available(), 4)
+        self.assertFalse(self.bucket.try_acquire(5))
+
+    def test_wait_time(self):
+        """Test the time until tokens become available."""
+        self.bucket.try_acquire(4)
+
+        self.assertAlmostEqual(self.bucket.wait_time(3), 1.5)
+        self.clock.now = 1.5
+        self.assertEqual(self.bucket.wait_time(3), 0)
+
+    def test_acquire_timeout(self):
+        """Test that a blocking acquire gives up when it can't finish in time."""
+        self.bucket.try_acquire(4)
+
+        self.assertFalse(self.bucket.acquire(4, timeout=0.01))
+        self.clock.now = 2
+        self.assertTrue(self.bucket.acquire(4, timeout=0.01))
+
+
+if __name__ == "__main__":
+    unittest.main()
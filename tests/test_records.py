@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# tests/test_records.py - Test compact flight records
+# Author: Developer
+
+import pickle
+import unittest
+from unittest.mock import MagicMock, patch
+
+import app as webapp
+from aggregate import FlightAggregator
+from records import Flight, chain_flights, to_dicts, to_records
+
+
+def make_flight(**overrides):
+    data = {
+        "origin": "JFK",
+        "destination": "LAX",
+        "depart_date": "2023-07-01",
+        "return_date": "2023-07-08",
+        "price": 320,
+        "airline": "DL",
+        "flight_number": 401,
+    }
+    data.update(overrides)
+    return data
+
+
+class TestFlight(unittest.TestCase):
+    """Test cases for the Flight record."""
+
+    def test_dict_compatibility(self):
+        """Test item access, get, membership and equality with dicts."""
+        data = make_flight()
+        flight = Flight.from_dict(data)
+
+        self.assertEqual(flight["price"], 320)
+        self.assertEqual(flight.price, 320)
+        self.assertEqual(flight.get("airline"), "DL")
+        self.assertIsNone(flight.get("source"))
+        self.assertEqual(flight.get("source", "api"), "api")
+        self.assertIn("origin", flight)
+        self.assertNotIn("source", flight)
+        self.assertNotIn("gate", flight)
+        self.assertEqual(flight, data)
+        self.assertEqual(flight.to_dict(), data)
+        with self.assertRaises(KeyError):
+            flight["source"]
+        with self.assertRaises(KeyError):
+            flight["gate"]
+
+    def test_api_aliases(self):
+        """Test that API value/gate fields become price/airline."""
+        flight = Flight.from_dict(
+            {"origin": "JFK", "destination": "LAX", "value": 199, "gate": "Kiwi"},
+            source="api",
+        )
+
+        self.assertEqual(flight["price"], 199)
+        self.assertEqual(flight["airline"], "Kiwi")
+        self.assertEqual(flight["source"], "api")
+
+    def test_strings_interned(self):
+        """Test that equal strings from different fares share one object."""
+        first = Flight.from_dict(make_flight(origin="".join(["J", "F", "K"])))
+        second = Flight.from_dict(make_flight(origin="".join(["JF", "K"])))
+
+        self.assertIs(first.origin, second.origin)
+        self.assertIs(first.depart_date, second.depart_date)
+
+    def test_no_instance_dict(self):
+        """Test that records are slotted and cannot grow attributes."""
+        flight = Flight.from_dict(make_flight())
+
+        self.assertFalse(hasattr(flight, "__dict__"))
+        with self.assertRaises(AttributeError):
+            flight.extra = 1
+
+    def test_pickle_round_trip(self):
+        """Test that records survive pickling (used by process pools)."""
+        flight = Flight.from_dict(make_flight())
+
+        self.assertEqual(pickle.loads(pickle.dumps(flight)), flight)
+
+    def test_conversions(self):
+        """Test converting lists of dicts to records and back."""
+        rows = [make_flight(price=price) for price in (100, 200)]
+        records = to_records(rows, source="api")
+
+        self.assertTrue(all(isinstance(record, Flight) for record in records))
+        self.assertIs(to_records(records)[0], records[0])
+        self.assertEqual(to_dicts(records), [dict(row, source="api") for row in rows])
+
+    def test_aggregates_like_dicts(self):
+        """Test that analysis gives the same results for records and dicts."""
+        rows = [
+            make_flight(destination=dest, depart_date=f"2023-07-0{day}", price=price)
+            for dest, day, price in [
+                ("LAX", 1, 300),
+                ("SFO", 2, 250.5),
+                ("LAX", 1, 410),
+            ]
+        ]
+        records = to_records(rows)
+
+        self.assertEqual(
+            FlightAggregator(records).result(), FlightAggregator(rows).result()
+        )
+        self.assertEqual(webapp.analyze(records), webapp.analyze(rows))
+
+
+class TestFlightChain(unittest.TestCase):
+    """Test cases for zero-copy concatenation."""
+
+    def test_sequence_behaviour(self):
+        """Test len, iteration, indexing and slicing across parts."""
+        first = [make_flight(price=p) for p in (1, 2, 3)]
+        second = [make_flight(price=p) for p in (4, 5)]
+        chained = chain_flights(first, None, [], second)
+
+        self.assertEqual(len(chained), 5)
+        self.assertEqual([f["price"] for f in chained], [1, 2, 3, 4, 5])
+        self.assertIs(chained[3], second[0])
+        self.assertIs(chained[-1], second[-1])
+        self.assertEqual([f["price"] for f in chained[2:4]], [3, 4])
+        with self.assertRaises(IndexError):
+            chained[5]
+
+    def test_parts_not_copied(self):
+        """Test that chains reference their sources and flatten when nested."""
+        first = [make_flight()]
+        second = [make_flight(price=1)]
+        nested = chain_flights(chain_flights(first), second)
+
+        self.assertIs(nested._parts[0], first)
+        self.assertIs(nested._parts[1], second)
+
+
+class TestFetchRecords(unittest.TestCase):
+    """Test that fetched API data is stored as records."""
+
+    def test_fetch_api_data_returns_records(self):
+        """Test normalization of API rows during fetch."""
+        response = MagicMock()
+        response.json.return_value = {
+            "success": True,
+            "data": [
+                {
+                    "origin": "JFK",
+                    "destination": "LAX",
+                    "depart_date": "2023-07-01",
+                    "value": 280,
+                    "gate": "Kiwi",
+                }
+            ],
+        }
+        with patch("app.upstream.get", return_value=response):
+            data = webapp.fetch_api_data("JFK", "LAX", "2023-07-01", "2023-07-03")
+
+        self.assertEqual(len(data), 1)
+        self.assertIsInstance(data[0], Flight)
+        self.assertEqual(data[0]["price"], 280)
+        self.assertEqual(data[0]["airline"], "Kiwi")
+
+
+if __name__ == "__main__":
+    unittest.main()
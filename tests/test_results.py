@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# tests/test_results.py - Test the /results data pipeline
+# Author: Developer
+
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import app as webapp
+from tests.helpers import make_flights
+
+
+class TestGatherFlightData(unittest.TestCase):
+    """Test cases for the overlapped fetch/fallback pipeline."""
+
+    def test_enough_api_data_skips_fallback(self):
+        """Test that the fallback result is dropped when the API suffices."""
+        with patch("app.fetch_fares", return_value=make_flights(12)), patch(
+            "app.scrape_backup", return_value=make_flights(5, source="scraper")
+        ):
+            aggregator, source = webapp.gather_flight_data(
+                "JFK", "LAX", "2023-07-01", "2023-07-28"
+            )
+
+        self.assertEqual(source, "API data")
+        self.assertEqual(len(aggregator), 12)
+
+    def test_insufficient_api_data_is_supplemented(self):
+        """Test that few API rows are combined with fallback rows."""
+        with patch("app.fetch_fares", return_value=make_flights(3)), patch(
+            "app.scrape_backup", return_value=make_flights(5, source="scraper")
+        ):
+            aggregator, source = webapp.gather_flight_data(
+                "JFK", "LAX", "2023-07-01", "2023-07-28"
+            )
+
+        self.assertEqual(source, "API and generated data")
+        self.assertEqual(len(aggregator), 8)
+
+    def test_api_error_uses_fallback(self):
+        """Test that an API exception falls back to generated data."""
+        with patch("app.fetch_fares", side_effect=RuntimeError("down")), patch(
+            "app.scrape_backup", return_value=make_flights(5, source="scraper")
+        ):
+            aggregator, source = webapp.gather_flight_data(
+                "JFK", "LAX", "2023-07-01", "2023-07-28"
+            )
+
+        self.assertEqual(source, "Generated data (API unavailable)")
+        self.assertEqual(len(aggregator), 5)
+
+    def test_deadline_bounds_latency(self):
+        """Test that a hung API is abandoned at the deadline."""
+        release = threading.Event()
+
+        def slow_fetch(*args):
+            release.wait(timeout=5)
+            return make_flights(20)
+
+        with patch("app.fetch_fares", side_effect=slow_fetch), patch(
+            "app.scrape_backup", return_value=make_flights(5, source="scraper")
+        ):
+            started = time.monotonic()
+            aggregator, source = webapp.gather_flight_data(
+                "JFK", "LAX", "2023-07-01", "2023-07-28", deadline=0.2
+            )
+            elapsed = time.monotonic() - started
+        release.set()
+
+        self.assertLess(elapsed, 1)
+        self.assertEqual(source, "Generated data (API unavailable)")
+        self.assertEqual(len(aggregator), 5)
+
+
+class TestResultsRoute(unittest.TestCase):
+    """Test the /results view end to end."""
+
+    def setUp(self):
+        self.client = webapp.app.test_client()
+
+    def test_results_page(self):
+        """Test that the results page renders the combined analysis."""
+        with patch("app.fetch_fares", return_value=make_flights(12)):
+            response = self.client.post(
+                "/results",
+                data={
+                    "origin": "jfk",
+                    "destination": "LAX",
+                    "start_date": "2023-07-01",
+                    "end_date": "2023-07-28",
+                },
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"API data", response.data)
+
+    def test_missing_fields(self):
+        """Test that missing required fields re-render the form."""
+        response = self.client.post("/results", data={"origin": "JFK"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"All fields except destination are required", response.data)
+
+
+if __name__ == "__main__":
+    unittest.main()
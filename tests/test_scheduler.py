@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# tests/test_scheduler.py - Test background prefetch and rollups
+# Author: Developer
+
+import unittest
+from concurrent.futures import wait
+from datetime import date
+from unittest.mock import patch
+
+import app as webapp
+from ratelimit import TokenBucket
+from scheduler import PrefetchJob, PrefetchScheduler, parse_jobs
+from tests.helpers import FakeClock
+
+TODAY = date(2024, 7, 1)
+
+
+def make_flights(origin, destination, start, end):
+    destinations = ["LAX", "SFO"] if destination == "ANY" else [destination]
+    return [
+        {
+            "origin": origin,
+            "destination": dest,
+            "depart_date": f"2024-07-{day:02d}",
+            "price": 100 + day + 10 * i,
+        }
+        for i, dest in enumerate(destinations)
+        for day in range(int(start[-2:]), int(end[-2:]) + 1)
+    ]
+
+
+class TestPrefetchScheduler(unittest.TestCase):
+    """Test cases for PrefetchScheduler."""
+
+    def setUp(self):
+        self.clock = FakeClock(1_000_000.0)
+        self.calls = []
+
+    def make_scheduler(self, jobs, fetch=None, **kwargs):
+        def default_fetch(origin, destination, start, end):
+            self.calls.append((origin, destination, start, end))
+            return make_flights(origin, destination, start, end), "API data"
+
+        scheduler = PrefetchScheduler(
+            jobs,
+            fetch or default_fetch,
+            interval=60,
+            today=lambda: TODAY,
+            clock=self.clock,
+            **kwargs,
+        )
+        self.addCleanup(scheduler.stop)
+        return scheduler
+
+    def run_pending(self, scheduler):
+        wait(scheduler.run_pending())
+
+    def test_parse_jobs(self):
+        """Test the PREFETCH_ROUTES format."""
+        jobs = parse_jobs("atl, LHR:JFK:14, HND::7:3")
+
+        self.assertEqual(
+            [job.name for job in jobs],
+            ["ATL:ANY:30:0", "LHR:JFK:14:0", "HND:ANY:7:3"],
+        )
+        self.assertEqual(jobs[2].window(TODAY), ("2024-07-04", "2024-07-10"))
+        with self.assertRaises(ValueError):
+            PrefetchJob.parse(":LAX")
+
+    def test_refresh_and_exact_lookup(self):
+        """Test that an exact window match returns the precomputed rollup."""
+        scheduler = self.make_scheduler([PrefetchJob("JFK", "ANY", days=10)])
+        self.run_pending(scheduler)
+
+        result = scheduler.lookup("jfk", "ANY", "2024-07-01", "2024-07-10")
+        expected = webapp.analyze(
+            make_flights("JFK", "ANY", "2024-07-01", "2024-07-10")
+        )
+        self.assertEqual(result, (expected, "API data"))
+        self.assertEqual(self.calls, [("JFK", "ANY", "2024-07-01", "2024-07-10")])
+
+    def test_lookup_subrange_and_destination(self):
+        """Test that searches inside a window are answered from its fares."""
+        scheduler = self.make_scheduler([PrefetchJob("JFK", "ANY", days=10)])
+        self.run_pending(scheduler)
+
+        results, _ = scheduler.lookup("JFK", "LAX", "2024-07-03", "2024-07-05")
+        expected = webapp.analyze(
+            make_flights("JFK", "LAX", "2024-07-03", "2024-07-05")
+        )
+        self.assertEqual(results, expected)
+        self.assertIsNone(scheduler.lookup("JFK", "ANY", "2024-06-30", "2024-07-05"))
+        self.assertIsNone(scheduler.lookup("LHR", "ANY", "2024-07-01", "2024-07-10"))
+
+    def test_interval_and_max_age(self):
+        """Test that jobs rerun after the interval and stale rollups expire."""
+        scheduler = self.make_scheduler([PrefetchJob("JFK", days=5)])
+        self.run_pending(scheduler)
+        self.run_pending(scheduler)
+        self.assertEqual(len(self.calls), 1)
+
+        self.clock.now += 61
+        self.run_pending(scheduler)
+        self.assertEqual(len(self.calls), 2)
+
+        self.clock.now += 121
+        self.assertIsNone(scheduler.lookup("JFK", "ANY", "2024-07-01", "2024-07-05"))
+
+    def test_failure_keeps_previous_rollup(self):
+        """Test that a failed refresh keeps serving the last good data."""
+        responses = [make_flights("JFK", "ANY", "2024-07-01", "2024-07-05")]
+
+        def flaky_fetch(origin, destination, start, end):
+            if not responses:
+                raise RuntimeError("upstream down")
+            return responses.pop(), "API data"
+
+        scheduler = self.make_scheduler([PrefetchJob("JFK", days=5)], flaky_fetch)
+        self.run_pending(scheduler)
+        self.clock.now += 61
+        self.run_pending(scheduler)
+
+        self.assertIsNotNone(scheduler.lookup("JFK", "ANY", "2024-07-01", "2024-07-05"))
+        status = scheduler.status()[0]
+        self.assertEqual(status["error"], "upstream down")
+        self.assertEqual(status["age_seconds"], 61)
+
+    def test_rate_budget_defers_jobs(self):
+        """Test that refreshes beyond the budget wait for later ticks."""
+        budget = TokenBucket(rate=1 / 60, capacity=2, clock=self.clock)
+        scheduler = self.make_scheduler(
+            [PrefetchJob(code, days=5) for code in ("JFK", "LHR", "HND")],
+            budget=budget,
+        )
+        self.run_pending(scheduler)
+
+        self.assertEqual([call[0] for call in self.calls], ["JFK", "LHR"])
+        self.assertEqual(scheduler.status()[2]["deferred"], "rate budget")
+
+        self.clock.now += 60
+        self.run_pending(scheduler)
+        self.assertEqual([call[0] for call in self.calls], ["JFK", "LHR", "HND"])
+
+    def test_cost_above_capacity_rejected(self):
+        """Test that a refresh dearer than the whole bucket is refused."""
+        budget = TokenBucket(rate=1 / 60, capacity=2, clock=self.clock)
+        with self.assertRaises(ValueError):
+            self.make_scheduler(
+                [PrefetchJob("JFK", days=5)], budget=budget, cost=lambda s, e: 3
+            )
+
+    def test_status(self):
+        """Test the per-route refresh report."""
+        scheduler = self.make_scheduler([PrefetchJob("JFK", days=5)])
+        self.assertIsNone(scheduler.status()[0]["last_refreshed"])
+
+        self.run_pending(scheduler)
+        status = scheduler.status()[0]
+        self.assertEqual(status["route"], "JFK:ANY:5:0")
+        self.assertTrue(status["fresh"])
+        self.assertEqual(status["flights"], 10)
+        self.assertEqual(status["start_date"], "2024-07-01")
+        self.assertTrue(status["last_refreshed"].endswith("+00:00"))
+
+
+class TestPrefetchIntegration(unittest.TestCase):
+    """Test that the app serves searches from rollups."""
+
+    def setUp(self):
+        self.client = webapp.app.test_client()
+        scheduler = PrefetchScheduler(
+            [PrefetchJob("JFK", days=10)],
+            lambda *args: (make_flights(*args), "API data"),
+            today=lambda: TODAY,
+        )
+        self.addCleanup(scheduler.stop)
+        wait(scheduler.run_pending())
+        patcher = patch("app.prefetch_scheduler", scheduler)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_search_served_from_rollup(self):
+        """Test that a prefetched search never calls the API."""
+        with patch("app.fetch_fares", side_effect=AssertionError("not prefetched")):
+            results, source = webapp.search_flights(
+                "JFK", "LAX", "2024-07-02", "2024-07-04"
+            )
+
+        self.assertEqual(source, "API data")
+        self.assertEqual(results["summary"]["total_routes"], 3)
+
+    def test_prefetch_cost_counts_pages(self):
+        """Test that a refresh is charged for every page it may fetch."""
+        shards = len(webapp.date_shards("2024-07-01", "2024-07-30"))
+
+        self.assertEqual(
+            webapp.prefetch_cost("2024-07-01", "2024-07-30"),
+            shards * webapp.FETCH_MAX_PAGES,
+        )
+
+    def test_long_route_exceeds_default_budget(self):
+        """Test that a year-long route can't outspend PREFETCH_RATE."""
+
+        def make_scheduler(routes):
+            return PrefetchScheduler(
+                parse_jobs(routes),
+                webapp.prefetch_fares,
+                budget=TokenBucket(rate=30 / 60, capacity=30),
+                cost=webapp.prefetch_cost,
+                today=lambda: TODAY,
+            )
+
+        with patch.object(webapp, "FETCH_MAX_PAGES", 5):
+            self.addCleanup(make_scheduler("HND:ANY:30").stop)
+            with self.assertRaises(ValueError):
+                make_scheduler("HND:ANY:365")
+
+    def test_sparse_prefetch_is_topped_up(self):
+        """Test that a sparse API result isn't stored as plain API data."""
+        sparse = make_flights("JFK", "LAX", "2024-07-01", "2024-07-03")
+        with patch("app.fetch_and_record", return_value=sparse):
+            flights, source = webapp.prefetch_fares(
+                "JFK", "LAX", "2024-07-01", "2024-07-03"
+            )
+        self.assertEqual(source, "API and generated data")
+        self.assertGreater(len(flights), len(sparse))
+
+        full = make_flights("JFK", "ANY", "2024-07-01", "2024-07-10")
+        with patch("app.fetch_and_record", return_value=full):
+            _, source = webapp.prefetch_fares("JFK", "ANY", "2024-07-01", "2024-07-10")
+        self.assertEqual(source, "API data")
+
+    def test_status_endpoint(self):
+        """Test that /prefetch/status lists the routes."""
+        with patch.object(webapp.prefetch_scheduler, "budget", TokenBucket(1)):
+            data = self.client.get("/prefetch/status").get_json()
+
+        self.assertTrue(data["enabled"])
+        self.assertEqual(data["routes"][0]["origin"], "JFK")
+        self.assertIsNotNone(data["routes"][0]["last_refreshed"])
+
+
+if __name__ == "__main__":
+    unittest.main()
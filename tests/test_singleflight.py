@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# tests/test_singleflight.py - Test request coalescing
+# Author: Developer
+
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import app as webapp
+from singleflight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test cases for SingleFlight."""
+
+    def run_concurrently(self, flight, fn, callers=8, timeout=None):
+        """Start one leader, let the others join it, then release it."""
+        pool = ThreadPoolExecutor(max_workers=callers)
+        self.addCleanup(pool.shutdown)
+        futures = [pool.submit(flight.do, "key", fn, timeout)]
+        while flight.in_flight() == 0:
+            time.sleep(0.001)
+        futures += [
+            pool.submit(flight.do, "key", fn, timeout) for _ in range(callers - 1)
+        ]
+        while flight.stats()["coalesced"] < callers - 1:
+            time.sleep(0.001)
+        return futures
+
+    def test_concurrent_callers_share_one_call(self):
+        """Test that identical concurrent calls run once."""
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def work():
+            calls.append(1)
+            release.wait(timeout=5)
+            return {"answer": 42}
+
+        futures = self.run_concurrently(flight, work)
+        release.set()
+        results = [future.result() for future in futures]
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result == {"answer": 42} for result, _ in results))
+        self.assertEqual(sorted(shared for _, shared in results), [False] + [True] * 7)
+        self.assertEqual(flight.stats()["in_flight"], 0)
+
+    def test_errors_are_shared(self):
+        """Test that waiters see the leader's exception."""
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def work():
+            release.wait(timeout=5)
+            raise ValueError("upstream down")
+
+        futures = self.run_concurrently(flight, work, callers=3)
+        release.set()
+        for future in futures:
+            with self.assertRaises(ValueError):
+                future.result()
+
+    def test_waiter_timeout(self):
+        """Test that waiters are bounded by the timeout."""
+        flight = SingleFlight()
+        release = threading.Event()
+
+        futures = self.run_concurrently(
+            flight, lambda: release.wait(timeout=5), callers=2, timeout=0.05
+        )
+        with self.assertRaises(TimeoutError):
+            futures[1].result()
+        release.set()
+        self.assertEqual(futures[0].result(), (True, False))
+        self.assertEqual(flight.stats()["timeouts"], 1)
+
+    def test_sequential_calls_not_cached(self):
+        """Test that finished calls are not reused."""
+        flight = SingleFlight()
+        self.assertEqual(flight.do("k", lambda: 1), (1, False))
+        self.assertEqual(flight.do("k", lambda: 2), (2, False))
+
+
+class TestSearchCoalescing(unittest.TestCase):
+    """Test that identical /results searches share one fetch."""
+
+    def test_identical_searches_fetch_once(self):
+        """Test that a burst of identical searches makes one upstream fetch."""
+        release = threading.Event()
+        flights = [
+            {
+                "origin": "JFK",
+                "destination": "LHR",
+                "depart_date": "2023-07-01",
+                "price": 400 + i,
+            }
+            for i in range(12)
+        ]
+
+        def slow_fetch(*args):
+            release.wait(timeout=5)
+            return flights
+
+        flight = SingleFlight()
+        with patch("app.fetch_fares", side_effect=slow_fetch) as mock_fetch, patch(
+            "app.search_flights_inflight", flight
+        ):
+            with ThreadPoolExecutor(max_workers=6) as pool:
+                futures = [
+                    pool.submit(
+                        webapp.search_flights, "JFK", "LHR", "2023-07-01", "2023-07-02"
+                    )
+                    for _ in range(6)
+                ]
+                while flight.stats()["coalesced"] < 5:
+                    time.sleep(0.001)
+                release.set()
+                results = [future.result() for future in futures]
+
+        self.assertEqual(mock_fetch.call_count, 1)
+        self.assertTrue(all(result == results[0] for result in results))
+        self.assertEqual(results[0][1], "API data")
+
+
+if __name__ == "__main__":
+    unittest.main()
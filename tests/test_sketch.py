@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# tests/test_sketch.py - Test quantile sketches and fare distributions
+# Author: Developer
+
+import random
+import unittest
+from unittest.mock import patch
+
+import app as webapp
+from aggregate import FlightAggregator
+from sketch import QuantileSketch
+
+
+def exact_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+def make_flights(count, seed=7):
+    rng = random.Random(seed)
+    return [
+        {
+            "origin": "JFK",
+            "destination": rng.choice(["LAX", "SFO", "MIA"]),
+            "depart_date": f"2023-07-{rng.randint(1, 28):02d}",
+            "price": round(rng.lognormvariate(5.8, 0.4), 2),
+        }
+        for _ in range(count)
+    ]
+
+
+class TestQuantileSketch(unittest.TestCase):
+    """Test cases for QuantileSketch."""
+
+    def test_relative_accuracy(self):
+        """Test that quantiles stay within the configured relative error."""
+        rng = random.Random(1)
+        values = [rng.lognormvariate(6, 0.8) for _ in range(20000)]
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.add(value)
+
+        for q in (0.01, 0.1, 0.5, 0.9, 0.99):
+            exact = exact_quantile(values, q)
+            self.assertLessEqual(abs(sketch.quantile(q) - exact) / exact, 0.01)
+        self.assertEqual(sketch.quantile(0), min(values))
+        self.assertEqual(sketch.quantile(1), max(values))
+        self.assertLess(len(sketch), 500)
+
+    def test_merge_matches_single_pass(self):
+        """Test that merged shards equal one sketch over all the data."""
+        values = [random.Random(2).uniform(50, 900) for _ in range(3000)]
+        whole = QuantileSketch()
+        parts = [QuantileSketch() for _ in range(3)]
+        for i, value in enumerate(values):
+            whole.add(value)
+            parts[i % 3].add(value)
+        merged = parts[0].merge(parts[1]).merge(parts[2])
+
+        self.assertEqual(merged.bins, whole.bins)
+        self.assertEqual(merged.count, whole.count)
+        self.assertEqual((merged.min, merged.max), (whole.min, whole.max))
+        with self.assertRaises(ValueError):
+            whole.merge(QuantileSketch(relative_accuracy=0.05))
+
+    def test_bounded_size(self):
+        """Test that bucket count is capped by folding the lowest buckets."""
+        sketch = QuantileSketch(max_bins=50)
+        for exponent in range(-200, 200):
+            sketch.add(1.1**exponent)
+
+        self.assertEqual(len(sketch), 50)
+        self.assertEqual(sketch.count, 400)
+        self.assertAlmostEqual(sketch.quantile(0.99) / 1.1**195, 1, delta=0.02)
+
+    def test_zero_and_empty(self):
+        """Test non-positive values and empty sketches."""
+        sketch = QuantileSketch()
+        self.assertIsNone(sketch.quantile(0.5))
+        self.assertEqual(sketch.histogram(), [])
+
+        for value in (0, 0, 100, 200):
+            sketch.add(value)
+        self.assertEqual(sketch.quantile(0.25), 0)
+        self.assertAlmostEqual(sketch.quantile(0.9), 100, delta=1)
+        self.assertEqual(sketch.quantile(1), 200)
+
+    def test_histogram(self):
+        """Test histogram bins cover the range and keep every count."""
+        sketch = QuantileSketch()
+        for value in range(100, 200):
+            sketch.add(value)
+        histogram = sketch.histogram(bins=5)
+
+        self.assertEqual(len(histogram), 5)
+        self.assertEqual(sum(b["count"] for b in histogram), 100)
+        self.assertEqual((histogram[0]["low"], histogram[-1]["high"]), (100, 199))
+        for b in histogram:
+            self.assertAlmostEqual(b["count"], 20, delta=3)
+
+
+class TestDistributionOutput(unittest.TestCase):
+    """Test the quantile fields of the analysis output."""
+
+    def test_analysis_quantiles(self):
+        """Test summary percentiles, route histograms and date bands."""
+        flights = make_flights(2000)
+        prices = [flight["price"] for flight in flights]
+        result = webapp.analyze(flights)
+
+        for key, q in (("p50_price", 0.5), ("p90_price", 0.9), ("p99_price", 0.99)):
+            exact = exact_quantile(prices, q)
+            self.assertLessEqual(abs(result["summary"][key] - exact) / exact, 0.011)
+
+        routes = result["distribution"]["routes"]
+        self.assertEqual(
+            [(r["destination"], r["count"]) for r in routes],
+            [(r["destination"], r["count"]) for r in result["top_routes"]],
+        )
+        for route in routes:
+            self.assertLessEqual(route["p10"], route["p50"])
+            self.assertLessEqual(route["p50"], route["p90"])
+            self.assertEqual(
+                sum(b["count"] for b in route["histogram"]), route["count"]
+            )
+
+        bands = result["distribution"]["bands"]
+        self.assertEqual(
+            [b["depart_date"] for b in bands],
+            [t["depart_date"] for t in result["price_trends"]],
+        )
+
+    def test_aggregator_shards(self):
+        """Test that merged shard aggregators give the same distribution."""
+        flights = make_flights(1500)
+        merged = FlightAggregator()
+        for start in range(0, len(flights), 400):
+            merged.merge(FlightAggregator(flights[start : start + 400]))
+
+        self.assertEqual(
+            merged.result()["distribution"], webapp.analyze(flights)["distribution"]
+        )
+
+    def test_empty_analysis(self):
+        """Test the quantile fields when there is no data."""
+        result = webapp.analyze([])
+
+        self.assertEqual(result["summary"]["p90_price"], 0)
+        self.assertEqual(result["distribution"], {"routes": [], "bands": []})
+
+
+class TestDistributionEndpoints(unittest.TestCase):
+    """Test the distribution on /results and /api/analysis."""
+
+    def setUp(self):
+        self.client = webapp.app.test_client()
+        patcher = patch("app.fetch_fares", return_value=make_flights(600))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_results_page(self):
+        """Test that the results page shows percentiles and histograms."""
+        form = {
+            "origin": "JFK",
+            "destination": "ANY",
+            "start_date": "2023-07-01",
+            "end_date": "2023-07-28",
+        }
+        html = self.client.post("/results", data=form).get_data(as_text=True)
+
+        self.assertIn("Fare Distribution by Route", html)
+        self.assertIn("fare-histogram", html)
+        self.assertIn("Median $", html)
+
+    def test_api_bands_follow_points(self):
+        """Test that bands are reduced with the downsampled trends."""
+        query = (
+            "/api/analysis?origin=JFK&start_date=2023-07-01&end_date=2023-07-28"
+            "&points=10"
+        )
+        results = self.client.get(query).get_json()["results"]
+        bucketed = self.client.get(query + "&downsample=minmax").get_json()
+
+        self.assertEqual(
+            [b["depart_date"] for b in results["distribution"]["bands"]],
+            [t["depart_date"] for t in results["price_trends"]],
+        )
+        self.assertEqual(bucketed["results"]["distribution"]["bands"], [])
+        self.assertIn("p99_price", results["summary"])
+
+
+if __name__ == "__main__":
+    unittest.main()
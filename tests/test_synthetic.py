@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# tests/test_synthetic.py - Test the deterministic synthetic fare generator
+# Author: Developer
+
+import io
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+import app as webapp
+from synthetic import FareGenerator, make_routes, write_jsonl
+
+try:
+    import numpy  # noqa: F401
+
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestFareGenerator(unittest.TestCase):
+    """Test cases for FareGenerator."""
+
+    def test_scrape_backup_format(self):
+        """Test that the fallback keeps its flight dictionary format."""
+        data = webapp.scrape_backup("JFK", "ANY", "2023-07-01", "2023-07-03")
+
+        self.assertEqual(len(data), 15)
+        self.assertEqual(
+            data[0],
+            {
+                "origin": "JFK",
+                "destination": "JFK",
+                "depart_date": "2023-07-01",
+                "return_date": "2023-07-08",
+                "price": data[0]["price"],
+                "airline": "DEMO",
+                "flight_number": "DM100",
+                "source": "scraper",
+            },
+        )
+        self.assertTrue(all(200 <= flight["price"] < 500 for flight in data))
+
+    def test_stable_across_processes(self):
+        """Test that prices don't depend on the per-process hash salt."""
+        code = (
+            "from synthetic import FareGenerator;"
+            "print([f['price'] for f in FareGenerator()"
+            ".generate('JFK', ['LAX'], '2023-07-01', '2023-07-05')])"
+        )
+        outputs = set()
+        for salt in ("1", "2"):
+            env = dict(os.environ, PYTHONHASHSEED=salt)
+            result = subprocess.run(
+                [sys.executable, "-c", code],
+                cwd=ROOT,
+                env=env,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            outputs.add(result.stdout)
+
+        self.assertEqual(len(outputs), 1)
+        expected = FareGenerator().generate("JFK", ["LAX"], "2023-07-01", "2023-07-05")
+        self.assertEqual(outputs.pop().strip(), str([f["price"] for f in expected]))
+
+    def test_seed_changes_prices(self):
+        """Test that different seeds give different fares."""
+        args = ("JFK", ["LAX"], "2023-07-01", "2023-07-31")
+        first = [f["price"] for f in FareGenerator(seed=1).generate(*args)]
+        second = [f["price"] for f in FareGenerator(seed=2).generate(*args)]
+
+        self.assertNotEqual(first, second)
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+    def test_numpy_matches_python(self):
+        """Test that both code paths generate identical fares."""
+        routes = make_routes(40)
+        for distribution in ("uniform", "lognormal"):
+            fast = FareGenerator(distribution=distribution, use_numpy=True)
+            slow = FareGenerator(distribution=distribution, use_numpy=False)
+            self.assertEqual(
+                list(fast.iter_fares(routes, "2024-01-01", "2024-03-31")),
+                list(slow.iter_fares(routes, "2024-01-01", "2024-03-31")),
+            )
+
+    def test_lognormal_distribution(self):
+        """Test that lognormal prices center on the median."""
+        generator = FareGenerator(
+            distribution="lognormal", median=300, sigma=0.5, use_numpy=False
+        )
+        prices = sorted(
+            f["price"]
+            for f in generator.iter_fares(make_routes(20), "2024-01-01", "2024-12-31")
+        )
+
+        self.assertAlmostEqual(prices[len(prices) // 2], 300, delta=15)
+        self.assertGreater(prices[-1], 2 * 300)
+        self.assertGreaterEqual(prices[0], 1)
+
+    def test_invalid_parameters(self):
+        """Test that bad distributions are rejected."""
+        with self.assertRaises(ValueError):
+            FareGenerator(distribution="normal")
+        with self.assertRaises(ValueError):
+            FareGenerator(low=500, high=200)
+
+    def test_make_routes(self):
+        """Test that generated routes are distinct and repeatable."""
+        routes = make_routes(500, seed=3)
+
+        self.assertEqual(len(set(routes)), 500)
+        self.assertEqual(routes, make_routes(500, seed=3))
+        self.assertTrue(all(origin != dest for origin, dest in routes))
+
+    def test_write_jsonl(self):
+        """Test that fares stream out as JSON Lines."""
+        fares = FareGenerator().iter_fares(make_routes(3), "2024-01-01", "2024-01-10")
+        out = io.StringIO()
+
+        self.assertEqual(write_jsonl(fares, out), 30)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 30)
+        self.assertEqual(json.loads(lines[0])["depart_date"], "2024-01-01")
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+    def test_to_columns_matches_analysis(self):
+        """Test that columnar output analyzes the same as the dicts."""
+        from columnar import analyze_columns
+
+        generator = FareGenerator()
+        routes = make_routes(10)
+        flights = list(generator.iter_fares(routes, "2024-01-01", "2024-02-29"))
+        columns = generator.to_columns(routes, "2024-01-01", "2024-02-29")
+
+        self.assertEqual(len(columns), len(flights))
+        self.assertEqual(analyze_columns(columns), webapp.analyze(flights))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# tests/test_upstream.py - Test the shared upstream HTTP client
+# Author: Developer
+
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+
+import app as webapp
+import upstream
+from breaker import OPEN
+from ratelimit import TokenBucket
+
+
+class TestUpstream(unittest.TestCase):
+    """Test cases for pooled sessions, timeouts and retries."""
+
+    def tearDown(self):
+        upstream.close_sessions()
+        upstream.reset_guards()
+
+    def test_session_shared_per_host(self):
+        """Test that one session is reused per upstream host."""
+        a = upstream.get_session("https://api.travelpayouts.com/v2/prices/latest")
+        b = upstream.get_session("https://api.travelpayouts.com/v1/other")
+        c = upstream.get_session("https://openrouter.ai/api/v1/chat/completions")
+
+        self.assertIs(a, b)
+        self.assertIsNot(a, c)
+
+    def test_default_timeout_applied(self):
+        """Test that requests get a (connect, read) timeout by default."""
+        session = upstream.get_session("https://example.com/")
+        with patch.object(session, "request") as mock_request:
+            upstream.get("https://example.com/path", params={"a": 1})
+
+        _, kwargs = mock_request.call_args
+        self.assertEqual(
+            kwargs["timeout"], (upstream.CONNECT_TIMEOUT, upstream.READ_TIMEOUT)
+        )
+        self.assertEqual(kwargs["params"], {"a": 1})
+
+    def test_retry_policy(self):
+        """Test that the adapter retries with backoff but not POST reads."""
+        session = upstream.build_session(pool_size=3, max_retries=2)
+        adapter = session.get_adapter("https://example.com/")
+
+        self.assertEqual(adapter._pool_maxsize, 3)
+        self.assertEqual(adapter.max_retries.total, 2)
+        self.assertIn(503, adapter.max_retries.status_forcelist)
+        self.assertFalse(adapter.max_retries._is_method_retryable("POST"))
+
+    def test_pool_size_from_environment(self):
+        """Test that the pool size follows the configured thread count."""
+        with patch.dict(os.environ, {"WEB_THREADS": "12"}, clear=False):
+            os.environ.pop("UPSTREAM_POOL_SIZE", None)
+            self.assertEqual(upstream.default_pool_size(), 12)
+
+
+class TestUpstreamGuards(unittest.TestCase):
+    """Test cases for per-host circuit breakers and rate limits."""
+
+    def setUp(self):
+        upstream.reset_guards()
+        self.addCleanup(upstream.reset_guards)
+        self.addCleanup(upstream.close_sessions)
+        self.session = upstream.get_session("https://down.example.com/")
+
+    def test_breaker_fails_fast(self):
+        """Test that an open breaker rejects calls without sending them."""
+        with patch.object(
+            self.session, "request", side_effect=requests.exceptions.ConnectionError
+        ) as mock_request:
+            for _ in range(upstream.BREAKER_MIN_CALLS):
+                with self.assertRaises(requests.exceptions.ConnectionError):
+                    upstream.get("https://down.example.com/prices")
+            with self.assertRaises(upstream.CircuitOpenError):
+                upstream.get("https://down.example.com/prices")
+
+        self.assertEqual(mock_request.call_count, upstream.BREAKER_MIN_CALLS)
+        self.assertEqual(upstream.get_breaker("down.example.com").state, OPEN)
+
+    def test_server_errors_count_client_errors_do_not(self):
+        """Test which response statuses count as failures."""
+        response = MagicMock(ok=False, status_code=404)
+        with patch.object(self.session, "request", return_value=response):
+            for _ in range(10):
+                upstream.get("https://down.example.com/missing")
+        self.assertEqual(upstream.get_breaker("down.example.com").state, "closed")
+
+        response.status_code = 503
+        with patch.object(self.session, "request", return_value=response):
+            for _ in range(10):
+                upstream.get("https://down.example.com/prices")
+        self.assertEqual(upstream.get_breaker("down.example.com").state, OPEN)
+
+    def test_rate_limit(self):
+        """Test that calls beyond the host budget fail fast."""
+        upstream._limiters["down.example.com"] = TokenBucket(rate=0.01, capacity=2)
+        with patch.object(self.session, "request") as mock_request, patch.object(
+            upstream, "RATE_LIMIT_WAIT", 0
+        ):
+            upstream.get("https://down.example.com/a")
+            upstream.get("https://down.example.com/b")
+            with self.assertRaises(upstream.RateLimitExceeded):
+                upstream.get("https://down.example.com/c")
+
+        self.assertEqual(mock_request.call_count, 2)
+
+    def test_parse_rate_limits(self):
+        """Test per-host rate limit parsing."""
+        self.assertEqual(
+            upstream.parse_rate_limits("api.travelpayouts.com=10, OpenRouter.ai=0.5"),
+            {"api.travelpayouts.com": 10.0, "openrouter.ai": 0.5},
+        )
+        with self.assertRaises(ValueError):
+            upstream.parse_rate_limits("api.travelpayouts.com")
+
+    def test_status_endpoint_and_ai_fallback(self):
+        """Test operator status and the AI fast-fail response."""
+        breaker = upstream.get_breaker("openrouter.ai")
+        for _ in range(upstream.BREAKER_MIN_CALLS):
+            breaker.allow()
+            breaker.record(False, 0.1, "ReadTimeout")
+        client = webapp.app.test_client()
+
+        with patch.dict(os.environ, {"AI_KEY": "test"}), patch.object(
+            webapp.ai_cache, "get", return_value=None
+        ):
+            response = client.post("/ask_ai", json={"question": "Cheapest month?"})
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("temporarily unavailable", response.get_json()["response"])
+
+        hosts = client.get("/upstream/status").get_json()["upstreams"]
+        status = next(h for h in hosts if h["name"] == "openrouter.ai")
+        self.assertEqual(status["state"], OPEN)
+        self.assertEqual(status["last_failure"], "ReadTimeout")
+
+
+if __name__ == "__main__":
+    unittest.main()
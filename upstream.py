@@ -0,0 +1,388 @@
+"""
+Shared HTTP client layer for the upstream APIs (Travelpayouts, OpenRouter).
+
+Every upstream host gets one pooled, keep-alive ``requests.Session`` so
+repeated calls reuse TCP/TLS connections instead of paying a new handshake
+each time. All calls get connect/read timeouts and bounded retries with
+exponential backoff and jitter.
+
+Each host also has a circuit breaker (see ``breaker.py``) and an optional
+client-side rate limit. While a host's breaker is open, or its rate limit
+is exhausted, calls raise ``UpstreamUnavailable`` immediately instead of
+waiting on the host, so callers can go straight to their fallback.
+
+Settings are read from the environment:
+    UPSTREAM_CONNECT_TIMEOUT  Seconds to wait for a connection (default 3.05)
+    UPSTREAM_READ_TIMEOUT     Seconds to wait for response data (default 20)
+    UPSTREAM_MAX_RETRIES      Retries per request (default 2)
+    UPSTREAM_BACKOFF          Backoff factor in seconds (default 0.3)
+    UPSTREAM_POOL_SIZE        Connections kept per host (default: threads
+                              per worker, see ``default_pool_size``)
+    UPSTREAM_BREAKER_FAILURE_RATE  Failed share of recent calls that opens
+                              the breaker (default 0.5)
+    UPSTREAM_BREAKER_SLOW_SECONDS  Calls at least this slow count as slow
+                              (default 15)
+    UPSTREAM_BREAKER_SLOW_RATE     Slow share that opens the breaker
+                              (default 0.8)
+    UPSTREAM_BREAKER_WINDOW   Recent calls considered (default 20)
+    UPSTREAM_BREAKER_MIN_CALLS     Calls needed before tripping (default 5)
+    UPSTREAM_BREAKER_OPEN_SECONDS  Fail-fast period before probing
+                              (default 30)
+    UPSTREAM_RATE_LIMIT       Requests per second per host (default 0: no
+                              limit)
+    UPSTREAM_RATE_LIMITS      Per-host overrides, e.g.
+                              ``api.travelpayouts.com=10,openrouter.ai=0.5``
+    UPSTREAM_RATE_LIMIT_WAIT  Seconds to wait for rate budget before
+                              failing fast (default 0.5)
+"""
+
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import metrics
+from breaker import OPEN, HALF_OPEN, CircuitBreaker
+from ratelimit import TokenBucket
+
+CONNECT_TIMEOUT = float(os.environ.get("UPSTREAM_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.environ.get("UPSTREAM_READ_TIMEOUT", "20"))
+MAX_RETRIES = int(os.environ.get("UPSTREAM_MAX_RETRIES", "2"))
+BACKOFF_FACTOR = float(os.environ.get("UPSTREAM_BACKOFF", "0.3"))
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+BREAKER_FAILURE_RATE = float(os.environ.get("UPSTREAM_BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_SLOW_SECONDS = float(os.environ.get("UPSTREAM_BREAKER_SLOW_SECONDS", "15"))
+BREAKER_SLOW_RATE = float(os.environ.get("UPSTREAM_BREAKER_SLOW_RATE", "0.8"))
+BREAKER_WINDOW = int(os.environ.get("UPSTREAM_BREAKER_WINDOW", "20"))
+BREAKER_MIN_CALLS = int(os.environ.get("UPSTREAM_BREAKER_MIN_CALLS", "5"))
+BREAKER_OPEN_SECONDS = float(os.environ.get("UPSTREAM_BREAKER_OPEN_SECONDS", "30"))
+RATE_LIMIT = float(os.environ.get("UPSTREAM_RATE_LIMIT", "0"))
+RATE_LIMIT_WAIT = float(os.environ.get("UPSTREAM_RATE_LIMIT_WAIT", "0.5"))
+
+
+def parse_rate_limits(value):
+    """
+    Parse per-host rate limits.
+
+    Args:
+        value (str): e.g. ``"api.travelpayouts.com=10,openrouter.ai=0.5"``
+
+    Returns:
+        dict: Host -> requests per second
+
+    Raises:
+        ValueError: If an entry is malformed
+    """
+    limits = {}
+    for entry in value.split(","):
+        if not entry.strip():
+            continue
+        host, sep, rate = entry.partition("=")
+        if not sep or not host.strip():
+            raise ValueError(f"Invalid rate limit: {entry!r}")
+        limits[host.strip().lower()] = float(rate)
+    return limits
+
+
+RATE_LIMITS = parse_rate_limits(os.environ.get("UPSTREAM_RATE_LIMITS", ""))
+
+
+class UpstreamUnavailable(requests.exceptions.RequestException):
+    """Raised instead of calling a host, so callers fail fast to a fallback."""
+
+
+class CircuitOpenError(UpstreamUnavailable):
+    """The host's circuit breaker is open."""
+
+
+class RateLimitExceeded(UpstreamUnavailable):
+    """The client-side request budget for the host is used up."""
+
+
+UPSTREAM_SECONDS = metrics.registry.histogram(
+    "skytrends_upstream_request_seconds",
+    "Upstream API latency (until response headers, retries included)",
+    ["host"],
+)
+UPSTREAM_ERRORS = metrics.registry.counter(
+    "skytrends_upstream_errors_total",
+    "Upstream calls that failed or returned an error status",
+    ["host", "reason"],
+)
+UPSTREAM_REJECTED = metrics.registry.counter(
+    "skytrends_upstream_rejected_total",
+    "Upstream calls failed fast without being sent",
+    ["host", "reason"],
+)
+
+
+def default_pool_size():
+    """
+    Work out how many connections to keep open per upstream host.
+
+    Each worker process only needs as many connections as it can have
+    requests in flight, i.e. its thread count. ``UPSTREAM_POOL_SIZE`` wins
+    if set, then gunicorn-style ``WEB_THREADS``/``GUNICORN_THREADS``, then a
+    CPU-based guess matching the Flask threaded dev server.
+
+    Returns:
+        int: Pool size per host
+    """
+    for name in ("UPSTREAM_POOL_SIZE", "WEB_THREADS", "GUNICORN_THREADS"):
+        value = os.environ.get(name)
+        if value and value.isdigit() and int(value) > 0:
+            return int(value)
+    return max(4, 2 * (os.cpu_count() or 1))
+
+
+class JitteredRetry(Retry):
+    """urllib3 ``Retry`` that adds full jitter to the exponential backoff."""
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        if backoff <= 0:
+            return 0
+        return random.uniform(0, backoff)
+
+
+def build_session(pool_size=None, max_retries=None):
+    """
+    Create a keep-alive session with a connection pool and retry policy.
+
+    Connection errors are retried for every method; read errors and
+    retryable status codes are only retried for idempotent methods, so a
+    POST to the AI service is never silently sent twice.
+
+    Args:
+        pool_size (int): Connections kept per host
+        max_retries (int): Total retries per request
+
+    Returns:
+        requests.Session: Configured session
+    """
+    pool_size = pool_size or default_pool_size()
+    retries = MAX_RETRIES if max_retries is None else max_retries
+
+    retry = JitteredRetry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=pool_size,
+        pool_block=False,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(url):
+    """
+    Return the shared session for the host of ``url``, creating it once.
+
+    Args:
+        url (str): Any URL on the upstream host
+
+    Returns:
+        requests.Session: Pooled session for that host
+    """
+    parts = urlsplit(url)
+    host = f"{parts.scheme}://{parts.netloc}"
+
+    session = _sessions.get(host)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(host)
+            if session is None:
+                session = build_session()
+                _sessions[host] = session
+    return session
+
+
+def close_sessions():
+    """Close all pooled sessions (used on shutdown and in tests)."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+_breakers = {}
+_limiters = {}
+_guards_lock = threading.Lock()
+
+
+def get_breaker(host):
+    """
+    Return the circuit breaker for ``host``, creating it once.
+
+    Args:
+        host (str): Host name (``netloc``) of the upstream
+
+    Returns:
+        CircuitBreaker: Shared breaker for that host
+    """
+    breaker = _breakers.get(host)
+    if breaker is None:
+        with _guards_lock:
+            breaker = _breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    host,
+                    failure_rate=BREAKER_FAILURE_RATE,
+                    slow_seconds=BREAKER_SLOW_SECONDS,
+                    slow_rate=BREAKER_SLOW_RATE,
+                    window=BREAKER_WINDOW,
+                    min_calls=BREAKER_MIN_CALLS,
+                    open_seconds=BREAKER_OPEN_SECONDS,
+                )
+                _breakers[host] = breaker
+    return breaker
+
+
+def get_limiter(host):
+    """
+    Return the rate limiter for ``host``, or None if it is unlimited.
+
+    Args:
+        host (str): Host name (``netloc``) of the upstream
+
+    Returns:
+        ratelimit.TokenBucket: Shared bucket for that host, or None
+    """
+    if host in _limiters:
+        return _limiters[host]
+    with _guards_lock:
+        if host not in _limiters:
+            rate = RATE_LIMITS.get(host.lower(), RATE_LIMIT)
+            _limiters[host] = TokenBucket(rate) if rate > 0 else None
+        return _limiters[host]
+
+
+def reset_guards():
+    """Forget all breakers and rate limiters (used in tests)."""
+    with _guards_lock:
+        _breakers.clear()
+        _limiters.clear()
+
+
+def guard_status():
+    """
+    Breaker and rate limit state of every host called so far.
+
+    Returns:
+        list: One dict per host (see ``CircuitBreaker.status``), plus the
+            configured rate and available tokens
+    """
+    with _guards_lock:
+        hosts = sorted(set(_breakers) | set(_limiters))
+    rows = []
+    for host in hosts:
+        row = get_breaker(host).status()
+        limiter = get_limiter(host)
+        row["rate_limit"] = limiter.rate if limiter else None
+        row["rate_available"] = round(limiter.available(), 2) if limiter else None
+        rows.append(row)
+    return rows
+
+
+metrics.registry.gauge(
+    "skytrends_upstream_circuit_state",
+    "Circuit breaker state per upstream host (0 closed, 1 half-open, 2 open)",
+    lambda: {
+        (host,): {OPEN: 2, HALF_OPEN: 1}.get(breaker.state, 0)
+        for host, breaker in list(_breakers.items())
+    },
+    ["host"],
+)
+
+
+def request(method, url, **kwargs):
+    """
+    Send a request through the pooled session for the URL's host.
+
+    Connection errors and 429/5xx responses count as failures for the
+    host's circuit breaker; other 4xx responses do not.
+
+    Args:
+        method (str): HTTP method
+        url (str): Full request URL
+        **kwargs: Passed through to ``requests.Session.request``; a
+            ``(connect, read)`` timeout is applied unless one is given
+
+    Returns:
+        requests.Response: The upstream response
+
+    Raises:
+        CircuitOpenError: If the host's breaker is open (nothing is sent)
+        RateLimitExceeded: If the host's rate budget is used up
+        requests.exceptions.RequestException: If the call itself fails
+    """
+    kwargs.setdefault("timeout", (CONNECT_TIMEOUT, READ_TIMEOUT))
+    host = urlsplit(url).netloc
+
+    breaker = get_breaker(host)
+    if not breaker.allow():
+        UPSTREAM_REJECTED.inc(host, "circuit_open")
+        raise CircuitOpenError(
+            f"{host} is unavailable (circuit open, retry in "
+            f"{breaker.retry_in():.0f}s)"
+        )
+    limiter = get_limiter(host)
+    if limiter is not None and not limiter.acquire(timeout=RATE_LIMIT_WAIT):
+        breaker.cancel()
+        UPSTREAM_REJECTED.inc(host, "rate_limited")
+        raise RateLimitExceeded(f"{host} request budget exhausted")
+
+    started = time.perf_counter()
+    try:
+        response = get_session(url).request(method, url, **kwargs)
+    except requests.exceptions.RequestException as e:
+        elapsed = time.perf_counter() - started
+        UPSTREAM_SECONDS.observe(elapsed, host)
+        UPSTREAM_ERRORS.inc(host, type(e).__name__)
+        breaker.record(False, elapsed, type(e).__name__)
+        raise
+    except BaseException:
+        breaker.cancel()
+        raise
+    elapsed = time.perf_counter() - started
+    UPSTREAM_SECONDS.observe(elapsed, host)
+
+    if not response.ok:
+        UPSTREAM_ERRORS.inc(host, str(response.status_code))
+    failed = response.status_code in RETRY_STATUSES
+    breaker.record(not failed, elapsed, str(response.status_code) if failed else None)
+    return response
+
+
+def get(url, **kwargs):
+    """Send a GET request through the shared upstream client."""
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    """Send a POST request through the shared upstream client."""
+    return request("POST", url, **kwargs)